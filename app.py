@@ -1,33 +1,212 @@
-# app.py
-
-from flask import Flask, request, jsonify
-from hybrid import generate_timetable_hybrid
-
-app = Flask(__name__)
-
-@app.route('/api/generate-timetable', methods=['POST'])
-def generate_timetable():
-    """
-    API endpoint to generate timetables.
-    Receives JSON data from the frontend and returns a list of timetable options.
-    """
-    try:
-        # Get the JSON data sent from the frontend
-        data = request.get_json()
-
-        if not data:
-            return jsonify({'error': 'Invalid JSON data'}), 400
-        
-        # Call the timetable generation function from your model
-        generated_options = generate_timetable_hybrid(data)
-        
-        # Return the generated options as a JSON response
-        return jsonify(generated_options), 200
-
-    except Exception as e:
-        # Handle any errors that occur during processing
-        return jsonify({'error': str(e)}), 500
-
-if __name__ == '__main__':
-    # Run the Flask app
-    app.run(debug=True, port=5000)
\ No newline at end of file
+import collections
+import datetime
+import json
+import logging
+import threading
+
+from flask import Flask, Response, request, jsonify
+from hybrid import generate_timetable_hybrid, warm_up
+import instrumentation
+from jobs import JobQueue, QueueFull, SUCCEEDED, FINISHED_STATES, EVENT_POLL_TIMEOUT_SECONDS
+from result_cache import ResultCache, cache_key
+from solution_store import SolutionStore, EXPORTS, KINDS, ICAL_TERM_START, ICAL_TERM_WEEKS
+
+app = Flask(__name__)
+
+# Server-side solver settings that change the result; part of every cache key
+SOLVER_PARAMETERS = {'generator': 'generate_timetable_hybrid'}
+
+# Solves run in worker processes, at most one per core (see jobs.py), each warmed up once
+# (heavy imports, slot prior, served datasets); created on first use.
+job_queue, job_queue_lock = None, threading.Lock()
+result_cache = ResultCache()
+# Indexed stores of recently viewed timetables, by (job id or cache key, option rank); request threads share them
+STORE_CACHE_ENTRIES = 32
+solution_stores, solution_stores_lock = collections.OrderedDict(), threading.Lock()
+
+def get_job_queue():
+    global job_queue
+    with job_queue_lock:
+        if job_queue is None:
+            job_queue = JobQueue(generate_timetable_hybrid, initializer=warm_up, on_event=record_job_event,
+                                 on_success=lambda job: result_cache.put(job['key'], job['data'], job['result']))
+    return job_queue
+
+def record_job_event(job, event):
+    """Feeds the phase events forwarded by the workers, and each job's queue wait and run time, into the metrics registry."""
+    if event['type'] == 'metric':
+        instrumentation.ingest({key: value for key, value in event.items() if key not in ('type', 'seq')})
+    elif event['type'] == 'finished':
+        started = job['started'] or job['finished']
+        instrumentation.registry.observe('timetable_job_queue_seconds', started - job['submitted'], help="Time jobs waited for a worker.", status=job['status'])
+        instrumentation.registry.observe('timetable_job_run_seconds', job['finished'] - started, help="Time jobs ran in a worker.", status=job['status'])
+
+def _job_or_404(job_id):
+    try:
+        return get_job_queue().status(job_id), None
+    except KeyError:
+        return None, (jsonify({'error': f"Unknown job '{job_id}'"}), 404)
+
+@app.route('/api/generate-timetable', methods=['POST'])
+def generate_timetable():
+    """
+    API endpoint to generate timetables.
+    Receives JSON data from the frontend. An input generated before (same content
+    in any order, see result_cache.cache_key) is answered from the result cache
+    (200) unless `?refresh=1`; otherwise a generation job is queued, warm-started
+    from the cached result of a near-identical input if there is one, and its id
+    returned right away (202). Poll /api/jobs/<id> or stream
+    /api/jobs/<id>/events, then fetch the timetable options from
+    /api/jobs/<id>/result.
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'Invalid JSON data'}), 400
+    key = cache_key(data, SOLVER_PARAMETERS)
+    cached = None if request.args.get('refresh', type=int) else result_cache.get(key)
+    if cached is not None:
+        return jsonify({'job_id': None, 'status': SUCCEEDED, 'cached': True, 'cache_key': key, 'result': cached}), 200
+    near = result_cache.nearest(data)
+    try:
+        job_id = get_job_queue().submit(data | {'warm_start': near[1]} if near else data, key=key)
+    except QueueFull as e:
+        return jsonify({'error': str(e)}), 429
+    return jsonify({'job_id': job_id, 'status': get_job_queue().status(job_id)['status'], 'cached': False, 'cache_key': key,
+                    'warm_start': near[0] if near else None, 'status_url': f"/api/jobs/{job_id}",
+                    'events_url': f"/api/jobs/{job_id}/events", 'result_url': f"/api/jobs/{job_id}/result"}), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    status, error = _job_or_404(job_id)
+    return error or (jsonify(status), 200)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    status, error = _job_or_404(job_id)
+    if error: return error
+    return jsonify({'job_id': job_id, 'status': get_job_queue().cancel(job_id)}), 202
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """The generated timetable options (200); 202 while the job is still going, 409 if it failed or was cancelled."""
+    status, error = _job_or_404(job_id)
+    if error: return error
+    state, result = get_job_queue().result(job_id)
+    if state == SUCCEEDED: return jsonify(result), 200
+    if state not in FINISHED_STATES: return jsonify(status), 202
+    return jsonify({'status': state, 'error': status['error'], 'result': result}), 409
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Progress and intermediate solutions. With `Accept: text/event-stream` this is
+    a server-sent-events stream until the job finishes (resuming after
+    Last-Event-ID on reconnect); otherwise a long-poll that
+    returns the events after `?after=<seq>` as soon as there are any (or after
+    `?timeout=` seconds).
+    """
+    status, error = _job_or_404(job_id)
+    if error: return error
+    after = request.args.get('after', 0, type=int)
+    if request.accept_mimetypes.best == 'text/event-stream':
+        after = int(request.headers.get('Last-Event-ID', after))  # resume after a reconnect
+        stream = (f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n" for event in get_job_queue().stream_events(job_id, after))
+        return Response(stream, mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    timeout = min(request.args.get('timeout', EVENT_POLL_TIMEOUT_SECONDS, type=float), EVENT_POLL_TIMEOUT_SECONDS)
+    events, finished = get_job_queue().wait_events(job_id, after, timeout)
+    return jsonify({'events': events, 'finished': finished}), 200
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(result_cache.stats()), 200
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """Drops the cached result for JSON {'key': <cache_key>}, or every cached result (e.g. after the source data changed)."""
+    key = (request.get_json(silent=True) or {}).get('key')
+    return jsonify({'removed': result_cache.invalidate(key)}), 200
+
+def _solution_store(ref):
+    """
+    (store, None) for option `?option=` (rank, default 1) of a finished job's
+    result or of a cached result by cache key, else (None, error response).
+    """
+    rank = request.args.get('option', 1, type=int)
+    with solution_stores_lock:
+        if (ref, rank) in solution_stores:
+            solution_stores.move_to_end((ref, rank))
+            return solution_stores[(ref, rank)], None
+    try:
+        # Without a queue there are no jobs; a cache key must not start the worker pool.
+        if job_queue is None: raise KeyError(ref)
+        state, result = job_queue.result(ref)
+        if state != SUCCEEDED: return None, (jsonify({'error': f"Job '{ref}' has no timetable yet", 'status': state}), 409)
+    except KeyError:
+        result = result_cache.get(ref)
+        if result is None: return None, (jsonify({'error': f"Unknown job or cache key '{ref}'"}), 404)
+    option = next((o for o in result if o['rank'] == rank), None)
+    if option is None: return None, (jsonify({'error': f"No option {rank}; the result has {len(result)}"}), 404)
+    store = SolutionStore.from_records(option['sessions'])
+    with solution_stores_lock:
+        solution_stores[(ref, rank)] = store
+        while len(solution_stores) > STORE_CACHE_ENTRIES: solution_stores.popitem(last=False)
+    return store, None
+
+@app.route('/api/timetables/<ref>', methods=['GET'])
+def timetable_summary(ref):
+    """Class groups, faculty and rooms of a generated timetable (job id or cache key) with their scheduled hours, for the dashboards."""
+    store, error = _solution_store(ref)
+    return error or (jsonify(store.summary()), 200)
+
+@app.route('/api/timetables/<ref>/<kind>/<path:name>', methods=['GET'])
+def timetable_view(ref, kind, name):
+    """
+    One class group's, faculty member's or room's week (`kind` section, faculty or
+    room): its sessions, or with `?view=grid` a days x timeslots grid; `?day=`
+    narrows the sessions to one day.
+    """
+    if kind not in KINDS: return jsonify({'error': f"Unknown view '{kind}'; expected one of {list(KINDS)}"}), 404
+    store, error = _solution_store(ref)
+    if error: return error
+    if name not in store.ids[kind]: return jsonify({'error': f"No {kind} '{name}' in this timetable"}), 404
+    if request.args.get('view') == 'grid': return jsonify({kind: name, 'grid': store.grid(kind, name)}), 200
+    try:
+        return jsonify({kind: name, 'sessions': store.sessions(kind, name, request.args.get('day'))}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/timetables/<ref>/export.<file_format>', methods=['GET'])
+def export_timetable(ref, file_format):
+    """
+    Streams the timetable, or one entity's part of it (`?kind=`&`name=`), as
+    JSON, CSV or iCalendar (`?term_start=` date and `?weeks=` for the calendar).
+    """
+    if file_format not in EXPORTS: return jsonify({'error': f"Unknown export format '{file_format}'; expected one of {sorted(EXPORTS)}"}), 404
+    store, error = _solution_store(ref)
+    if error: return error
+    kind, name = request.args.get('kind', 'section'), request.args.get('name')
+    if kind not in KINDS or (name is not None and name not in store.ids[kind]): return jsonify({'error': f"No {kind} '{name}' in this timetable"}), 404
+    export, mimetype = EXPORTS[file_format]
+    try:
+        if file_format == 'ics': datetime.date.fromisoformat(request.args.get('term_start', ICAL_TERM_START))
+    except ValueError:
+        return jsonify({'error': "term_start must be a date like 2025-01-06"}), 400
+    options = {'term_start': request.args.get('term_start', ICAL_TERM_START), 'weeks': request.args.get('weeks', ICAL_TERM_WEEKS, type=int)} if file_format == 'ics' else {}
+    filename = f"timetable-{name or 'all'}.{file_format}".replace('"', '')
+    return Response(export(store, kind, name, **options), mimetype=mimetype, headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus-style metrics: per-phase timings, model size and CP-SAT statistics by engine and dataset size, jobs and the result cache."""
+    registry = instrumentation.registry
+    counts = get_job_queue().counts() if job_queue is not None else {}
+    for state in ('queued', 'running'): registry.set('timetable_jobs', counts.get(state, 0), help="Jobs currently queued or running.", status=state)
+    for name, value in result_cache.stats().items():
+        if isinstance(value, (int, float)): registry.set('timetable_result_cache', value, help="Result cache counters and size.", stat=name)
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+if __name__ == '__main__':
+    # Structured solve events are logged as JSON lines
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    # Run the Flask app
+    app.run(debug=True, port=5000)
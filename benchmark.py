@@ -0,0 +1,243 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows: no peak-RSS figures
+    resource = None
+
+import data_generator
+
+# ==============================================================================
+# 0. BENCHMARK CONFIGURATION
+# ==============================================================================
+# Size ladder, from one section to every stream x SECTIONS_PER_STREAM sections x 8 semesters.
+# Each rung is generated by data_generator with BENCH_SEED, so every run sees the same data; its
+# faculty are scaled with its size (or set with 'faculty_per_dept') so every class group is complete.
+SIZE_LADDER = [
+    {'name': '1-section', 'streams': 1, 'sections_per_stream': 1, 'semesters': 1},
+    {'name': '9-sections', 'streams': 9, 'sections_per_stream': 1, 'semesters': 1},
+    {'name': '45-sections', 'streams': 9, 'sections_per_stream': 5, 'semesters': 1},
+    {'name': '180-sections', 'streams': 9, 'sections_per_stream': 20, 'semesters': 1},
+    {'name': '180x2-semesters', 'streams': 9, 'sections_per_stream': 20, 'semesters': 2},
+    {'name': '180x8-semesters', 'streams': 9, 'sections_per_stream': 20, 'semesters': 8},
+]
+BENCH_SEED = 42
+BENCH_DATA_DIR = os.path.join('.timetable_cache', 'bench')
+BENCH_HISTORY_FILE = 'benchmark_history.jsonl'    # one JSON line per run
+BENCH_RESULTS_CSV = 'benchmark_results.csv'       # rows of the latest run
+
+# Solver settings fixed for repeatability: one CP-SAT worker with a fixed seed is deterministic
+BENCH_TIME_LIMIT_SECONDS = 60
+BENCH_SOLVER_WORKERS = 1
+BENCH_SOLVER_SEED = 0
+BENCH_GA_POPULATION = 200
+BENCH_GA_GENERATIONS = 10
+
+# Regression report: a metric is flagged when it is worse than the baseline by more than the
+# tolerance and by more than its noise floor (seconds / MB / count)
+REGRESSION_TOLERANCE = 0.15
+NOISE_FLOORS = {'load_seconds': 0.05, 'build_seconds': 0.05, 'solve_seconds': 0.5, 'peak_rss_mb': 10, 'variables': 0, 'constraints': 0}
+
+# ==============================================================================
+# 1. ENGINES
+# ==============================================================================
+# Each runs in a fresh process and returns its phase timings and model figures.
+def _cp_sat_engine(engine):
+    def run(filename, time_limit):
+        import optimize_schedule
+        start = time.perf_counter()
+        stream_map, courses, faculty, rooms = optimize_schedule.load_data_from_csv(filename, None)
+        load_seconds = time.perf_counter() - start
+        built = optimize_schedule.MODEL_BUILDERS[engine](stream_map, courses, faculty, rooms, verbose=False)
+        result = optimize_schedule.solve_master_model(built, time_limit, num_search_workers=BENCH_SOLVER_WORKERS, random_seed=BENCH_SOLVER_SEED)
+        objective = result['objective']
+        # A partial objective does not compare with the other engines'; report the timetable's full score instead.
+        if engine in optimize_schedule.PARTIAL_OBJECTIVE_ENGINES: objective = optimize_schedule.score_sessions(result['sessions'], stream_map, courses) if result['sessions'] else None
+        return {'load_seconds': load_seconds, 'build_seconds': built['stats']['build_seconds'], 'solve_seconds': result['wall_time'],
+                'variables': built['stats']['num_variables'], 'constraints': built['stats']['num_constraints'],
+                'objective': objective, 'status': result['status']}
+    return run
+
+def _hybrid_ga(filename, time_limit):
+    import data_loader
+    import hybrid
+    start = time.perf_counter()
+    stream_map, courses, faculty, rooms = data_loader.load_timetable_data(filename)
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    problem = hybrid.encode_problem(stream_map, courses, faculty, rooms)
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    ga = hybrid.evolve_islands(problem, 1, BENCH_GA_POPULATION, BENCH_GA_GENERATIONS, seed=BENCH_SOLVER_SEED, verbose=False)
+    return {'load_seconds': load_seconds, 'build_seconds': build_seconds, 'solve_seconds': time.perf_counter() - start,
+            'variables': len(problem['streams']) * len(hybrid.DAYS) * len(hybrid.TIMESLOTS), 'constraints': None,
+            'objective': ga['score'], 'status': 'FEASIBLE' if ga['conflicts'] == 0 else 'CLASHES'}
+
+def _good(filename, time_limit):
+    import good
+    import optimize_schedule
+    start = time.perf_counter()
+    stream_map, courses, faculty, rooms = optimize_schedule.load_data_from_csv(filename, None)
+    load_seconds = time.perf_counter() - start
+    built = good.build_good_model(stream_map, courses, faculty, rooms, verbose=False)
+    result = optimize_schedule.solve_master_model(built, time_limit, num_search_workers=BENCH_SOLVER_WORKERS, random_seed=BENCH_SOLVER_SEED)
+    return {'load_seconds': load_seconds, 'build_seconds': built['stats']['build_seconds'], 'solve_seconds': result['wall_time'],
+            'variables': built['stats']['num_variables'], 'constraints': built['stats']['num_constraints'],
+            'objective': result['objective'], 'status': result['status']}
+
+ENGINES = {
+    'cp-sat-grid': _cp_sat_engine('grid'),
+    'cp-sat-compact': _cp_sat_engine('compact'),
+    'cp-sat-interval': _cp_sat_engine('interval'),
+    'hybrid-ga': _hybrid_ga,
+    'good': _good,
+}
+
+# ==============================================================================
+# 2. RUNNING THE LADDER
+# ==============================================================================
+def dataset_for(rung, seed=BENCH_SEED):
+    """
+    Generates (once) and returns the CSV of a SIZE_LADDER rung. The faculty are
+    sized for the rung (data_generator.faculty_per_dept_for), and a rung in
+    which any class group is left without its full curriculum is an error, so
+    every rung has the number of class groups its name claims.
+    """
+    faculty_per_dept = rung.get('faculty_per_dept') or data_generator.faculty_per_dept_for(rung['sections_per_stream'], rung['semesters'])
+    filename = os.path.join(BENCH_DATA_DIR, f"{rung['name']}-f{faculty_per_dept}-seed{seed}.csv")
+    if not os.path.exists(filename):
+        os.makedirs(BENCH_DATA_DIR, exist_ok=True)
+        data = data_generator.generate_dataset(seed, data_generator.STREAMS[:rung['streams']], data_generator.SEMESTERS[:rung['semesters']],
+                                               rung['sections_per_stream'], faculty_per_dept)
+        data_generator.write_dataset(data, f"{filename}.tmp", 'csv')
+        summary, expected = data['summary'], rung['streams'] * rung['sections_per_stream'] * rung['semesters']
+        if summary['groups'] != expected or summary['empty_groups'] or summary['short_groups']:
+            os.remove(f"{filename}.tmp")
+            raise RuntimeError(f"Rung '{rung['name']}': {summary['empty_groups']} empty and {summary['short_groups']} short class groups "
+                               f"out of {summary['groups']} (expected {expected} complete ones); raise its 'faculty_per_dept'.")
+        os.replace(f"{filename}.tmp", filename)
+    return filename
+
+def _run_case(args):
+    engine, filename, time_limit = args
+    try:
+        measured = ENGINES[engine](filename, time_limit)
+    except Exception as e:  # a failing engine is a result, not the end of the run
+        measured = {'status': f"ERROR: {type(e).__name__}: {e}"}
+    if resource: measured['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return measured
+
+def run_benchmarks(engines=None, sizes=None, time_limit=BENCH_TIME_LIMIT_SECONDS, seed=BENCH_SEED):
+    """
+    Runs every engine on every rung (names from ENGINES / SIZE_LADDER, default all),
+    each case in a fresh process so peak RSS is its own. Returns the run:
+    {'run_id', 'meta', 'results'} with one result row per (size, engine).
+    """
+    engines = list(ENGINES) if engines is None else engines
+    rungs = [r for r in SIZE_LADDER if sizes is None or r['name'] in sizes]
+    results = []
+    for rung in rungs:
+        filename = dataset_for(rung, seed)
+        with open(filename, encoding='utf-8') as f: rows = sum(1 for _ in f) - 1
+        for engine in engines:
+            print(f"⏱️  {rung['name']} ({rows} rows) / {engine} ...", flush=True)
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                measured = pool.submit(_run_case, (engine, filename, time_limit)).result()
+            results.append({'size': rung['name'], 'rows': rows, 'engine': engine, 'load_seconds': None, 'build_seconds': None, 'solve_seconds': None,
+                            'variables': None, 'constraints': None, 'peak_rss_mb': None, 'objective': None, 'status': None} | measured)
+    return {'run_id': time.strftime('%Y%m%d-%H%M%S'), 'meta': _run_meta(time_limit, seed), 'results': results}
+
+def _run_meta(time_limit, seed):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'commit': commit, 'time': time.time(), 'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+            'time_limit': time_limit, 'seed': seed, 'solver_workers': BENCH_SOLVER_WORKERS}
+
+# ==============================================================================
+# 3. HISTORY AND REGRESSION REPORT
+# ==============================================================================
+def save_run(run, history_file=BENCH_HISTORY_FILE, results_csv=BENCH_RESULTS_CSV):
+    with open(history_file, 'a', encoding='utf-8') as f: f.write(json.dumps(run) + '\n')
+    if results_csv and run['results']:
+        with open(results_csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=['run_id'] + list(run['results'][0]))
+            writer.writeheader()
+            writer.writerows({'run_id': run['run_id']} | row for row in run['results'])
+
+def load_history(history_file=BENCH_HISTORY_FILE):
+    if not os.path.exists(history_file): return []
+    with open(history_file, encoding='utf-8') as f: return [json.loads(line) for line in f if line.strip()]
+
+def compare_runs(baseline, current, tolerance=REGRESSION_TOLERANCE):
+    """
+    One row per (size, engine, metric) present in both runs, with the relative
+    change and 'regression' set when the current value is worse by more than
+    `tolerance` and the metric's noise floor (lower is better for times, memory
+    and model size; higher for the objective, and a status that stops being
+    OPTIMAL / FEASIBLE is always flagged).
+    """
+    before = {(r['size'], r['engine']): r for r in baseline['results']}
+    report = []
+    for row in current['results']:
+        old = before.get((row['size'], row['engine']))
+        if old is None: continue
+        for metric, floor in list(NOISE_FLOORS.items()) + [('objective', 0)]:
+            a, b = old.get(metric), row.get(metric)
+            if a is None or b is None: continue
+            worse = (a - b) if metric == 'objective' else (b - a)
+            change = (b - a) / abs(a) if a else None
+            regression = worse > floor and worse > tolerance * abs(a)
+            report.append({'size': row['size'], 'engine': row['engine'], 'metric': metric, 'baseline': a, 'current': b,
+                           'change': None if change is None else round(change, 3), 'regression': regression})
+        if old.get('status') in ('OPTIMAL', 'FEASIBLE') and row.get('status') != old.get('status') and row.get('status') not in ('OPTIMAL', 'FEASIBLE'):
+            report.append({'size': row['size'], 'engine': row['engine'], 'metric': 'status', 'baseline': old['status'], 'current': row['status'],
+                           'change': None, 'regression': True})
+    return report
+
+def print_report(run, report, baseline_id):
+    print("\n--- Benchmark results ---")
+    columns = ['size', 'rows', 'engine', 'load_seconds', 'build_seconds', 'solve_seconds', 'variables', 'constraints', 'peak_rss_mb', 'objective', 'status']
+    table = [columns] + [[_format(r.get(c)) for c in columns] for r in run['results']]
+    widths = [max(len(row[i]) for row in table) for i in range(len(columns))]
+    for row in table: print('  '.join(cell.rjust(width) for cell, width in zip(row, widths)))
+    if baseline_id is None:
+        print("\nNo baseline run to compare with.")
+        return
+    regressions = [r for r in report if r['regression']]
+    print(f"\n--- Compared with run {baseline_id}: {len(regressions)} regression(s) beyond {REGRESSION_TOLERANCE:.0%} ---")
+    for r in regressions: print(f"   ❌ {r['size']} / {r['engine']} / {r['metric']}: {_format(r['baseline'])} -> {_format(r['current'])}")
+
+def _format(value):
+    return '-' if value is None else f"{value:.2f}" if isinstance(value, float) else str(value)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the scheduling engines over a seeded size ladder and flag regressions against a previous run.")
+    parser.add_argument('--engine', action='append', choices=sorted(ENGINES), help="Engines to run (repeatable; default all).")
+    parser.add_argument('--size', action='append', choices=[r['name'] for r in SIZE_LADDER], help="Ladder rungs to run (repeatable; default all).")
+    parser.add_argument('--time-limit', type=float, default=BENCH_TIME_LIMIT_SECONDS, help="Solve time limit per case in seconds.")
+    parser.add_argument('--seed', type=int, default=BENCH_SEED)
+    parser.add_argument('--history', default=BENCH_HISTORY_FILE)
+    parser.add_argument('--baseline', help="run_id to compare with (default: the latest run in the history).")
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument('--no-save', action='store_true', help="Do not append this run to the history.")
+    args = parser.parse_args()
+    REGRESSION_TOLERANCE = args.tolerance
+
+    history = load_history(args.history)
+    baseline = next((r for r in history if r['run_id'] == args.baseline), None) if args.baseline else (history[-1] if history else None)
+    if args.baseline and baseline is None: parser.error(f"run '{args.baseline}' is not in {args.history}")
+    run = run_benchmarks(args.engine, args.size, args.time_limit, args.seed)
+    report = compare_runs(baseline, run, args.tolerance) if baseline else []
+    if not args.no_save: save_run(run, args.history)
+    print_report(run, report, baseline['run_id'] if baseline else None)
+    sys.exit(1 if any(r['regression'] for r in report) else 0)
@@ -1,140 +1,281 @@
-import random
-import csv
-import collections
-
-# --- Configuration ---
-STREAMS = ['CSE', 'AIDS', 'AIML', 'ECE', 'EE', 'ME', 'CE', 'IT', 'Biotech']
-SEMESTERS = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII']
-SECTIONS_PER_STREAM = 20
-MIN_SUBJECTS_PER_SEMESTER = 6
-NUM_FACULTY_PER_DEPT = 15
-
-NUM_CLASS_GROUPS = len(STREAMS) * SECTIONS_PER_STREAM
-NUM_THEORY_ROOMS = NUM_CLASS_GROUPS + 5
-NUM_LAB_ROOMS = 100
-MAX_WEEKLY_HOURS = 36
-
-FACULTY_FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Vihaan', 'Arjun', 'Sai', 'Reyansh', 'Ayaan', 'Krishna', 'Ishaan', 'Saanvi', 'Aanya', 'Aadhya', 'Kiara', 'Diya', 'Pari', 'Ananya', 'Riya', 'Fatima', 'Priya']
-FACULTY_LAST_NAMES = ['Sharma', 'Verma', 'Gupta', 'Singh', 'Kumar', 'Patel', 'Reddy', 'Khan', 'Joshi', 'Menon', 'Iyer', 'Nath', 'Mishra', 'Yadav', 'Pandey']
-FACULTY_TITLES = ['Dr.', 'Prof.']
-COURSE_PREFIXES = {'CSE': 'CS', 'AIDS': 'DS', 'AIML': 'AI', 'ECE': 'EC', 'EE': 'EE', 'ME': 'ME', 'CE': 'CE', 'IT': 'IT', 'Biotech': 'BT'}
-COURSE_SUFFIXES = ['Fundamentals', 'Design', 'Systems', 'Analysis', 'Programming', 'Theory', 'Applications', 'Engineering', 'Structures', 'Dynamics', 'Principles']
-
-def generate_conflict_free_data():
-    print("🤖 Starting conflict-free generation of a large-scale synthetic dataset...")
-    
-    faculty = {}
-    all_depts = STREAMS + ['Physics', 'Chemistry', 'Maths', 'Humanities']
-    for dept in all_depts:
-        for _ in range(NUM_FACULTY_PER_DEPT):
-            name = f"{random.choice(FACULTY_TITLES)} {random.choice(FACULTY_FIRST_NAMES)} {random.choice(FACULTY_LAST_NAMES)}"
-            if name not in faculty: faculty[name] = {'dept': dept}
-    print(f"   -> Generated {len(faculty)} faculty members.")
-
-    rooms = {}
-    for i in range(NUM_THEORY_ROOMS): rooms[f'CR-{i+1:03}'] = {'type': 'theory', 'capacity': random.randint(50, 80)}
-    for i in range(NUM_LAB_ROOMS): rooms[f'LAB-{i+1:03}'] = {'type': 'lab', 'capacity': random.randint(25, 40)}
-    print(f"   -> Generated {len(rooms)} rooms.")
-    
-    courses = {}
-    for sem_num, sem in enumerate(SEMESTERS, 1):
-        for stream in STREAMS:
-            for i in range(1, 13):
-                prefix = COURSE_PREFIXES.get(stream, "GEN")
-                course_code = f'{prefix}-{sem_num}0{i}'
-                if course_code not in courses:
-                    is_lab_associated = random.random() < 0.6
-                    courses[course_code] = {'name': random.choice(COURSE_SUFFIXES), 'hours_per_week': random.randint(3, 4), 'dept': stream, 'is_lab': False}
-                    if is_lab_associated: courses[f'{course_code}L'] = {'name': f"{courses[course_code]['name']} Lab", 'hours_per_week': 2, 'dept': stream, 'is_lab': True}
-    print(f"   -> Generated {len(courses)} unique courses in the catalog.")
-    
-    stream_map = {}
-    theory_rooms = [r for r, d in rooms.items() if d['type'] == 'theory']
-    random.shuffle(theory_rooms)
-    
-    sections = [chr(ord('A') + i) for i in range(SECTIONS_PER_STREAM)]
-    all_stream_sections = [f"{stream}-{section}" for stream in STREAMS for section in sections]
-
-    if len(all_stream_sections) > len(theory_rooms):
-        print(f"❌ ERROR: Not enough theory rooms for all class groups. Groups: {len(all_stream_sections)}, Rooms: {len(theory_rooms)}")
-        return None
-
-    faculty_workload = collections.defaultdict(int)
-    
-    for stream_section in all_stream_sections:
-        room_name = theory_rooms.pop()
-        stream = stream_section.split('-')[0]
-        
-        for sem_num, sem in enumerate(SEMESTERS, 1):
-            stream_sem_key = f"{stream_section}_{sem}"
-            prefix = COURSE_PREFIXES.get(stream)
-            relevant_courses_pool = [c for c, v in courses.items() if v.get('dept') == stream and c.startswith(f'{prefix}-{sem_num}0') and not v.get('is_lab')]
-            random.shuffle(relevant_courses_pool)
-            relevant_faculty = [f for f, d in faculty.items() if d.get('dept') == stream]
-            if not relevant_faculty: relevant_faculty = list(faculty.keys())
-
-            assigned_courses, num_assigned, current_curriculum_hours = [], 0, 0
-            
-            while num_assigned < MIN_SUBJECTS_PER_SEMESTER and relevant_courses_pool:
-                course_code = relevant_courses_pool.pop()
-                course_hours = courses[course_code]['hours_per_week']
-                available_faculty = [f for f in relevant_faculty if faculty_workload[f] + course_hours <= MAX_WEEKLY_HOURS]
-                if not available_faculty or current_curriculum_hours + course_hours > MAX_WEEKLY_HOURS: continue
-
-                assigned_faculty = random.choice(available_faculty)
-                assigned_courses.append((course_code, assigned_faculty))
-                faculty_workload[assigned_faculty] += course_hours
-                current_curriculum_hours += course_hours
-                num_assigned += 1
-                
-                lab_code = f'{course_code}L'
-                if lab_code in courses and num_assigned < MIN_SUBJECTS_PER_SEMESTER:
-                    lab_hours = courses[lab_code]['hours_per_week']
-                    available_faculty_lab = [f for f in relevant_faculty if faculty_workload[f] + lab_hours <= MAX_WEEKLY_HOURS]
-                    if not available_faculty_lab or current_curriculum_hours + lab_hours > MAX_WEEKLY_HOURS: continue
-
-                    assigned_faculty_lab = random.choice(available_faculty_lab)
-                    assigned_courses.append((lab_code, assigned_faculty_lab))
-                    faculty_workload[assigned_faculty_lab] += lab_hours
-                    current_curriculum_hours += lab_hours
-                    num_assigned += 1
-            
-            stream_map[stream_sem_key] = {'room': room_name, 'courses': assigned_courses}
-            
-    print(f"   -> Generated course mappings for {len(stream_map)} groups with conflict prevention.")
-    return {'rooms': rooms, 'faculty': faculty, 'courses': courses, 'stream_map': stream_map}
-
-def save_data_to_single_csv(data, filename="master_timetable_dataset.csv"):
-    if data is None: return
-    print(f"\nWriting all data to a single CSV file: {filename}...")
-    
-    header = ['stream_semester_group', 'stream', 'section', 'semester', 'dedicated_room', 'room_type', 'room_capacity', 'course_code', 'course_name', 'course_hours_per_week', 'course_department', 'is_lab', 'faculty_name', 'faculty_department']
-    total_rows = 0
-    try:
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
-            
-            for stream_sem_key, details in data['stream_map'].items():
-                stream_section, sem_str = stream_sem_key.rsplit('_', 1)
-                stream, section = stream_section.split('-')
-                
-                # --- CORRECTED CODE BLOCK ---
-                # FIX: Define room_name first, then use it to get room_info.
-                room_name = details['room']
-                room_info = data['rooms'].get(room_name, {})
-
-                for course_code, faculty_name in details['courses']:
-                    course_info, faculty_info = data['courses'].get(course_code, {}), data['faculty'].get(faculty_name, {})
-                    writer.writerow([stream_sem_key, stream, section, sem_str, room_name, room_info.get('type', 'N/A'), room_info.get('capacity', 'N/A'), course_code, course_info.get('name', 'N/A'), course_info.get('hours_per_week', 'N/A'), course_info.get('dept', 'N/A'), course_info.get('is_lab', False), faculty_name, faculty_info.get('dept', 'N/A')])
-                    total_rows += 1
-        
-        print("\n" + "="*50 + f"\n✅ Success! Conflict-free dataset with {total_rows} rows saved to '{filename}'\n" + "="*50)
-
-    except Exception as e:
-        print(f"\nError: Could not write to CSV file. {e}")
-
-
-if __name__ == '__main__':
-    synthetic_data = generate_conflict_free_data()
-    save_data_to_single_csv(synthetic_data)
\ No newline at end of file
+import argparse
+import csv
+import heapq
+import math
+import os
+import random
+import time
+
+# --- Configuration ---
+STREAMS = ['CSE', 'AIDS', 'AIML', 'ECE', 'EE', 'ME', 'CE', 'IT', 'Biotech']
+SEMESTERS = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII']
+SECTIONS_PER_STREAM = 20
+MIN_SUBJECTS_PER_SEMESTER = 6
+NUM_FACULTY_PER_DEPT = None      # None: enough for every class group's curriculum (see faculty_per_dept_for)
+COURSES_PER_SEMESTER = 12         # catalog size per (stream, semester)
+
+NUM_LAB_ROOMS = 100
+EXTRA_THEORY_ROOMS = 5            # theory rooms beyond one per class group
+MAX_WEEKLY_HOURS = 36
+CLASS_SIZE_RANGE = (20, 40)       # students per section (lab rooms seat 25-40, theory rooms 50-80)
+FACULTY_SHARED_SHARE = 0.0        # share of all faculty who may teach for any department
+SEED = 42
+CHUNK_ROWS = 50000                # rows buffered per CSV write / Parquet row group
+
+FACULTY_FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Vihaan', 'Arjun', 'Sai', 'Reyansh', 'Ayaan', 'Krishna', 'Ishaan', 'Saanvi', 'Aanya', 'Aadhya', 'Kiara', 'Diya', 'Pari', 'Ananya', 'Riya', 'Fatima', 'Priya']
+FACULTY_LAST_NAMES = ['Sharma', 'Verma', 'Gupta', 'Singh', 'Kumar', 'Patel', 'Reddy', 'Khan', 'Joshi', 'Menon', 'Iyer', 'Nath', 'Mishra', 'Yadav', 'Pandey']
+FACULTY_TITLES = ['Dr.', 'Prof.']
+SUPPORT_DEPTS = ['Physics', 'Chemistry', 'Maths', 'Humanities']
+COURSE_PREFIXES = {'CSE': 'CS', 'AIDS': 'DS', 'AIML': 'AI', 'ECE': 'EC', 'EE': 'EE', 'ME': 'ME', 'CE': 'CE', 'IT': 'IT', 'Biotech': 'BT'}
+COURSE_SUFFIXES = ['Fundamentals', 'Design', 'Systems', 'Analysis', 'Programming', 'Theory', 'Applications', 'Engineering', 'Structures', 'Dynamics', 'Principles']
+
+HEADER = ['stream_semester_group', 'stream', 'section', 'semester', 'dedicated_room', 'room_type', 'room_capacity', 'course_code', 'course_name', 'course_hours_per_week', 'course_department', 'is_lab', 'faculty_name', 'faculty_department', 'class_size']
+
+# --- Catalogs ---
+def section_name(index):
+    """A, B, ..., Z, AA, AB, ... so any number of sections gets a distinct name."""
+    name = ''
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        name = chr(ord('A') + rest) + name
+    return name
+
+def _faculty_name(rng, taken):
+    name = f"{rng.choice(FACULTY_TITLES)} {rng.choice(FACULTY_FIRST_NAMES)} {rng.choice(FACULTY_LAST_NAMES)}"
+    if name not in taken: return name
+    title, first, last = name.split(' ')
+    for initial in rng.sample([chr(ord('A') + i) for i in range(26)], 26):
+        if f"{title} {first} {initial}. {last}" not in taken: return f"{title} {first} {initial}. {last}"
+    n = 2
+    while f"{name} {n}" in taken: n += 1
+    return f"{name} {n}"
+
+def generate_faculty(rng, depts, per_dept):
+    faculty = {}
+    for dept in depts:
+        for _ in range(per_dept): faculty[_faculty_name(rng, faculty)] = {'dept': dept}
+    return faculty
+
+def generate_rooms(rng, num_theory, num_lab):
+    rooms = {f'CR-{i+1:03}': {'type': 'theory', 'capacity': rng.randint(50, 80)} for i in range(num_theory)}
+    rooms.update({f'LAB-{i+1:03}': {'type': 'lab', 'capacity': rng.randint(25, 40)} for i in range(num_lab)})
+    return rooms
+
+def generate_course_catalog(rng, streams, semesters):
+    """Returns (courses, theory course codes indexed by (stream, semester number)); every theory course may have an 'L' lab."""
+    courses, by_stream_semester = {}, {}
+    for sem_num, _ in enumerate(semesters, 1):
+        for stream in streams:
+            prefix = COURSE_PREFIXES.get(stream, stream[:2].upper())
+            codes = by_stream_semester.setdefault((stream, sem_num), [])
+            for i in range(1, COURSES_PER_SEMESTER + 1):
+                course_code = f'{prefix}-{sem_num}0{i}'
+                if course_code in courses: continue
+                courses[course_code] = {'name': rng.choice(COURSE_SUFFIXES), 'hours_per_week': rng.randint(3, 4), 'dept': stream, 'is_lab': False}
+                codes.append(course_code)
+                if rng.random() < 0.6: courses[f'{course_code}L'] = {'name': f"{courses[course_code]['name']} Lab", 'hours_per_week': 2, 'dept': stream, 'is_lab': True}
+    return courses, by_stream_semester
+
+# --- Faculty assignment ---
+class FacultyPool:
+    """
+    Least-loaded-first faculty per department as heaps of (weekly hours, random
+    tiebreak, name), plus one heap of faculty shared by every department. A pick
+    takes the least-loaded of the department's and the shared heap's tops; if
+    that one cannot take the hours, nobody in its heap can.
+    """
+    def __init__(self, rng, faculty, shared_share, max_hours):
+        self.rng, self.max_hours = rng, max_hours
+        names = list(faculty)
+        shared = set(rng.sample(names, round(shared_share * len(names))))
+        self.heaps = {'*': []}
+        for name in names:
+            self.heaps.setdefault('*' if name in shared else faculty[name]['dept'], []).append((0, rng.random(), name))
+        for heap in self.heaps.values(): heapq.heapify(heap)
+
+    def assign(self, dept, hours):
+        """The least-loaded faculty member of `dept` (or shared) with `hours` to spare, charged for them; None if there is none."""
+        heaps = [h for h in (self.heaps.get(dept), self.heaps['*']) if h and h[0][0] + hours <= self.max_hours]
+        if not heaps: return None
+        heap = min(heaps, key=lambda h: h[0][:2])
+        load, _, name = heap[0]
+        heapq.heapreplace(heap, (load + hours, self.rng.random(), name))
+        return name
+
+def faculty_per_dept_for(sections_per_stream, num_semesters, max_weekly_hours=MAX_WEEKLY_HOURS, min_subjects=MIN_SUBJECTS_PER_SEMESTER):
+    """
+    Faculty per department so that every class group can get `min_subjects`
+    courses: a stream's groups need at most min_subjects x 4 hours each, and a
+    faculty member can be left with up to 3 unusable hours.
+    """
+    demand = sections_per_stream * num_semesters * min_subjects * 4
+    return max(1, math.ceil(demand / max(1, max_weekly_hours - 3)))
+
+def generate_dataset(seed=SEED, streams=STREAMS, semesters=SEMESTERS, sections_per_stream=SECTIONS_PER_STREAM, num_faculty_per_dept=NUM_FACULTY_PER_DEPT,
+                     num_lab_rooms=NUM_LAB_ROOMS, max_weekly_hours=MAX_WEEKLY_HOURS, faculty_shared_share=FACULTY_SHARED_SHARE,
+                     min_subjects=MIN_SUBJECTS_PER_SEMESTER):
+    """
+    Builds the faculty, rooms and course catalog (all from `seed`, so the same
+    arguments give the same dataset) and returns them with 'groups', a generator
+    of (stream_semester_group, stream, section, semester, room, class size, [(course, faculty)])
+    that assigns curricula one class group at a time. Faculty come from
+    FacultyPool, so no one exceeds `max_weekly_hours`; neither does a group.
+    `num_faculty_per_dept` None sizes the faculty with faculty_per_dept_for.
+    'summary' counts the groups generated so far: 'groups', 'empty_groups' (no
+    faculty had hours left for any of their courses, so they have no rows) and
+    'short_groups' (fewer than `min_subjects` courses).
+    """
+    rng = random.Random(seed)
+    if num_faculty_per_dept is None: num_faculty_per_dept = faculty_per_dept_for(sections_per_stream, len(semesters), max_weekly_hours, min_subjects)
+    summary = {'groups': 0, 'empty_groups': 0, 'short_groups': 0, 'min_subjects': min_subjects}
+    faculty = generate_faculty(rng, list(streams) + SUPPORT_DEPTS, num_faculty_per_dept)
+    num_groups = len(streams) * sections_per_stream
+    rooms = generate_rooms(rng, num_groups + EXTRA_THEORY_ROOMS, num_lab_rooms)
+    courses, courses_by_stream_semester = generate_course_catalog(rng, streams, semesters)
+    theory_rooms = [r for r, d in rooms.items() if d['type'] == 'theory']
+    rng.shuffle(theory_rooms)
+    # Class sizes come from their own generator, so they do not change the rest of a seed's dataset.
+    size_rng = random.Random(f"{seed}-class-sizes")
+
+    def groups():
+        pool = FacultyPool(rng, faculty, faculty_shared_share, max_weekly_hours)
+        for stream in streams:
+            for s in range(sections_per_stream):
+                section, room_name, class_size = section_name(s), theory_rooms.pop(), size_rng.randint(*CLASS_SIZE_RANGE)
+                for sem_num, sem in enumerate(semesters, 1):
+                    pool_of_courses = list(courses_by_stream_semester[(stream, sem_num)])
+                    rng.shuffle(pool_of_courses)
+                    assigned_courses, hours = [], 0
+                    while len(assigned_courses) < min_subjects and pool_of_courses:
+                        course_code = pool_of_courses.pop()
+                        course_hours = courses[course_code]['hours_per_week']
+                        if hours + course_hours > max_weekly_hours: continue
+                        assigned_faculty = pool.assign(stream, course_hours)
+                        if assigned_faculty is None: continue
+                        assigned_courses.append((course_code, assigned_faculty))
+                        hours += course_hours
+
+                        lab_code = f'{course_code}L'
+                        if lab_code in courses and len(assigned_courses) < min_subjects:
+                            lab_hours = courses[lab_code]['hours_per_week']
+                            if hours + lab_hours > max_weekly_hours: continue
+                            assigned_faculty_lab = pool.assign(stream, lab_hours)
+                            if assigned_faculty_lab is None: continue
+                            assigned_courses.append((lab_code, assigned_faculty_lab))
+                            hours += lab_hours
+                    summary['groups'] += 1
+                    summary['empty_groups'] += not assigned_courses
+                    summary['short_groups'] += 0 < len(assigned_courses) < min_subjects
+                    yield f"{stream}-{section}_{sem}", stream, section, sem, room_name, class_size, assigned_courses
+
+    return {'rooms': rooms, 'faculty': faculty, 'courses': courses, 'groups': groups(), 'summary': summary}
+
+def summary_warnings(summary):
+    """Messages for the groups a generation left without a full curriculum (see generate_dataset's 'summary')."""
+    messages = []
+    if summary['empty_groups']: messages.append(f"⚠️  {summary['empty_groups']} of {summary['groups']} class groups got no courses (faculty hours ran out) and have no rows.")
+    if summary['short_groups']: messages.append(f"⚠️  {summary['short_groups']} class groups got fewer than {summary['min_subjects']} courses.")
+    return messages
+
+def generate_conflict_free_data(**sizes):
+    """The whole dataset in memory, with 'stream_map' in place of 'groups' (see generate_dataset for `sizes`)."""
+    print("🤖 Starting conflict-free generation of a large-scale synthetic dataset...")
+    data = generate_dataset(**sizes)
+    data['stream_map'] = {key: {'room': room_name, 'size': class_size, 'courses': assigned} for key, _, _, _, room_name, class_size, assigned in data.pop('groups')}
+    data['stream_map'] = {key: details for key, details in data['stream_map'].items() if details['courses']}
+    print(f"   -> Generated {len(data['faculty'])} faculty, {len(data['rooms'])} rooms, {len(data['courses'])} courses and {len(data['stream_map'])} groups.")
+    for message in summary_warnings(data['summary']): print(f"   {message}")
+    return data
+
+# --- Output ---
+def iter_rows(data):
+    """
+    CSV rows (HEADER order) of a generate_dataset result, one class group at a
+    time, then one room row per lab room (only the room columns set), since lab
+    rooms belong to no class group.
+    """
+    rooms, courses, faculty = data['rooms'], data['courses'], data['faculty']
+    groups = data['groups'] if 'groups' in data else ((key, *key.rsplit('_', 1)[0].split('-', 1), key.rsplit('_', 1)[1], d['room'], d.get('size', 'N/A'), d['courses'])
+                                                      for key, d in data['stream_map'].items())
+    for key, stream, section, sem, room_name, class_size, assigned in groups:
+        room_info = rooms.get(room_name, {})
+        for course_code, faculty_name in assigned:
+            course_info, faculty_info = courses.get(course_code, {}), faculty.get(faculty_name, {})
+            yield [key, stream, section, sem, room_name, room_info.get('type', 'N/A'), room_info.get('capacity', 'N/A'), course_code, course_info.get('name', 'N/A'),
+                   course_info.get('hours_per_week', 'N/A'), course_info.get('dept', 'N/A'), course_info.get('is_lab', False), faculty_name, faculty_info.get('dept', 'N/A'), class_size]
+    for room_name, room_info in rooms.items():
+        if room_info['type'] == 'lab': yield [None] * 4 + [room_name, room_info['type'], room_info['capacity']] + [None] * (len(HEADER) - 7)
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk: yield chunk
+
+def write_dataset(data, filename, file_format=None, chunk_rows=CHUNK_ROWS):
+    """
+    Streams the rows to `filename` as CSV or Parquet (by `file_format`, else the
+    extension) in chunks of `chunk_rows`, so memory stays flat whatever the size.
+    Parquet needs pyarrow. Returns the number of rows written.
+    """
+    file_format = file_format or ('parquet' if filename.endswith('.parquet') else 'csv')
+    total_rows = 0
+    if file_format == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Writing Parquet needs pyarrow (pip install pyarrow).") from e
+        schema = pa.schema([(col, pa.int64() if col in ('room_capacity', 'course_hours_per_week', 'class_size') else pa.bool_() if col == 'is_lab' else pa.string()) for col in HEADER])
+        with pq.ParquetWriter(filename, schema) as writer:
+            for chunk in _chunks(iter_rows(data), chunk_rows):
+                columns = list(zip(*chunk))
+                writer.write_table(pa.table({col: pa.array([None if v == 'N/A' else v for v in values], type=schema.field(col).type) for col, values in zip(HEADER, columns)}, schema=schema))
+                total_rows += len(chunk)
+        return total_rows
+
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for chunk in _chunks(iter_rows(data), chunk_rows):
+            writer.writerows(chunk)
+            total_rows += len(chunk)
+    return total_rows
+
+def save_data_to_single_csv(data, filename="master_timetable_dataset.csv"):
+    if data is None: return
+    print(f"\nWriting all data to a single CSV file: {filename}...")
+    try:
+        total_rows = write_dataset(data, filename, 'csv')
+        print("\n" + "="*50 + f"\n✅ Success! Conflict-free dataset with {total_rows} rows saved to '{filename}'\n" + "="*50)
+    except Exception as e:
+        print(f"\nError: Could not write to CSV file. {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic timetable dataset, streamed to CSV or Parquet.")
+    parser.add_argument('--output', default="master_timetable_dataset.csv")
+    parser.add_argument('--format', choices=['csv', 'parquet'], help="Defaults to the output's extension.")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--streams', default=','.join(STREAMS), help="Comma-separated stream names.")
+    parser.add_argument('--sections-per-stream', type=int, default=SECTIONS_PER_STREAM)
+    parser.add_argument('--semesters', type=int, default=len(SEMESTERS), help=f"Number of semesters (at most {len(SEMESTERS)}).")
+    parser.add_argument('--faculty-per-dept', type=int, default=NUM_FACULTY_PER_DEPT, help="Default: enough for every class group.")
+    parser.add_argument('--lab-rooms', type=int, default=NUM_LAB_ROOMS)
+    parser.add_argument('--max-weekly-hours', type=int, default=MAX_WEEKLY_HOURS)
+    parser.add_argument('--shared-faculty', type=float, default=FACULTY_SHARED_SHARE, help="Share of faculty who may teach for any department.")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    start_time = time.time()
+    synthetic_data = generate_dataset(args.seed, args.streams.split(','), SEMESTERS[:args.semesters], args.sections_per_stream, args.faculty_per_dept,
+                                      args.lab_rooms, args.max_weekly_hours, args.shared_faculty)
+    total_rows = write_dataset(synthetic_data, args.output, args.format, args.chunk_rows)
+    summary = synthetic_data['summary']
+    print(f"✅ {total_rows} rows for {summary['groups'] - summary['empty_groups']} class groups written to '{args.output}' "
+          f"({os.path.getsize(args.output) / 1e6:.1f} MB) in {time.time() - start_time:.2f} seconds.")
+    for message in summary_warnings(summary): print(message)
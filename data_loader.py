@@ -0,0 +1,138 @@
+import hashlib
+import os
+import pickle
+import string
+
+import pandas as pd
+
+# ==============================================================================
+# 0. CONFIGURATION
+# ==============================================================================
+# Explicit column types: repeated names become categoricals, so a large dataset is parsed
+# once into compact integer codes instead of millions of Python strings.
+CSV_DTYPES = {
+    'stream_semester_group': 'category', 'stream': 'category', 'section': 'category', 'semester': 'category',
+    'dedicated_room': 'category', 'room_type': 'category', 'room_capacity': 'Int32',
+    'course_code': 'category', 'course_name': 'category', 'course_hours_per_week': 'Int16', 'course_department': 'category',
+    'is_lab': 'boolean', 'faculty_name': 'category', 'faculty_department': 'category', 'class_size': 'Int32',
+}
+# Parsed frames are pickled here (next to the CSV) and reused until the CSV changes
+CACHE_DIR_NAME = '.timetable_cache'
+USE_CACHE = True
+
+# ==============================================================================
+# 1. PARSING WITH A CACHE
+# ==============================================================================
+def _file_digest(filename):
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''): digest.update(block)
+    return digest.hexdigest()
+
+def _cache_path(filename):
+    directory, base = os.path.split(os.path.abspath(filename))
+    return os.path.join(directory, CACHE_DIR_NAME, f"{base}.pkl")
+
+def read_timetable_frame(filename, use_cache=None):
+    """
+    Reads the timetable CSV with CSV_DTYPES. The parsed frame is cached as a pickle
+    keyed by the file's mtime and size; when those change, the SHA-256 of the
+    content decides whether the cache is still valid (e.g. after a touch or copy),
+    so unchanged data is never parsed twice. Raises FileNotFoundError.
+    """
+    use_cache = USE_CACHE if use_cache is None else use_cache
+    stat = os.stat(filename)
+    cache_path = _cache_path(filename)
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f: meta, frame = pickle.load(f)
+            if (meta['mtime_ns'], meta['size']) == (stat.st_mtime_ns, stat.st_size): return frame
+            digest = _file_digest(filename)
+            if meta['sha256'] == digest:
+                _write_cache(cache_path, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}, frame)
+                return frame
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, ValueError):
+            pass  # unreadable or stale cache: parse again below
+
+    frame = pd.read_csv(filename, dtype=CSV_DTYPES)
+    if use_cache: _write_cache(cache_path, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': _file_digest(filename)}, frame)
+    return frame
+
+def _write_cache(cache_path, meta, frame):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temporary = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f: pickle.dump((meta, frame), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, cache_path)
+    except OSError:
+        pass  # a read-only data directory just means no cache
+
+# ==============================================================================
+# 2. VECTORIZED MAPPINGS
+# ==============================================================================
+def _group_keys(frame, group_format):
+    """Builds one key per row from a format string over column names, e.g. "{stream}-Sem{semester}"."""
+    key = pd.Series('', index=frame.index)
+    for literal, field, _, _ in string.Formatter().parse(group_format):
+        key = key + literal
+        if field: key = key + frame[field].astype(str)
+    return key
+
+def build_mappings(frame, group_format=None):
+    """
+    Turns a timetable frame into the (stream_map, courses, faculty, rooms) dicts
+    used by the solvers. Entity attributes come from de-duplicated columns (the
+    last row wins, as with a row-by-row load) and each class group's curriculum from
+    one groupby. Class groups are keyed by stream_semester_group, or by
+    `group_format` over the columns; a group's room is its first listed
+    dedicated room ('NA' if it has none), so rows without a room (activities)
+    do not hide it. Room rows (no course, see select_rows) only add rooms, such
+    as the shared lab rooms, and a group's 'size' comes from class_size.
+    """
+    room_rows = frame[frame['dedicated_room'].notna() & (frame['dedicated_room'] != 'NA')].drop_duplicates('dedicated_room', keep='last')
+    rooms = {name: {'type': room_type, 'capacity': int(capacity)}
+             for name, room_type, capacity in zip(room_rows['dedicated_room'], room_rows['room_type'], room_rows['room_capacity'])}
+    frame = frame[frame['course_code'].notna()]
+
+    course_rows = frame.drop_duplicates('course_code', keep='last')
+    courses = {code: {'name': name, 'hours_per_week': int(hours), 'dept': dept, 'is_lab': bool(is_lab)}
+               for code, name, hours, dept, is_lab in zip(course_rows['course_code'], course_rows['course_name'], course_rows['course_hours_per_week'],
+                                                          course_rows['course_department'], course_rows['is_lab'])}
+    faculty_rows = frame.drop_duplicates('faculty_name', keep='last')
+    faculty = {name: {'dept': dept} for name, dept in zip(faculty_rows['faculty_name'], faculty_rows['faculty_department'])}
+
+    group_key = frame['stream_semester_group'].astype(str) if group_format is None else _group_keys(frame, group_format)
+    course_codes, faculty_names = frame['course_code'].to_numpy(dtype=object), frame['faculty_name'].to_numpy(dtype=object)
+    home_rooms = frame['dedicated_room'].astype(object).groupby(group_key, sort=False).first()
+    sizes = frame['class_size'].groupby(group_key, sort=False).last() if 'class_size' in frame else None
+    stream_map = {}
+    for key, positions in group_key.groupby(group_key, sort=False).indices.items():
+        stream_map[key] = {'room': home_rooms[key] if pd.notna(home_rooms[key]) else 'NA', 'courses': list(zip(course_codes[positions], faculty_names[positions]))}
+        if sizes is not None and pd.notna(sizes[key]): stream_map[key]['size'] = int(sizes[key])
+    return stream_map, courses, faculty, rooms
+
+# ==============================================================================
+# 3. PUBLIC LOADER
+# ==============================================================================
+def _as_set(values):
+    return {values} if isinstance(values, str) else set(values)
+
+def select_rows(frame, semesters=None, streams=None):
+    """
+    The rows of the given semester(s) and stream(s) (a name or an iterable; None
+    keeps all). Room rows, which list a room for no class group (the lab rooms
+    every group shares), are always kept.
+    """
+    if semesters is None and streams is None: return frame
+    rows = pd.Series(True, index=frame.index)
+    if semesters is not None: rows &= frame['semester'].isin(_as_set(semesters))
+    if streams is not None: rows &= frame['stream'].isin(_as_set(streams))
+    return frame[rows | frame['stream_semester_group'].isna()]
+
+def load_timetable_data(filename, semesters=None, streams=None, group_format=None, use_cache=None):
+    """
+    Loads (stream_map, courses, faculty, rooms) from the timetable CSV, keeping
+    only the given semester(s) and stream(s), see select_rows. Parsing goes
+    through the on-disk cache, see read_timetable_frame.
+    """
+    return build_mappings(select_rows(read_timetable_frame(filename, use_cache), semesters, streams), group_format)
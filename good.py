@@ -1,92 +1,157 @@
-# timetable_solver.py
-import random
-from ortools.sat.python import cp_model
-from tabulate import tabulate
-
-# Days & Times
-days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
-times = ["10:00-11:00", "11:00-12:00", "12:00-01:00", "01:00-02:00",
-         "02:00-03:00", "03:00-04:00", "04:00-05:00"]
-
-# Subjects: (Course, Teacher, Room)
-subjects = [
-    ("CS-301", "Patel", "CR-101"),
-    ("CS-302", "Rao", "CR-101"),
-    ("CS-303", "Nath", "CR-101"),
-    ("CS-304", "Iyer", "CR-101"),
-    ("AS-301", "Sharma", "CR-101"),
-    ("LIB-301", "Coordinator", "CR-101"),
-    ("SPORT-301", "Coordinator", "LAB-002"),
-]
-
-# Extra sessions for free slots
-extra_sessions = ["Free Study", "Remedial", "PPT", "Sports"]
-
-# Build CP-SAT model
-model = cp_model.CpModel()
-
-# Decision vars
-assign = {}
-for d in range(len(days)):
-    for t in range(len(times)):
-        for s in range(len(subjects)):
-            assign[(d, t, s)] = model.NewBoolVar(f"assign_{d}_{t}_{s}")
-
-# Constraint: only one subject per slot
-for d in range(len(days)):
-    for t in range(len(times)):
-        model.Add(sum(assign[(d, t, s)] for s in range(len(subjects))) <= 1)
-
-# Constraint: no horizontal repetition (same teacher multiple times in a day)
-teachers = set([sub[1] for sub in subjects])
-for teacher in teachers:
-    for d in range(len(days)):
-        for t1 in range(len(times)):
-            for t2 in range(t1 + 1, len(times)):
-                for s1 in range(len(subjects)):
-                    for s2 in range(len(subjects)):
-                        if subjects[s1][1] == teacher and subjects[s2][1] == teacher:
-                            model.Add(assign[(d, t1, s1)] + assign[(d, t2, s2)] <= 1)
-
-# Constraint: reduce vertical repetition (avoid same subject at same slot across consecutive days)
-for t in range(len(times)):
-    for s in range(len(subjects)):
-        for d in range(len(days) - 1):
-            model.Add(assign[(d, t, s)] + assign[(d + 1, t, s)] <= 1)
-
-# Objective: maximize classes
-model.Maximize(sum(assign.values()))
-
-# Solve
-solver = cp_model.CpSolver()
-status = solver.Solve(model)
-
-# Display
-if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-    print("🗓️  DISPLAYING OPTIMIZED SOLUTION")
-    print("=" * 80)
-
-    timetable = {day: {time: None for time in times} for day in days}
-
-    for d, day in enumerate(days):
-        for t, time in enumerate(times):
-            filled = False
-            for s, subj in enumerate(subjects):
-                if solver.Value(assign[(d, t, s)]) == 1:
-                    timetable[day][time] = f"{subj[0]} | {subj[1]} | {subj[2]}"
-                    filled = True
-                    break
-            if not filled:
-                timetable[day][time] = random.choice(extra_sessions)
-
-    # Convert to table
-    headers = ["Day"] + times
-    table_data = []
-    for day in days:
-        row = [day] + [timetable[day][time] for time in times]
-        table_data.append(row)
-
-    print(tabulate(table_data, headers=headers, tablefmt="grid"))
-
-else:
-    print("❌ No feasible solution found.")
+import argparse
+import collections
+import time
+
+from ortools.sat.python import cp_model
+
+import optimize_schedule
+from optimize_schedule import DAYS, TIMESLOTS, LUNCH_SLOT_INDEX, LAB_POOL_ROOM, session_duration
+from solution_store import SolutionStore
+
+# ==============================================================================
+# 0. CONFIGURATION
+# ==============================================================================
+DATA_FILE = 'timetable_data.csv'
+SEMESTER_TO_SCHEDULE = 'III'
+# "No horizontal repetition": sessions a teacher may give one class group per day
+MAX_TEACHER_SESSIONS_PER_DAY = 1
+# "Reduce vertical repetition": a course never starts at the same slot on two consecutive days
+AVOID_VERTICAL_REPETITION = True
+# Courses get at most their weekly hours; with this they must get exactly that many
+REQUIRE_WEEKLY_HOURS = False
+# Start the search from a first-fit timetable (keeps large models from ending without any solution)
+GREEDY_HINT = True
+GOOD_TIME_LIMIT_SECONDS = 30
+GOOD_NUM_SEARCH_WORKERS = 0       # 0 lets CP-SAT use every core
+
+# ==============================================================================
+# 1. MODEL
+# ==============================================================================
+def build_good_model(stream_map, courses, faculty, rooms, max_teacher_sessions_per_day=MAX_TEACHER_SESSIONS_PER_DAY,
+                     avoid_vertical_repetition=AVOID_VERTICAL_REPETITION, require_weekly_hours=REQUIRE_WEEKLY_HOURS, greedy_hint=GREEDY_HINT, verbose=True):
+    """
+    The good.py rules for any number of class groups, on optimize_schedule's input
+    and grid: one Boolean per (class group, course, day, start slot), lab sessions
+    2 hours long in LAB_POOL_ROOM (rooms are matched afterwards, see solve_good).
+    Every rule is one sum over an index of those variables, so the model grows
+    linearly with the class groups:
+      - a class group, faculty member or room holds at most one session per slot,
+        and at most len(lab rooms) labs run per slot;
+      - a teacher gives one class group at most `max_teacher_sessions_per_day`
+        sessions a day (good.py's pairwise "no horizontal repetition");
+      - a course does not start at the same slot on consecutive days;
+      - a course gets at most (or, with `require_weekly_hours`, exactly) its
+        weekly hours.
+    The objective is the number of scheduled hours; with `greedy_hint` the
+    greedy_sessions timetable is the solution hint. Returns a built model for
+    optimize_schedule.solve_master_model.
+    """
+    build_start = time.time()
+    model = cp_model.CpModel()
+    lab_rooms = optimize_schedule.get_lab_rooms(rooms)
+
+    assignments = {}
+    by_entity_slot, lab_pool_slot = collections.defaultdict(list), collections.defaultdict(list)
+    by_teacher_day, by_course_slot, by_course = collections.defaultdict(list), collections.defaultdict(lambda: collections.defaultdict(list)), collections.defaultdict(list)
+    for stream_sem, details in stream_map.items():
+        home_room = details.get('room')
+        for course_code, faculty_name in details['courses']:
+            course_info = courses.get(course_code, {})
+            duration = session_duration(course_info)
+            room_name = LAB_POOL_ROOM if course_info.get('is_lab') else home_room if isinstance(home_room, str) and home_room != 'NA' else f"Activity_{course_code}"
+            for day_idx in range(len(DAYS)):
+                for ts_idx in range(len(TIMESLOTS) - duration + 1):
+                    if ts_idx <= LUNCH_SLOT_INDEX < ts_idx + duration: continue
+                    var = model.NewBoolVar('')
+                    assignments[(stream_sem, day_idx, ts_idx, course_code, faculty_name, room_name)] = var
+                    by_teacher_day[(stream_sem, faculty_name, day_idx)].append(var)
+                    by_course_slot[(stream_sem, course_code, ts_idx)][day_idx].append(var)
+                    by_course[(stream_sem, course_code, duration)].append(var)
+                    for covered in range(ts_idx, ts_idx + duration):
+                        by_entity_slot[('stream', stream_sem, day_idx, covered)].append(var)
+                        by_entity_slot[('faculty', faculty_name, day_idx, covered)].append(var)
+                        if room_name in rooms: by_entity_slot[('room', room_name, day_idx, covered)].append(var)
+                        if room_name == LAB_POOL_ROOM: lab_pool_slot[(day_idx, covered)].append(var)
+
+    for active_in_slot in by_entity_slot.values():
+        if len(active_in_slot) > 1: model.AddAtMostOne(active_in_slot)
+    for active_in_slot in lab_pool_slot.values():
+        if len(active_in_slot) > len(lab_rooms): model.Add(sum(active_in_slot) <= len(lab_rooms))
+    for sessions in by_teacher_day.values():
+        if len(sessions) > max_teacher_sessions_per_day: model.Add(sum(sessions) <= max_teacher_sessions_per_day)
+    if avoid_vertical_repetition:
+        # by_course_slot maps a (class group, course, start slot) to its variables per day (one per teacher of the course).
+        for by_day in by_course_slot.values():
+            for day_idx, today in by_day.items():
+                if day_idx + 1 in by_day: model.Add(sum(today) + sum(by_day[day_idx + 1]) <= 1)
+    hours = {}
+    for (stream_sem, course_code, duration), starts in by_course.items():
+        hours[(stream_sem, course_code)] = sum(starts) * duration
+        weekly = courses.get(course_code, {}).get('hours_per_week')
+        if weekly: model.Add(hours[(stream_sem, course_code)] == weekly if require_weekly_hours else hours[(stream_sem, course_code)] <= weekly)
+
+    objective = sum(hours.values())
+    model.Maximize(objective)
+    if greedy_hint: optimize_schedule.add_solution_hints({'model': model, 'assignments': assignments, 'sessions': None},
+                                                         greedy_sessions(assignments, courses, rooms, max_teacher_sessions_per_day, avoid_vertical_repetition))
+    return optimize_schedule.finish_build(model, assignments, objective, {}, build_start, 'good', verbose=verbose)
+
+def greedy_sessions(candidates, courses, rooms, max_teacher_sessions_per_day=MAX_TEACHER_SESSIONS_PER_DAY, avoid_vertical_repetition=AVOID_VERTICAL_REPETITION):
+    """
+    First-fit timetable in one pass over the candidate session keys (in order):
+    each is taken if it keeps every build_good_model rule, course hours at most
+    their weekly hours.
+    """
+    lab_capacity = len(optimize_schedule.get_lab_rooms(rooms))
+    busy, labs_running, teacher_day, starts, hours = set(), collections.Counter(), collections.Counter(), set(), collections.Counter()
+    chosen = []
+    for key in candidates:
+        ss, d, t, c, f, r = key
+        duration = session_duration(courses.get(c, {}))
+        weekly = courses.get(c, {}).get('hours_per_week')
+        cells = [(entity, d, covered) for covered in range(t, t + duration) for entity in (('stream', ss), ('faculty', f), ('room', r)) if entity[0] != 'room' or r in rooms]
+        if weekly and hours[(ss, c)] + duration > weekly: continue
+        if teacher_day[(ss, f, d)] >= max_teacher_sessions_per_day or any(cell in busy for cell in cells): continue
+        if avoid_vertical_repetition and ((ss, c, d - 1, t) in starts or (ss, c, d + 1, t) in starts): continue
+        if r == LAB_POOL_ROOM and any(labs_running[(d, covered)] >= lab_capacity for covered in range(t, t + duration)): continue
+        busy.update(cells)
+        if r == LAB_POOL_ROOM: labs_running.update((d, covered) for covered in range(t, t + duration))
+        teacher_day[(ss, f, d)] += 1
+        starts.add((ss, c, d, t))
+        hours[(ss, c)] += duration
+        chosen.append(key)
+    return chosen
+
+# ==============================================================================
+# 2. SOLVER
+# ==============================================================================
+def solve_good(stream_map, courses, faculty, rooms, time_limit=GOOD_TIME_LIMIT_SECONDS, num_search_workers=GOOD_NUM_SEARCH_WORKERS, verbose=True, **rules):
+    """
+    Builds (see build_good_model, `rules` are its keyword options) and solves the
+    model, then matches lab rooms with optimize_schedule.assign_lab_rooms.
+    Returns solve_master_model's result, with 'unplaced' lab sessions.
+    """
+    built = build_good_model(stream_map, courses, faculty, rooms, verbose=verbose, **rules)
+    result = optimize_schedule.solve_master_model(built, time_limit, num_search_workers=num_search_workers)
+    result['sessions'], result['unplaced'] = optimize_schedule.assign_lab_rooms(result['sessions'], stream_map, courses, rooms)
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fill class group timetables with the good.py rules (fast, no soft preferences).")
+    parser.add_argument('--data', default=DATA_FILE)
+    parser.add_argument('--semester', default=SEMESTER_TO_SCHEDULE, help="Semester to schedule, or 'all'.")
+    parser.add_argument('--stream', help="Only this stream (e.g. CSE).")
+    parser.add_argument('--time-limit', type=float, default=GOOD_TIME_LIMIT_SECONDS)
+    parser.add_argument('--max-per-day', type=int, default=MAX_TEACHER_SESSIONS_PER_DAY, help="Sessions a teacher may give one class group per day.")
+    args = parser.parse_args()
+
+    stream_map, courses, faculty, rooms = optimize_schedule.load_data_from_csv(args.data, None if args.semester == 'all' else args.semester, args.stream)
+    result = solve_good(stream_map, courses, faculty, rooms, args.time_limit, max_teacher_sessions_per_day=args.max_per_day)
+    if result['status'] in ('OPTIMAL', 'FEASIBLE'):
+        print(f"🗓️  DISPLAYING OPTIMIZED SOLUTION ({int(result['objective'])} hours scheduled, {result['status']}, {result['wall_time']:.2f} seconds)")
+        print("=" * 80)
+        store = SolutionStore.from_sessions(result['sessions'], courses)
+        for stream_sem in sorted(stream_map):
+            print(f"\n--- Timetable for: {stream_sem} ---\n{store.render_text(stream_sem)}")
+    else:
+        print("❌ No feasible solution found.")
@@ -1,187 +1,850 @@
-import pandas as pd
-import random
-from ortools.sat.python import cp_model
-from catboost import CatBoostClassifier, Pool
-from sklearn.preprocessing import LabelEncoder
-import numpy as np
-import time
-
-# ===============================
-# 1. LOAD DATASET
-# ===============================
-dataset_path = r"C:\Users\Asus\OneDrive\Desktop\New folder (2)\master_timetable_dataset.csv"
-df = pd.read_csv(dataset_path)
-
-# Preprocessing
-df.fillna('NA', inplace=True)
-
-# Build mappings
-streams = df['stream'].unique()
-semesters = df['semester'].unique()
-courses = {}
-faculty = {}
-rooms = {}
-
-for idx, row in df.iterrows():
-    ccode = row['course_code']
-    courses[ccode] = {
-        'name': row['course_name'],
-        'hours': row['course_hours_per_week'],
-        'dept': row['course_department'],
-        'is_lab': row['is_lab']
-    }
-    faculty[row['faculty_name']] = {'dept': row['faculty_department']}
-    rooms[row['dedicated_room']] = {
-        'type': row['room_type'],
-        'capacity': row['room_capacity']
-    }
-
-# Build stream map
-stream_map = {}
-for idx, row in df.iterrows():
-    key = f"{row['stream']}-Sem{row['semester']}"
-    if key not in stream_map:
-        stream_map[key] = {'room': row['dedicated_room'], 'courses': []}
-    stream_map[key]['courses'].append((row['course_code'], row['faculty_name']))
-
-print("✅ Stream map, courses, faculty, and rooms built successfully!")
-
-# ===============================
-# 2. TRAIN CATBOOST MODEL
-# ===============================
-def train_catboost(stream_map, courses):
-    rows = []
-    for ss, details in stream_map.items():
-        for ccode, fname in details['courses']:
-            rows.append({'stream_sem': ss, 'course': ccode, 'dept': courses[ccode]['dept']})
-
-    df_train = pd.DataFrame(rows)
-    DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-    TIMESLOTS = ['10:00-11:00','11:00-12:00','12:00-01:00','02:00-03:00','03:00-04:00','04:00-05:00']
-    df_train['slot'] = [f"{random.choice(DAYS)}_{random.choice(TIMESLOTS)}" for _ in range(len(df_train))]
-
-    encoders = {}
-    for col in ['stream_sem','course','dept','slot']:
-        le = LabelEncoder()
-        df_train[col] = le.fit_transform(df_train[col])
-        encoders[col] = le
-
-    X = df_train[['stream_sem','course','dept']]
-    y = df_train['slot']
-
-    model = CatBoostClassifier(verbose=0, iterations=50, random_seed=42)
-    model.fit(X, y)
-    return model, encoders, DAYS, TIMESLOTS
-
-cat_model, encoders, DAYS, TIMESLOTS = train_catboost(stream_map, courses)
-print("🧠 CatBoost model trained successfully!")
-
-# ===============================
-# 3. GA INDIVIDUAL AND FITNESS
-# ===============================
-def generate_random_timetable(stream_map):
-    timetable = {}
-    for ss, details in stream_map.items():
-        timetable[ss] = pd.DataFrame(index=DAYS, columns=TIMESLOTS)
-        timetable[ss].iloc[:, 3] = 'LUNCH'  # lunch slot
-        for day in DAYS:
-            fillers = ['Free Study','PPT','Sports','Remedial']
-            filler_used = False
-            for ts in TIMESLOTS:
-                if ts == '01:00-02:00': continue  # skip lunch
-                if not filler_used and random.random() < 0.1:
-                    timetable[ss].loc[day, ts] = random.choice(fillers)
-                    filler_used = True
-                else:
-                    course, fac = random.choice(details['courses'])
-                    timetable[ss].loc[day, ts] = f"{course} | {fac} | {details['room']}"
-    return timetable
-
-def fitness(timetable):
-    score = 0
-    for ss, df_tt in timetable.items():
-        # Maximize filled slots
-        score += df_tt.notna().sum().sum()
-        # Minimize repeated theory classes for same faculty
-        for fac in faculty.keys():
-            count = sum(df_tt.apply(lambda row: row.str.contains(fac) if row.notna().any() else False).sum())
-            score -= max(0, count-1)*5  # penalty for repeats
-        # Minimize fillers (>1 per day)
-        for day in DAYS:
-            fillers_today = sum(df_tt.loc[day].isin(['Free Study','PPT','Sports','Remedial']))
-            if fillers_today > 1:
-                score -= (fillers_today-1)*3
-    return score
-
-# ===============================
-# 4. CP-SAT HARD CONSTRAINT CHECK
-# ===============================
-def cp_sat_check(timetable, stream_map):
-    model = cp_model.CpModel()
-    all_vars = {}
-    for ss, df_tt in timetable.items():
-        for i, day in enumerate(DAYS):
-            for j, ts in enumerate(TIMESLOTS):
-                val = df_tt.loc[day, ts]
-                if pd.isna(val) or val=='LUNCH' or val in ['Free Study','PPT','Sports','Remedial']: 
-                    continue
-                key = f"{ss}_{day}_{ts}_{val}"
-                all_vars[key] = model.NewBoolVar(key)
-    
-    # No same faculty at same slot
-    for fac in faculty.keys():
-        for day in DAYS:
-            for ts in TIMESLOTS:
-                vars_in_slot = [v for k,v in all_vars.items() if fac in k and day in k and ts in k]
-                if vars_in_slot:
-                    model.Add(sum(vars_in_slot) <= 1)
-    
-    # Solve
-    solver = cp_model.CpSolver()
-    status = solver.Solve(model)
-    return status in [cp_model.OPTIMAL, cp_model.FEASIBLE]
-
-# ===============================
-# 5. GA LOOP
-# ===============================
-POPULATION_SIZE = 5
-GENERATIONS = 20
-
-population = [generate_random_timetable(stream_map) for _ in range(POPULATION_SIZE)]
-
-for gen in range(GENERATIONS):
-    scored = [(fitness(ind), ind) for ind in population]
-    scored.sort(reverse=True, key=lambda x:x[0])
-    best_score, best_ind = scored[0]
-    print(f"Generation {gen} Best Fitness: {best_score}")
-
-    # Crossover: take top 2 and swap days
-    p1, p2 = scored[0][1], scored[1][1]
-    child = {}
-    for ss in p1.keys():
-        df1, df2 = p1[ss], p2[ss]
-        new_df = df1.copy()
-        for day in DAYS:
-            if random.random() < 0.5:
-                new_df.loc[day] = df2.loc[day]
-        child[ss] = new_df
-    # Mutation
-    for ss in child.keys():
-        if random.random() < 0.3:
-            day = random.choice(DAYS)
-            ts = random.choice(TIMESLOTS)
-            if ts != '01:00-02:00':
-                course, fac = random.choice(stream_map[ss]['courses'])
-                child[ss].loc[day, ts] = f"{course} | {fac} | {stream_map[ss]['room']}"
-    if cp_sat_check(child, stream_map):
-        population.append(child)
-    if len(population) > POPULATION_SIZE:
-        population = population[:POPULATION_SIZE]
-
-# ===============================
-# 6. DISPLAY BEST TIMETABLE
-# ===============================
-final_tt = population[0]
-for ss, df_tt in final_tt.items():
-    print(f"\n🗓️  Timetable for {ss}")
-    print(df_tt.fillna('---').to_string())
+import argparse
+import collections
+import importlib
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import instrumentation
+from solution_store import DAYS, TIMESLOTS, LUNCH_SLOT_INDEX, SolutionStore
+
+# ===============================
+# 1. LAZY IMPORTS AND CONFIGURATION
+# ===============================
+# Importing this module does no work: pandas, OR-Tools (and optimize_schedule, which
+# builds on it), CatBoost and scikit-learn are loaded on first use or by warm_up().
+class _LazyModule:
+    """Stands in for a module until its first attribute access, then imports it and takes its place in this module."""
+    def __init__(self, name, alias):
+        self._name, self._alias = name, alias
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+pd = _LazyModule('pandas', 'pd')
+cp_model = _LazyModule('ortools.sat.python.cp_model', 'cp_model')
+optimize_schedule = _LazyModule('optimize_schedule', 'optimize_schedule')
+data_loader = _LazyModule('data_loader', 'data_loader')
+good = _LazyModule('good', 'good')
+catboost = _LazyModule('catboost', 'catboost')
+preprocessing = _LazyModule('sklearn.preprocessing', 'preprocessing')
+
+DATA_FILE = 'master_timetable_dataset.csv'
+GA_GROUP_FORMAT = "{stream}-Sem{semester}"   # GA mode: class groups are whole stream-semesters (all sections together)
+
+# ===============================
+# 2. CATBOOST SLOT PRIOR
+# ===============================
+# Learns from accepted solver timetables which (day, slot) each (class group, course,
+# department, faculty) tends to get. The predictions seed the GA population and the
+# CP-SAT hints. Cells use optimize_schedule's grid (DAYS, TIMESLOTS and LUNCH_SLOT_INDEX
+# come from solution_store, which optimize_schedule takes them from too), as does the GA.
+SLOT_PRIOR_PATH = 'slot_prior.cbm'        # the LabelEncoders are pickled next to it
+SLOT_PRIOR_FEATURES = ['stream_sem', 'course', 'dept', 'faculty']
+SLOT_PRIOR_ITERATIONS = 200
+SLOT_PRIOR_SHARE = 0.8                    # share of seeded GA cells drawn from the prior, the rest uniformly
+UNKNOWN_LABEL = '<unknown>'               # encodes feature values not seen in training
+
+def _encoders_path(path):
+    return f"{path}.encoders.pkl"
+
+def slot_training_frame(solutions, courses):
+    """One row per taught hour of the accepted timetables (lists of optimize_schedule sessions); 'slot' is the cell index."""
+    rows = []
+    for sessions in solutions:
+        for ss, d, t, c, f, r in sessions:
+            for hour in range(optimize_schedule.session_duration(courses.get(c, {}))):
+                rows.append((ss, c, courses.get(c, {}).get('dept', UNKNOWN_LABEL), f, d * len(TIMESLOTS) + t + hour))
+    return pd.DataFrame(rows, columns=SLOT_PRIOR_FEATURES + ['slot'])
+
+def _encode_column(encoder, values):
+    values = np.asarray(values, dtype=object).astype(str)
+    return encoder.transform(np.where(np.isin(values, encoder.classes_), values, UNKNOWN_LABEL))
+
+def train_slot_prior(solutions, courses, path=SLOT_PRIOR_PATH, iterations=SLOT_PRIOR_ITERATIONS):
+    """
+    Fits the slot prior on accepted timetables and saves the CatBoost model to
+    `path` with its LabelEncoders beside it (each feature encoder also knows
+    UNKNOWN_LABEL, so unseen class groups or faculty can still be scored).
+    Returns {'model', 'encoders'}.
+    """
+    frame = slot_training_frame(solutions, courses)
+    if frame.empty: raise ValueError("No sessions to train the slot prior on.")
+    encoders = {}
+    for col in SLOT_PRIOR_FEATURES:
+        encoders[col] = preprocessing.LabelEncoder().fit(np.append(frame[col].astype(str).unique(), UNKNOWN_LABEL))
+        frame[col] = encoders[col].transform(frame[col].astype(str))
+    encoders['slot'] = preprocessing.LabelEncoder().fit(frame['slot'])
+    model = catboost.CatBoostClassifier(iterations=iterations, random_seed=42, verbose=0, allow_writing_files=False, cat_features=list(range(len(SLOT_PRIOR_FEATURES))))
+    model.fit(frame[SLOT_PRIOR_FEATURES], encoders['slot'].transform(frame['slot']))
+    model.save_model(path)
+    with open(_encoders_path(path), 'wb') as f: pickle.dump(encoders, f)
+    return {'model': model, 'encoders': encoders}
+
+def load_slot_prior(path=SLOT_PRIOR_PATH):
+    """The saved {'model', 'encoders'}, or None if no prior has been trained."""
+    if not (os.path.exists(path) and os.path.exists(_encoders_path(path))): return None
+    model = catboost.CatBoostClassifier()
+    model.load_model(path)
+    with open(_encoders_path(path), 'rb') as f: encoders = pickle.load(f)
+    return {'model': model, 'encoders': encoders}
+
+def predict_slot_hours(prior, stream_map, courses):
+    """
+    Expected weekly hours of every offering (encode_problem order) in every
+    optimize_schedule cell, shape (offerings, days, slots): hours_per_week times
+    the predicted slot distribution, from a single batched predict_proba call.
+    Lunch gets nothing. An offering with no predicted mass is spread uniformly.
+    """
+    offerings = [(ss, c, courses.get(c, {}).get('dept', UNKNOWN_LABEL), f) for ss in stream_map for c, f in stream_map[ss]['courses']]
+    n_slots = len(TIMESLOTS)
+    expected = np.zeros((len(offerings), len(DAYS) * n_slots))
+    if offerings:
+        encoders = prior['encoders']
+        features = pd.DataFrame({col: _encode_column(encoders[col], values) for col, values in zip(SLOT_PRIOR_FEATURES, zip(*offerings))})
+        cells = encoders['slot'].inverse_transform(np.asarray(prior['model'].classes_).astype(int))
+        expected[:, cells] = prior['model'].predict_proba(features)
+    lunch = np.arange(expected.shape[1]) % n_slots == LUNCH_SLOT_INDEX
+    expected[:, lunch] = 0
+    expected[expected.sum(axis=1) == 0] = ~lunch
+    expected /= expected.sum(axis=1, keepdims=True)
+    hours = np.array([courses.get(c, {}).get('hours_per_week', 0) for _, c, _, _ in offerings], dtype=float)
+    return (expected * hours[:, None]).reshape(len(offerings), len(DAYS), n_slots)
+
+def prior_hint_sessions(stream_map, courses, rooms, slot_hours):
+    """
+    Greedy timetable from predict_slot_hours, used as CP-SAT hints: session starts
+    are taken in order of expected hours, skipping any that would clash with an
+    earlier one for the class group or faculty, until each course has its weekly
+    sessions. Lab rooms are then matched with assign_lab_rooms.
+    """
+    n_slots = len(TIMESLOTS)
+    offerings = [(ss, c, f) for ss in stream_map for c, f in stream_map[ss]['courses']]
+    durations = np.array([optimize_schedule.session_duration(courses.get(c, {})) for _, c, _ in offerings])
+    remaining = [courses.get(c, {}).get('hours_per_week', 0) // d for (_, c, _), d in zip(offerings, durations)]
+    # Score of starting at (d, t) = expected hours over the cells it covers (2-slot windows for labs).
+    start_score = slot_hours.copy()
+    start_score[durations == 2, :, :-1] += slot_hours[durations == 2, :, 1:]
+    start_score[durations == 2, :, -1] = 0
+    start_score[durations == 2, :, LUNCH_SLOT_INDEX - 1] = 0
+    taken, sessions, to_place = set(), [], sum(remaining)
+    for flat in np.argsort(-start_score, axis=None, kind='stable'):
+        if not to_place: break
+        o, d, t = (int(i) for i in np.unravel_index(flat, start_score.shape))
+        if not remaining[o] or t == LUNCH_SLOT_INDEX or t + durations[o] > n_slots: continue
+        ss, c, f = offerings[o]
+        if optimize_schedule.is_blocked(taken, [('stream', ss), ('faculty', f)], d, t, durations[o]): continue
+        home_room = stream_map[ss].get('room')
+        room_name = optimize_schedule.LAB_POOL_ROOM if courses.get(c, {}).get('is_lab') else home_room if isinstance(home_room, str) and home_room != 'NA' else f"Activity_{c}"
+        sessions.append((ss, d, t, c, f, room_name))
+        taken |= {(kind, name, d, t + j) for kind, name in (('stream', ss), ('faculty', f)) for j in range(durations[o])}
+        remaining[o] -= 1
+        to_place -= 1
+    return optimize_schedule.assign_lab_rooms(sessions, stream_map, courses, rooms)[0]
+
+# ===============================
+# 3. GA ENCODING AND FITNESS
+# ===============================
+# A timetable is a (streams x days x slots) int32 array. Cells hold an offering id
+# (index into the problem's offering arrays: one per (stream, course, faculty) row)
+# or one of the codes below; a population is a stack of such arrays.
+FILLERS = ['Free Study', 'PPT', 'Sports', 'Remedial']
+FILLER_PROBABILITY = 0.1
+FACULTY_REPEAT_PENALTY = 5
+EXTRA_FILLER_PENALTY = 3
+EMPTY, LUNCH = -1, -2
+LAB_LABEL = 'LAB'                 # room shown for lab offerings, whose lab room is matched after the search
+FILLER_CODES = -3 - np.arange(len(FILLERS))
+
+def encode_problem(stream_map, courses, faculty, rooms):
+    """
+    Array form of a problem for the GA. Theory offerings use their class group's
+    home room; lab offerings have no room (-1, matched after the search by
+    assign_lab_rooms) and are counted against the 'lab_capacity' lab rooms instead.
+    """
+    streams = list(stream_map)
+    offerings = [(s, c, f) for s, ss in enumerate(streams) for c, f in stream_map[ss]['courses']]
+    faculty_names = list(dict.fromkeys([*faculty, *(f for _, _, f in offerings)]))
+    room_names = [r for r in dict.fromkeys([*rooms, *(stream_map[ss]['room'] for ss in streams)]) if r != 'NA']
+    faculty_id, room_id = {f: i for i, f in enumerate(faculty_names)}, {r: i for i, r in enumerate(room_names)}
+    offering_stream = np.array([s for s, _, _ in offerings], dtype=np.int32)
+    stream_count = np.bincount(offering_stream, minlength=len(streams)).astype(np.int32)
+    offering_lab = np.array([bool(courses.get(c, {}).get('is_lab')) for _, c, _ in offerings], dtype=bool)
+    return {
+        'streams': streams, 'faculty': faculty_names, 'rooms': room_names, 'courses': [c for _, c, _ in offerings],
+        'offering_stream': offering_stream,
+        'offering_faculty': np.array([faculty_id[f] for _, _, f in offerings], dtype=np.int32),
+        'offering_room': np.array([-1 if lab else room_id.get(stream_map[streams[s]]['room'], -1) for (s, _, _), lab in zip(offerings, offering_lab)], dtype=np.int32),
+        'offering_lab': offering_lab, 'lab_capacity': sum(1 for details in rooms.values() if details['type'] == 'lab'),
+        'stream_offset': (np.cumsum(stream_count) - stream_count).astype(np.int32), 'stream_count': stream_count,
+    }
+
+def random_offerings(problem, streams, rng):
+    """One random offering id per entry of `streams` (EMPTY for a class group without courses)."""
+    count = problem['stream_count'][streams]
+    pick = problem['stream_offset'][streams] + (rng.random(streams.shape) * count).astype(np.int32)
+    return np.where(count > 0, pick, EMPTY).astype(np.int32)
+
+def prior_offerings(problem, slot_hours, size, rng):
+    """
+    `size` genomes whose cells hold an offering of the class group drawn with
+    probability proportional to its expected hours there (predict_slot_hours);
+    EMPTY where no offering of the group is expected.
+    """
+    genomes = np.full((size, len(problem['streams']), len(DAYS), len(TIMESLOTS)), EMPTY, dtype=np.int32)
+    for s, (start, count) in enumerate(zip(problem['stream_offset'], problem['stream_count'])):
+        if not count: continue
+        cumulative = np.cumsum(slot_hours[start:start + count], axis=0)
+        draws = rng.random((size, len(DAYS), len(TIMESLOTS))) * cumulative[-1]
+        picks = start + np.minimum((draws[:, None] >= cumulative[None]).sum(axis=1), count - 1)
+        genomes[:, s] = np.where(cumulative[-1] > 0, picks, EMPTY)
+    return genomes
+
+def random_population(problem, size, rng, slot_hours=None):
+    """
+    Random genomes; with `slot_hours` (see predict_slot_hours), SLOT_PRIOR_SHARE of
+    the cells are drawn from the slot prior instead of uniformly.
+    """
+    shape = (size, len(problem['streams']), len(DAYS), len(TIMESLOTS))
+    population = random_offerings(problem, np.broadcast_to(np.arange(shape[1])[None, :, None, None], shape), rng)
+    if slot_hours is not None:
+        seeded = prior_offerings(problem, slot_hours, size, rng)
+        population = np.where((rng.random(shape) < SLOT_PRIOR_SHARE) & (seeded >= 0), seeded, population)
+    # At most one filler per day, in the first slot whose draw falls under FILLER_PROBABILITY.
+    draws = rng.random(shape) < FILLER_PROBABILITY
+    draws[..., LUNCH_SLOT_INDEX] = False
+    days_with_filler = np.nonzero(draws.any(axis=3))
+    population[days_with_filler + (draws.argmax(axis=3)[days_with_filler],)] = rng.choice(FILLER_CODES, size=len(days_with_filler[0]))
+    population[..., LUNCH_SLOT_INDEX] = LUNCH
+    return population
+
+def batch_fitness(problem, population):
+    """
+    Scores a whole population at once: filled cells, minus FACULTY_REPEAT_PENALTY per
+    repeat of a faculty member within a class group's week, minus
+    EXTRA_FILLER_PENALTY per filler beyond the first on a day.
+    """
+    size, n_streams = population.shape[:2]
+    teaching = population >= 0
+    score = (population != EMPTY).sum(axis=(1, 2, 3)).astype(np.int64)
+    # Repeats = teaching cells - distinct (stream, faculty) pairs, counted on the sorted pair keys.
+    pairs = np.where(teaching, np.arange(n_streams)[None, :, None, None] * len(problem['faculty']) + problem['offering_faculty'][np.maximum(population, 0)], -1).reshape(size, -1)
+    pairs.sort(axis=1)
+    distinct = ((pairs[:, 1:] != pairs[:, :-1]) & (pairs[:, 1:] >= 0)).sum(axis=1) + (pairs[:, 0] >= 0)
+    score -= FACULTY_REPEAT_PENALTY * (teaching.reshape(size, -1).sum(axis=1) - distinct)
+    fillers_per_day = (population <= FILLER_CODES[0]).sum(axis=3)
+    score -= EXTRA_FILLER_PENALTY * np.maximum(fillers_per_day - 1, 0).sum(axis=(1, 2))
+    return score
+
+def crossover(parents_a, parents_b, rng):
+    """Each child takes every (stream, day) row from one of its two parents at random."""
+    from_b = rng.random(parents_a.shape[:3]) < 0.5
+    return np.where(from_b[..., None], parents_b, parents_a)
+
+def mutate(population, problem, rng, rate):
+    """With probability `rate` per (individual, stream), one random non-lunch cell gets a random offering."""
+    individuals, streams = np.nonzero(rng.random(population.shape[:2]) < rate)
+    days = rng.integers(len(DAYS), size=len(individuals))
+    slots = rng.choice([t for t in range(len(TIMESLOTS)) if t != LUNCH_SLOT_INDEX], size=len(individuals))
+    population[individuals, streams, days, slots] = random_offerings(problem, streams, rng)
+    return population
+
+def decode_timetable(problem, genome):
+    """Display form: {stream: DataFrame of "course | faculty | room" strings}."""
+    labels = np.array([f"{c} | {problem['faculty'][f]} | {problem['rooms'][r] if r >= 0 else LAB_LABEL if lab else 'NA'}"
+                       for c, f, r, lab in zip(problem['courses'], problem['offering_faculty'], problem['offering_room'], problem['offering_lab'])]
+                      + FILLERS[::-1] + ['LUNCH', None], dtype=object)
+    # Negative codes index from the end: EMPTY -> None, LUNCH -> 'LUNCH', fillers before them.
+    return {ss: pd.DataFrame(labels[genome[s]], index=DAYS, columns=TIMESLOTS) for s, ss in enumerate(problem['streams'])}
+
+# ===============================
+# 4. HARD CONSTRAINT (CONFLICT) CHECK
+# ===============================
+CONFLICT_PENALTY = 100
+
+def check_conflicts(problem, genome):
+    """
+    One pass over an encoded timetable: occupancy per (stream | faculty | room,
+    day, slot) is counted with bincount. Returns (ok, cells) where `cells` is an
+    (n, 3) array of the (stream, day, slot) genome cells involved in a clash, the
+    input a repair operator needs. Rooms named 'NA' are not tracked; lab cells
+    clash when more of them share a slot than there are lab rooms.
+    """
+    streams, days, slots = np.nonzero(genome >= 0)
+    offerings = genome[streams, days, slots]
+    time_index = days * len(TIMESLOTS) + slots
+    cells_per_entity = len(DAYS) * len(TIMESLOTS)
+    clashing = np.zeros(len(offerings), dtype=bool)
+    for entity, count in ((streams, len(problem['streams'])), (problem['offering_faculty'][offerings], len(problem['faculty'])),
+                          (problem['offering_room'][offerings], len(problem['rooms']))):
+        tracked = entity >= 0
+        keys = entity[tracked] * cells_per_entity + time_index[tracked]
+        clashing[tracked] |= np.bincount(keys, minlength=count * cells_per_entity)[keys] > 1
+    lab = problem['offering_lab'][offerings]
+    clashing[lab] |= np.bincount(time_index[lab], minlength=cells_per_entity)[time_index[lab]] > problem['lab_capacity']
+    return not clashing.any(), np.stack([streams, days, slots], axis=1)[clashing]
+
+def batch_conflict_counts(problem, population):
+    """
+    Number of surplus occupants of a faculty or room slot for every individual,
+    counted on sorted per-individual keys, plus the lab cells of a slot beyond the
+    lab rooms. Streams cannot clash in this encoding (one cell per stream and
+    slot), so they are not counted here.
+    """
+    size = population.shape[0]
+    teaching = population >= 0
+    offerings = np.maximum(population, 0)
+    time_index = np.arange(len(DAYS))[:, None] * len(TIMESLOTS) + np.arange(len(TIMESLOTS))[None, :]
+    counts = np.zeros(size, dtype=np.int64)
+    for entity in (problem['offering_faculty'][offerings], problem['offering_room'][offerings]):
+        keys = np.where(teaching & (entity >= 0), entity * time_index.size + time_index, -1).reshape(size, -1)
+        keys.sort(axis=1)
+        counts += ((keys[:, 1:] == keys[:, :-1]) & (keys[:, 1:] >= 0)).sum(axis=1)
+    labs_per_slot = (teaching & problem['offering_lab'][offerings]).sum(axis=1)
+    counts += np.maximum(labs_per_slot - problem['lab_capacity'], 0).sum(axis=(1, 2))
+    return counts
+
+# ===============================
+# 5. GA LOOP (ISLAND MODEL)
+# ===============================
+POPULATION_SIZE = 2000            # per island
+GENERATIONS = 20
+ELITE_COUNT = 20
+TOURNAMENT_SIZE = 3
+MUTATION_RATE = 0.3
+CROSSOVER_RATE = 0.9
+GA_SEED = 42
+# Independent populations evolve in a process pool; every MIGRATION_INTERVAL generations each
+# island sends its MIGRANTS best timetables to the next island (ring), replacing that one's worst.
+ISLANDS = os.cpu_count() or 1
+MIGRATION_INTERVAL = 5
+MIGRANTS = 5
+# Clashing cells of the best timetables are re-optimized by a small CP-SAT model each generation
+REPAIRS_PER_GENERATION = 2
+REPAIR_TIME_LIMIT_SECONDS = 2
+
+def score_population(problem, population):
+    return batch_fitness(problem, population) - CONFLICT_PENALTY * batch_conflict_counts(problem, population)
+
+def tournament(scores, count, rng):
+    entrants = rng.integers(len(scores), size=(count, TOURNAMENT_SIZE))
+    return entrants[np.arange(count), scores[entrants].argmax(axis=1)]
+
+def next_generation(problem, population, scores, rng, mutation_rate=MUTATION_RATE, crossover_rate=CROSSOVER_RATE):
+    """Keeps the ELITE_COUNT best of a score-sorted population; the rest are mutated (crossed-over) tournament winners."""
+    count = len(population) - ELITE_COUNT
+    parents_a, parents_b = population[tournament(scores, count, rng)], population[tournament(scores, count, rng)]
+    children = crossover(parents_a, parents_b, rng)
+    not_crossed = rng.random(count) >= crossover_rate
+    children[not_crossed] = parents_a[not_crossed]
+    return np.concatenate([population[:ELITE_COUNT], mutate(children, problem, rng, mutation_rate)])
+
+def _sorted_by_score(problem, population):
+    scores = score_population(problem, population)
+    order = np.argsort(-scores, kind='stable')
+    return population[order], scores[order]
+
+def run_island(args):
+    """
+    Runs `generations` generations of one island, repairing the clashes of its
+    `repairs` best timetables after each one (see repair_genome), and returns
+    (island, population sorted by score, scores, rng, history of (island,
+    generation, seconds since `start_time`, best score)). Stops at `deadline` (a
+    time.time() value, None for no limit), the repairs' solve time included.
+    Picklable in and out, so it runs in a worker process.
+    """
+    island, problem, population, rng, first_generation, generations, mutation_rate, crossover_rate, repairs, start_time, deadline = args
+    history = []
+    population, scores = _sorted_by_score(problem, population)
+    for gen in range(first_generation, first_generation + generations):
+        if deadline is not None and time.time() >= deadline: break
+        population = next_generation(problem, population, scores, rng, mutation_rate, crossover_rate)
+        population, scores = _sorted_by_score(problem, population)
+        if repairs:
+            for i in range(min(repairs, len(population))):
+                budget = REPAIR_TIME_LIMIT_SECONDS if deadline is None else min(REPAIR_TIME_LIMIT_SECONDS, deadline - time.time())
+                if budget <= 0: break
+                ok, cells = check_conflicts(problem, population[i])
+                if not ok: population[i] = repair_genome(problem, population[i], cells, budget)
+            population, scores = _sorted_by_score(problem, population)
+        history.append((island, gen, time.time() - start_time, int(scores[0])))
+    return island, population, scores, rng, history
+
+def evolve_islands(problem, islands=ISLANDS, population_size=POPULATION_SIZE, generations=GENERATIONS, mutation_rate=MUTATION_RATE,
+                   crossover_rate=CROSSOVER_RATE, migration_interval=MIGRATION_INTERVAL, migrants=MIGRANTS, seed=GA_SEED, max_workers=None,
+                   repairs=REPAIRS_PER_GENERATION, populations=None, rngs=None, first_generation=0, verbose=True, slot_hours=None, deadline=None):
+    """
+    Island-model GA: `islands` populations with their own seeds evolve side by
+    side in a process pool for `migration_interval` generations at a time, then
+    the best `migrants` of each island replace the worst of the next one. Pass a
+    previous result's 'populations' and 'rngs' (and `first_generation`) to
+    continue a run; new populations are seeded from `slot_hours` if given (see
+    random_population). With a `deadline` (a time.time() value) the islands stop
+    there, after at least sorting their populations. Returns {'best', 'score',
+    'conflicts', 'history', 'populations', 'rngs'}, where history holds (island,
+    generation, seconds, best score) for every island and generation.
+    """
+    start_time = time.time()
+    if rngs is None: rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(islands)]
+    if populations is None: populations = [random_population(problem, population_size, rng, slot_hours) for rng in rngs]
+    islands = len(populations)
+    history, done, island_seconds = [], 0, {}
+    with ProcessPoolExecutor(max_workers=max_workers or min(islands, os.cpu_count() or 1)) as pool:
+        while done < generations:
+            epoch = min(migration_interval, generations - done)
+            jobs = [(i, problem, populations[i], rngs[i], first_generation + done, epoch, mutation_rate, crossover_rate, repairs, start_time, deadline) for i in range(islands)]
+            results = sorted(pool.map(run_island, jobs) if islands > 1 else map(run_island, jobs), key=lambda r: r[0])
+            populations, rngs = [r[1] for r in results], [r[3] for r in results]
+            for r in results: history.extend(r[4])
+            for island, gen, seconds, best_score in (entry for r in results for entry in r[4]):
+                instrumentation.emit('phase', phase='ga_generation', engine='ga', seconds=seconds - island_seconds.get(island, 0), island=island,
+                                     generation=gen, best_score=best_score)
+                island_seconds[island] = seconds
+            done += epoch
+            if verbose: print(f"Generation {first_generation + done - 1} after {time.time() - start_time:.1f}s, best fitness per island: {[int(r[2][0]) for r in results]}")
+            if deadline is not None and time.time() >= deadline: break
+            if islands > 1 and done < generations:
+                elites = [population[:migrants].copy() for population in populations]
+                for i in range(islands): populations[i][-migrants:] = elites[i - 1]
+
+    best_island = max(range(islands), key=lambda i: score_population(problem, populations[i][:1])[0])
+    best = populations[best_island][0]
+    return {'best': best, 'score': int(score_population(problem, best[None])[0]), 'conflicts': len(check_conflicts(problem, best)[1]),
+            'history': history, 'populations': populations, 'rngs': rngs}
+
+# ===============================
+# 6. CP-SAT REPAIR OPERATOR
+# ===============================
+def repair_genome(problem, genome, cells=None, time_limit=REPAIR_TIME_LIMIT_SECONDS):
+    """
+    Re-optimizes only the clashing `cells` (from check_conflicts if not given) with
+    a small CP-SAT model while every other cell stays fixed. Each freed cell takes
+    at most one offering of its class group whose faculty and room are free at that
+    time, no faculty or room is used twice in a slot, no more labs run in a slot
+    than there are lab rooms, and the objective is the GA
+    fitness restricted to those cells: +1 per filled cell, FACULTY_REPEAT_PENALTY
+    per repeat of a faculty member within the class group. The current values are
+    hints. Returns a repaired copy, or the genome unchanged if no solution is found.
+    """
+    if cells is None: cells = check_conflicts(problem, genome)[1]
+    if len(cells) == 0: return genome
+    repaired = genome.copy()
+    repaired[tuple(cells.T)] = EMPTY
+    cells_per_entity = len(DAYS) * len(TIMESLOTS)
+
+    # Occupancy of the fixed cells, per faculty / room and (day, slot).
+    streams, days, slots = np.nonzero(repaired >= 0)
+    offerings = repaired[streams, days, slots]
+    time_index = days * len(TIMESLOTS) + slots
+    busy_faculty = set((problem['offering_faculty'][offerings] * cells_per_entity + time_index).tolist())
+    rooms_used = problem['offering_room'][offerings]
+    busy_rooms = set((rooms_used[rooms_used >= 0] * cells_per_entity + time_index[rooms_used >= 0]).tolist())
+    fixed_pairs = collections.Counter(zip(streams.tolist(), problem['offering_faculty'][offerings].tolist()))
+    labs_running = collections.Counter(time_index[problem['offering_lab'][offerings]].tolist())
+
+    model = cp_model.CpModel()
+    choices, by_faculty_slot, by_room_slot, by_pair = {}, collections.defaultdict(list), collections.defaultdict(list), collections.defaultdict(list)
+    by_lab_slot = collections.defaultdict(list)
+    for s, d, t in cells.tolist():
+        cell_time = d * len(TIMESLOTS) + t
+        start = problem['stream_offset'][s]
+        cell_choices = []
+        for offering in range(start, start + problem['stream_count'][s]):
+            fac, room = int(problem['offering_faculty'][offering]), int(problem['offering_room'][offering])
+            lab = bool(problem['offering_lab'][offering])
+            if fac * cells_per_entity + cell_time in busy_faculty or (room >= 0 and room * cells_per_entity + cell_time in busy_rooms): continue
+            if lab and labs_running[cell_time] >= problem['lab_capacity']: continue
+            var = model.NewBoolVar('')
+            choices[(s, d, t, offering)] = var
+            cell_choices.append(var)
+            by_faculty_slot[(fac, cell_time)].append(var)
+            if room >= 0: by_room_slot[(room, cell_time)].append(var)
+            if lab: by_lab_slot[cell_time].append(var)
+            by_pair[(s, fac)].append(var)
+            if genome[s, d, t] == offering: model.AddHint(var, 1)
+        if len(cell_choices) > 1: model.AddAtMostOne(cell_choices)
+    for group in list(by_faculty_slot.values()) + list(by_room_slot.values()):
+        if len(group) > 1: model.AddAtMostOne(group)
+    for cell_time, group in by_lab_slot.items():
+        if len(group) > problem['lab_capacity'] - labs_running[cell_time]: model.Add(sum(group) <= problem['lab_capacity'] - labs_running[cell_time])
+    repeats = []
+    for (s, fac), group in by_pair.items():
+        repeat = model.NewIntVar(0, len(group) + fixed_pairs[(s, fac)], '')
+        model.Add(repeat >= sum(group) + fixed_pairs[(s, fac)] - 1)
+        repeats.append(repeat)
+    model.Maximize(sum(choices.values()) - FACULTY_REPEAT_PENALTY * sum(repeats))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_workers = 1
+    if solver.Solve(model) not in (cp_model.OPTIMAL, cp_model.FEASIBLE): return genome
+    for (s, d, t, offering), var in choices.items():
+        if solver.Value(var): repaired[s, d, t] = offering
+    return repaired
+
+# ===============================
+# 7. GA <-> CP-SAT HYBRID LOOP
+# ===============================
+# The GA runs on the optimize_schedule problem (one class group per stream_semester_group) and grid.
+HYBRID_TIME_LIMIT_SECONDS = 120
+HYBRID_GA_GENERATIONS = 10           # per round
+HYBRID_CP_TIME_LIMIT_SECONDS = 15    # per round
+HYBRID_POPULATION_SIZE = 500
+HYBRID_ISLANDS = 1
+
+def genome_to_sessions(problem, genome, stream_map, courses, rooms):
+    """
+    optimize_schedule sessions for a genome. Consecutive cells of one lab offering
+    become one 2-hour session (a lone lab cell starts one if the next slot is
+    usable), and lab rooms are then matched with assign_lab_rooms.
+    """
+    sessions = []
+    for s, ss in enumerate(problem['streams']):
+        home_room = stream_map[ss].get('room')
+        for d in range(len(DAYS)):
+            t = 0
+            while t < len(TIMESLOTS):
+                offering = genome[s, d, t]
+                if offering < 0:
+                    t += 1
+                    continue
+                course_code, faculty_name = problem['courses'][offering], problem['faculty'][problem['offering_faculty'][offering]]
+                duration = optimize_schedule.session_duration(courses.get(course_code, {}))
+                if t + duration <= len(TIMESLOTS) and not t <= LUNCH_SLOT_INDEX < t + duration:
+                    room_name = optimize_schedule.LAB_POOL_ROOM if duration > 1 else home_room if isinstance(home_room, str) and home_room != 'NA' else f"Activity_{course_code}"
+                    sessions.append((ss, d, t, course_code, faculty_name, room_name))
+                t += duration if duration > 1 and t + 1 < len(TIMESLOTS) and genome[s, d, t + 1] == offering else 1
+    return optimize_schedule.assign_lab_rooms(sessions, stream_map, courses, rooms)[0]
+
+def sessions_to_genome(problem, sessions, courses):
+    """Encodes optimize_schedule sessions as a genome."""
+    offering_of = {(problem['streams'][s], c, problem['faculty'][f]): i
+                   for i, (s, c, f) in enumerate(zip(problem['offering_stream'], problem['courses'], problem['offering_faculty']))}
+    stream_index = {ss: s for s, ss in enumerate(problem['streams'])}
+    genome = np.full((len(problem['streams']), len(DAYS), len(TIMESLOTS)), EMPTY, dtype=np.int32)
+    genome[..., LUNCH_SLOT_INDEX] = LUNCH
+    for ss, d, t, c, f, r in sessions:
+        offering = offering_of.get((ss, c, f))
+        if offering is None: continue
+        for covered in range(t, min(t + optimize_schedule.session_duration(courses.get(c, {})), len(TIMESLOTS))):
+            if covered != LUNCH_SLOT_INDEX: genome[stream_index[ss], d, covered] = offering
+    return genome
+
+def curriculum_deviation(sessions, stream_map, courses):
+    """Total |scheduled - required| weekly hours over every (class group, course)."""
+    scheduled = collections.Counter()
+    for ss, d, t, c, f, r in sessions: scheduled[(ss, c)] += optimize_schedule.session_duration(courses.get(c, {}))
+    required = collections.Counter()
+    for ss, details in stream_map.items():
+        for c, _ in details['courses']: required[(ss, c)] = courses.get(c, {}).get('hours_per_week', 0)
+    return sum(abs(scheduled[key] - required[key]) for key in set(scheduled) | set(required))
+
+def evaluate_sessions(problem, sessions, stream_map, courses):
+    """{'objective', 'sessions', 'conflicts', 'deviation'} of a timetable: its optimize_schedule score, clash cells and curriculum deviation."""
+    return {'objective': optimize_schedule.score_sessions(sessions, stream_map, courses), 'sessions': sessions,
+            'conflicts': len(check_conflicts(problem, sessions_to_genome(problem, sessions, courses))[1]),
+            'deviation': curriculum_deviation(sessions, stream_map, courses)}
+
+def _rank(evaluated):
+    # Clash-free first, then closest to the curriculum; the score only breaks ties, since extra or clashing sessions also score.
+    return evaluated['conflicts'], evaluated['deviation'], -evaluated['objective']
+
+def solve_hybrid(stream_map, courses, faculty, rooms, time_limit=HYBRID_TIME_LIMIT_SECONDS, ga_generations=HYBRID_GA_GENERATIONS,
+                 cp_time_limit=HYBRID_CP_TIME_LIMIT_SECONDS, population_size=HYBRID_POPULATION_SIZE, islands=HYBRID_ISLANDS, seed=GA_SEED,
+                 engine='grid', use_cp_sat=True, verbose=True, prior=None, initial_sessions=None, keep=1, progress=None, search_workers=None):
+    """
+    Alternates the two engines until `time_limit`: the GA evolves `ga_generations`
+    generations, its best timetable is the AddHint warm start of a `cp_time_limit`
+    CP-SAT solve of the optimize_schedule model (built once), and the CP-SAT
+    solution is encoded back into every island, replacing its worst individual.
+    The first CP-SAT solve is hinted with `initial_sessions` (e.g. a previous
+    result) if given, else with prior_hint_sessions of a slot `prior`
+    (load_slot_prior), which also seeds the islands. Stops early once CP-SAT
+    proves a solution optimal, or when `progress` (see jobs.ProgressReporter),
+    called with every improvement, reports a cancel. The GA generations and
+    their CP-SAT repairs stop at `time_limit` too, so a first round never runs
+    past it. CP-SAT searches with `search_workers` workers (None:
+    optimize_schedule's setting). Without `use_cp_sat` only the GA runs (for
+    benchmarking).
+
+    Returns the best timetable (fewest clash cells, then smallest curriculum
+    deviation, then highest optimize_schedule score) as {'status', 'objective',
+    'sessions', 'conflicts', 'deviation', 'wall_time', 'history', 'options'},
+    with history (seconds, best score) and options the `keep` best distinct
+    clash-free timetables. If every timetable found has clashes, the status is
+    'INFEASIBLE' and there are no options; the best one is still returned for
+    diagnosis. Otherwise the status is 'FEASIBLE'.
+    """
+    start_time = time.time()
+    problem = encode_problem(stream_map, courses, faculty, rooms)
+    built = optimize_schedule.MODEL_BUILDERS[engine](stream_map, courses, faculty, rooms, verbose=False) if use_cp_sat else None
+    slot_hours = predict_slot_hours(prior, stream_map, courses) if prior is not None else None
+    hint = prior_hint_sessions(stream_map, courses, rooms, slot_hours) if prior is not None else None
+    if initial_sessions: hint = [s for s in initial_sessions if s[0] in stream_map]
+    options, history, ga = [], [], {'populations': None, 'rngs': None}
+    generation = 0
+    while not options or time.time() - start_time < time_limit:
+        ga = evolve_islands(problem, islands, population_size, ga_generations, seed=seed, populations=ga['populations'], rngs=ga['rngs'],
+                           first_generation=generation, verbose=False, slot_hours=slot_hours, deadline=start_time + time_limit)
+        generation += ga_generations
+        candidates = [genome_to_sessions(problem, ga['best'], stream_map, courses, rooms)] + ([hint] if hint is not None else [])
+        remaining, result = time_limit - (time.time() - start_time), {'status': None}
+        if use_cp_sat and remaining > 0:
+            built['model'].ClearHints()
+            optimize_schedule.add_solution_hints(built, hint if hint is not None else candidates[0])
+            result = optimize_schedule.solve_master_model(built, min(cp_time_limit, remaining), search_workers)
+            if result['sessions']:
+                candidates.append(result['sessions'])
+                migrant = sessions_to_genome(problem, result['sessions'], courses)
+                for population in ga['populations']: population[-1] = migrant
+        hint = None
+        best_before = options[0] if options else None
+        for sessions in candidates:
+            if any(set(sessions) == set(option['sessions']) for option in options): continue
+            options = sorted(options + [evaluate_sessions(problem, sessions, stream_map, courses)], key=_rank)[:keep]
+        best = options[0]
+        history.append((time.time() - start_time, best['objective']))
+        improved = best is not best_before
+        if verbose and improved: print(f"   -> Round {len(history)}: best score {best['objective']} ({best['conflicts']} clash cells, {best['deviation']} hours off) after {history[-1][0]:.1f} seconds.")
+        if progress is not None and progress({'type': 'solution', 'round': len(history), 'seconds': round(history[-1][0], 2), 'objective': best['objective'],
+                                              'conflicts': best['conflicts'], 'deviation': best['deviation']} if improved else None): break
+        if use_cp_sat and result['status'] == 'OPTIMAL': break
+
+    best = dict(options[0])
+    options = [option for option in options if option['conflicts'] == 0]
+    best.update({'status': 'FEASIBLE' if options else 'INFEASIBLE', 'wall_time': time.time() - start_time, 'history': history, 'options': options})
+    return best
+
+# ===============================
+# 8. BENCHMARK: GA vs CP-SAT vs HYBRID
+# ===============================
+def benchmark_engines(stream_map, courses, faculty, rooms, time_limit=HYBRID_TIME_LIMIT_SECONDS, engine='grid', seed=GA_SEED, prior=None):
+    """
+    Runs GA-only, CP-SAT-only and the hybrid loop on the same data with the same
+    time budget (and the same slot `prior` seeding, if any) and prints the
+    optimize_schedule score, clash cells, deviation from the curriculum's weekly
+    hours and wall time of each.
+    """
+    rows = []
+    for name in ('GA only', 'CP-SAT only', 'hybrid'):
+        print(f"\n⏱️  Benchmark: {name} ({time_limit}s budget)")
+        if name == 'CP-SAT only':
+            start_time = time.time()
+            built = optimize_schedule.MODEL_BUILDERS[engine](stream_map, courses, faculty, rooms, verbose=False)
+            if prior is not None: optimize_schedule.add_solution_hints(built, prior_hint_sessions(stream_map, courses, rooms, predict_slot_hours(prior, stream_map, courses)))
+            solved = optimize_schedule.solve_master_model(built, max(0.1, time_limit - (time.time() - start_time)))
+            result = evaluate_sessions(encode_problem(stream_map, courses, faculty, rooms), solved['sessions'], stream_map, courses)
+            result['wall_time'] = time.time() - start_time
+        else:
+            result = solve_hybrid(stream_map, courses, faculty, rooms, time_limit, seed=seed, engine=engine, use_cp_sat=(name == 'hybrid'), prior=prior)
+        rows.append({'engine': name, 'score': result['objective'], 'clash_cells': result['conflicts'], 'hours_deviation': result['deviation'],
+                     'seconds': round(result['wall_time'], 1)})
+    print("\n--- Engine comparison (score = optimize_schedule objective) ---\n" + pd.DataFrame(rows).to_string(index=False))
+    return rows
+
+# ===============================
+# 9. SERVICE ENTRY POINT
+# ===============================
+# Datasets a request may name instead of sending rows, and what warm_up() preloads
+SERVED_DATASETS = {'master': DATA_FILE, 'sample': 'timetable_data.csv'}
+WARM_UP_DATASETS = ['master']
+GENERATE_TIME_LIMIT_SECONDS = 180
+GENERATE_MAX_TIME_LIMIT_SECONDS = 600
+GENERATE_OPTIONS = 3
+
+_slot_priors, _frames = {}, {}   # per-process caches, filled by warm_up() or first use
+
+def get_slot_prior(path=SLOT_PRIOR_PATH):
+    if path not in _slot_priors: _slot_priors[path] = load_slot_prior(path)
+    return _slot_priors[path]
+
+def get_dataset_frame(name):
+    if name not in SERVED_DATASETS: raise ValueError(f"Unknown dataset '{name}'; expected one of {sorted(SERVED_DATASETS)}.")
+    if name not in _frames: _frames[name] = data_loader.read_timetable_frame(SERVED_DATASETS[name])
+    return _frames[name]
+
+def warm_up(datasets=None, prior_path=SLOT_PRIOR_PATH):
+    """
+    Worker-process initializer: imports the heavy libraries and loads the slot
+    prior and the served `datasets` (default WARM_UP_DATASETS) once, so the first
+    request does not pay for them. Returns {step: milliseconds}.
+    """
+    timings, start = {}, time.perf_counter()
+    for module in (pd, np, cp_model, optimize_schedule, data_loader):
+        getattr(module, '__name__')
+    timings['imports'] = (time.perf_counter() - start) * 1000
+    if os.path.exists(prior_path):
+        start = time.perf_counter()
+        get_slot_prior(prior_path)
+        timings['slot_prior'] = (time.perf_counter() - start) * 1000
+    for name in WARM_UP_DATASETS if datasets is None else datasets:
+        start = time.perf_counter()
+        try: get_dataset_frame(name)
+        except (OSError, ValueError): continue  # a missing dataset fails the requests that name it, not the worker
+        timings[f"dataset:{name}"] = (time.perf_counter() - start) * 1000
+    return timings
+
+def payload_to_problem(data):
+    """
+    (stream_map, courses, faculty, rooms) of a request: inline 'rows' with the
+    timetable CSV's columns, or a served 'dataset' by name; either is narrowed by
+    the optional 'semester' and 'streams'. Raises ValueError.
+    """
+    if data.get('rows'):
+        frame = pd.DataFrame(data['rows'])
+        missing = set(data_loader.CSV_DTYPES) - {'class_size'} - set(frame.columns)
+        if missing: raise ValueError(f"Rows are missing the columns {sorted(missing)}.")
+        frame = frame.astype({col: dtype for col, dtype in data_loader.CSV_DTYPES.items() if col in frame.columns})
+    elif data.get('dataset'): frame = get_dataset_frame(data['dataset'])
+    else: raise ValueError("Send either 'rows' or a 'dataset' name.")
+    return data_loader.build_mappings(data_loader.select_rows(frame, data.get('semester'), data.get('streams')))
+
+def _warm_start_sessions(previous):
+    # A previous generate_timetable_hybrid result (list of options): its best option's sessions.
+    if not previous or not isinstance(previous, list) or not previous[0].get('sessions'): return None
+    return [(s['class_group'], s['day_index'], s['slot_index'], s['course'], s['faculty'], s['room']) for s in previous[0]['sessions']]
+
+# 'engine' option of a request: the hybrid loop on one of optimize_schedule's models, or FAST_ENGINE
+FAST_ENGINE = 'good'
+
+def solve_fast(stream_map, courses, faculty, rooms, time_limit, progress=None, search_workers=None):
+    """
+    The good.py engine (hard rules only, no GA) in solve_hybrid's result format,
+    with its single timetable as the only option ('INFEASIBLE' and no option if
+    CP-SAT finds none or it has clashes); fast on small requests such as one
+    class group.
+    """
+    solved = good.solve_good(stream_map, courses, faculty, rooms, time_limit, good.GOOD_NUM_SEARCH_WORKERS if search_workers is None else search_workers, verbose=False)
+    best = evaluate_sessions(encode_problem(stream_map, courses, faculty, rooms), solved['sessions'], stream_map, courses)
+    if progress is not None: progress({'type': 'solution', 'round': 1, 'seconds': round(solved['wall_time'], 2), 'objective': best['objective'],
+                                       'conflicts': best['conflicts'], 'deviation': best['deviation']})
+    feasible = solved['status'] in ('OPTIMAL', 'FEASIBLE') and best['conflicts'] == 0
+    return best | {'status': 'FEASIBLE' if feasible else 'INFEASIBLE', 'wall_time': solved['wall_time'], 'history': [(solved['wall_time'], best['objective'])],
+                   'options': [best] if feasible else []}
+
+def generate_timetable_hybrid(data, progress=None, search_workers=None):
+    """
+    Entry point of the API. `data` holds the input (see payload_to_problem), an
+    optional 'options' dict ('time_limit' seconds, 'count' of timetables, 'engine',
+    'seed') and optionally a 'warm_start' (a previous result for a similar input).
+    Runs solve_hybrid with the process's slot prior (or solve_fast for the
+    FAST_ENGINE), reporting improvements through `progress` (see
+    jobs.ProgressReporter) and with CP-SAT on `search_workers` workers (see
+    jobs.search_workers_per_job), and returns the best distinct clash-free
+    timetables, best first, as JSON-ready dicts. Raises ValueError on bad input
+    and RuntimeError if no clash-free timetable is found (unless the job was
+    cancelled, which returns no options).
+    """
+    options = data.get('options') or {}
+    time_limit = float(options.get('time_limit', GENERATE_TIME_LIMIT_SECONDS))
+    if not 0 < time_limit <= GENERATE_MAX_TIME_LIMIT_SECONDS: raise ValueError(f"time_limit must be in (0, {GENERATE_MAX_TIME_LIMIT_SECONDS}] seconds.")
+    engine = options.get('engine', 'grid')
+    engines = sorted([*optimize_schedule.MODEL_BUILDERS, FAST_ENGINE])
+    if engine not in engines: raise ValueError(f"Unknown engine '{engine}'; expected one of {engines}.")
+    # Phase events go to the job's event stream too, as {'type': 'metric', ...}, for the server's /metrics.
+    forward = (lambda record: progress({'type': 'metric'} | record)) if progress is not None else None
+    with instrumentation.labels(forward, engine=engine if engine == FAST_ENGINE else f"hybrid-{engine}"):
+        with instrumentation.phase('load') as info:
+            stream_map, courses, faculty, rooms = payload_to_problem(data)
+            info['class_groups'] = len(stream_map)
+        if not stream_map: raise ValueError("The request selects no class groups.")
+
+        with instrumentation.labels(size=instrumentation.size_class(len(stream_map))):
+            with instrumentation.phase('generate', time_limit=time_limit) as info:
+                if engine == FAST_ENGINE: result = solve_fast(stream_map, courses, faculty, rooms, time_limit, progress, search_workers)
+                else: result = solve_hybrid(stream_map, courses, faculty, rooms, time_limit, seed=int(options.get('seed', GA_SEED)), engine=engine, verbose=False,
+                                            prior=get_slot_prior(), initial_sessions=_warm_start_sessions(data.get('warm_start')),
+                                            keep=int(options.get('count', GENERATE_OPTIONS)), progress=progress, search_workers=search_workers)
+                info.update({'rounds': len(result['history']), 'objective': result['objective'], 'clash_cells': result['conflicts']})
+            if result['status'] == 'INFEASIBLE' and not (progress is not None and progress(None)):
+                raise RuntimeError(f"No clash-free timetable found in {time_limit:g} seconds; the best one had {result['conflicts']} clash cells "
+                                   f"and {result['deviation']} hours off the curriculum.")
+            with instrumentation.phase('render', sessions=sum(len(option['sessions']) for option in result['options'])):
+                return [{'rank': rank, 'score': option['objective'], 'clash_cells': option['conflicts'], 'hours_deviation': option['deviation'],
+                         'sessions': list(SolutionStore.from_sessions(option['sessions'], courses).records())} for rank, option in enumerate(result['options'], start=1)]
+
+def measure_cold_start(modules=('hybrid', 'app')):
+    """
+    Milliseconds to import each of `modules` in a fresh interpreter, and to run
+    warm_up() after importing hybrid; a module that fails to import reports its
+    error instead.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    script = "import time, json; start = time.perf_counter(); import {module}; print(json.dumps({{'import_ms': (time.perf_counter() - start) * 1000{extra}}}))"
+    measurements = {}
+    for module, extra in [(m, '') for m in modules] + [('hybrid', ", 'warm_up_ms': hybrid.warm_up()")]:
+        run = subprocess.run([sys.executable, '-c', script.format(module=module, extra=extra)], cwd=here, capture_output=True, text=True)
+        label = module if not extra else 'hybrid + warm_up'
+        measurements[label] = json.loads(run.stdout.strip().splitlines()[-1]) if run.returncode == 0 else {'error': (run.stderr.strip().splitlines() or ['?'])[-1]}
+    return measurements
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Evolve timetables with the island-model GA, alone or together with CP-SAT.")
+    parser.add_argument('--mode', choices=['ga', 'hybrid', 'benchmark', 'startup'], default='ga',
+                        help="ga: GA alone; hybrid: GA <-> CP-SAT loop; benchmark: GA vs CP-SAT vs hybrid; startup: cold-start times of hybrid and app.")
+    parser.add_argument('--data', default=DATA_FILE)
+    parser.add_argument('--semester', default='all', help="Semester to schedule, or 'all' for every semester in the file.")
+    parser.add_argument('--time-limit', type=float, default=HYBRID_TIME_LIMIT_SECONDS, help="Seconds per engine in the hybrid and benchmark modes.")
+    parser.add_argument('--islands', type=int, default=ISLANDS)
+    parser.add_argument('--population', type=int, default=POPULATION_SIZE, help="Population size per island.")
+    parser.add_argument('--generations', type=int, default=GENERATIONS)
+    parser.add_argument('--mutation-rate', type=float, default=MUTATION_RATE)
+    parser.add_argument('--crossover-rate', type=float, default=CROSSOVER_RATE)
+    parser.add_argument('--migration-interval', type=int, default=MIGRATION_INTERVAL)
+    parser.add_argument('--migrants', type=int, default=MIGRANTS)
+    parser.add_argument('--repairs', type=int, default=REPAIRS_PER_GENERATION, help="Best timetables per island repaired by CP-SAT each generation.")
+    parser.add_argument('--seed', type=int, default=GA_SEED)
+    parser.add_argument('--prior', default=SLOT_PRIOR_PATH, help="Saved slot prior used to seed the search (ignored if it does not exist).")
+    parser.add_argument('--no-prior', action='store_true', help="Start from random timetables even if a slot prior exists.")
+    parser.add_argument('--train-prior', nargs='+', metavar='SOLUTION',
+                        help="Train the slot prior on these accepted timetables (JSON from --save-solution, courses from --data) and save it to --prior.")
+    args = parser.parse_args()
+
+    if args.mode == 'startup':
+        for module, timings in measure_cold_start().items(): print(f"⏱️  {module}: {json.dumps(timings)}")
+        raise SystemExit
+    if args.train_prior:
+        train_courses = optimize_schedule.load_data_from_csv(args.data, None)[1]
+        train_slot_prior([optimize_schedule.load_sessions(f) for f in args.train_prior], train_courses, args.prior)
+        print(f"🧠 Slot prior trained on {len(args.train_prior)} timetable(s) and saved to '{args.prior}'.")
+        raise SystemExit
+    slot_prior = None if args.no_prior else load_slot_prior(args.prior)
+    if slot_prior is not None: print(f"🧠 Seeding the search from the slot prior in '{args.prior}'.")
+
+    if args.mode != 'ga':
+        data = optimize_schedule.load_data_from_csv(args.data, None if args.semester == 'all' else args.semester)
+        if args.mode == 'benchmark': benchmark_engines(*data, time_limit=args.time_limit, seed=args.seed, prior=slot_prior)
+        else:
+            result = solve_hybrid(*data, time_limit=args.time_limit, seed=args.seed, prior=slot_prior)
+            print(f"\n🏆 Hybrid score {result['objective']}: {len(result['sessions'])} sessions, {result['conflicts']} cells in clashes, "
+                  f"{result['deviation']} hours off the curriculum, {result['wall_time']:.1f} seconds.")
+            optimize_schedule.print_master_timetable(result, data[0], data[1])
+        raise SystemExit
+
+    stream_map, courses, faculty, rooms = data_loader.load_timetable_data(args.data, None if args.semester == 'all' else args.semester, group_format=GA_GROUP_FORMAT)
+    ga_problem = encode_problem(stream_map, courses, faculty, rooms)
+    ga = evolve_islands(ga_problem, args.islands, args.population, args.generations, args.mutation_rate, args.crossover_rate,
+                        args.migration_interval, args.migrants, args.seed, repairs=args.repairs,
+                        slot_hours=predict_slot_hours(slot_prior, stream_map, courses) if slot_prior is not None else None)
+
+    # ===============================
+    # 10. DISPLAY BEST TIMETABLE
+    # ===============================
+    print("\n--- Best fitness against wall-clock time per island ---")
+    history_df = pd.DataFrame(ga['history'], columns=['island', 'generation', 'seconds', 'best_fitness'])
+    progress = history_df.pivot(index='generation', columns='island', values='best_fitness')
+    progress.insert(0, 'seconds', history_df.groupby('generation')['seconds'].max().round(1))
+    print(progress.to_string())
+    final_tt = decode_timetable(ga_problem, ga['best'])
+    print(f"\n🏆 Best fitness: {ga['score']} ({ga['conflicts']} cells in clashes)")
+    for ss, df_tt in final_tt.items():
+        print(f"\n🗓️  Timetable for {ss}")
+        print(df_tt.fillna('---').to_string())
@@ -0,0 +1,191 @@
+import bisect
+import collections
+import contextlib
+import contextvars
+import json
+import logging
+import threading
+import time
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# ==============================================================================
+# 0. CONFIGURATION
+# ==============================================================================
+# Every event is logged as one JSON line on this logger (INFO); configure logging to see them
+METRICS_LOGGER = 'timetable.metrics'
+# Histogram buckets (upper bounds; +Inf is implicit)
+SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+MODEL_SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7)
+GAP_BUCKETS = (0, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1)
+# Dataset size classes by number of class groups, the 'size' label of every metric
+SIZE_CLASSES = ((1, '1'), (10, '2-10'), (50, '11-50'), (200, '51-200'), (1000, '201-1000'))
+LARGEST_SIZE_CLASS = '1000+'
+
+logger = logging.getLogger(METRICS_LOGGER)
+
+# ==============================================================================
+# 1. STRUCTURED EVENTS
+# ==============================================================================
+# Labels and listeners of the current solve; see labels().
+_labels = contextvars.ContextVar('instrumentation_labels', default={})
+_listeners = contextvars.ContextVar('instrumentation_listeners', default=())
+
+def size_class(class_groups):
+    """The 'size' label for a dataset of `class_groups` class groups."""
+    return next((label for bound, label in SIZE_CLASSES if class_groups <= bound), LARGEST_SIZE_CLASS)
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None where `resource` is unavailable)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None
+
+@contextlib.contextmanager
+def labels(listener=None, **values):
+    """
+    Adds `values` (e.g. engine='grid', size=size_class(n)) to every event emitted
+    inside the block, in this thread, and passes each event to `listener` too
+    (e.g. to forward it to the parent process of a job).
+    """
+    label_token = _labels.set(_labels.get() | values)
+    listener_token = _listeners.set(_listeners.get() + ((listener,) if listener is not None else ()))
+    try:
+        yield
+    finally:
+        _listeners.reset(listener_token)
+        _labels.reset(label_token)
+
+def ingest(record):
+    """Logs an event record and adds it to the process's metrics registry (for events emitted elsewhere)."""
+    logger.info(json.dumps(record, default=str))
+    registry.record(record)
+
+def emit(event, **fields):
+    """Emits one structured event: {'event', 'time', current labels..., fields...}. Returns the record."""
+    record = {'event': event, 'time': time.time()} | _labels.get() | fields
+    ingest(record)
+    for listener in _listeners.get(): listener(record)
+    return record
+
+@contextlib.contextmanager
+def phase(name, **fields):
+    """
+    Times the block and emits a 'phase' event with its `name`, 'seconds', the
+    process's 'peak_rss_mb' and `fields`; the block can add fields to the
+    yielded dict. An exception is recorded as the event's 'error' and re-raised.
+    """
+    info, start = dict(fields), time.perf_counter()
+    try:
+        yield info
+    except BaseException as e:
+        info['error'] = type(e).__name__
+        raise
+    finally:
+        emit('phase', phase=name, seconds=time.perf_counter() - start, peak_rss_mb=peak_rss_mb(), **info)
+
+def solver_stats(solver, status):
+    """CP-SAT response statistics of a solve that ended with `status`: conflicts, branches, wall and user time, objective, best bound and relative gap."""
+    stats = {'conflicts': solver.NumConflicts(), 'branches': solver.NumBranches(), 'wall_time': solver.WallTime(), 'user_time': solver.UserTime(),
+             'objective': None, 'best_bound': None, 'gap': None}
+    if solver.StatusName(status) in ('OPTIMAL', 'FEASIBLE'):
+        stats['objective'], stats['best_bound'] = solver.ObjectiveValue(), solver.BestObjectiveBound()
+        stats['gap'] = abs(stats['best_bound'] - stats['objective']) / max(1.0, abs(stats['objective']))
+    return stats
+
+# ==============================================================================
+# 2. PROMETHEUS-STYLE REGISTRY
+# ==============================================================================
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms keyed by (name, labels), rendered in the
+    Prometheus text exposition format. record() turns the events above into
+    metrics labelled by phase, engine and dataset size. Thread-safe.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters, self.gauges = collections.defaultdict(float), {}
+        self.histograms, self.help = {}, {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, help=None, **labels):
+        with self.lock:
+            self.help.setdefault(name, ('counter', help))
+            self.counters[self._key(name, labels)] += value
+
+    def set(self, name, value, help=None, **labels):
+        with self.lock:
+            self.help.setdefault(name, ('gauge', help))
+            self.gauges[self._key(name, labels)] = value
+
+    def set_max(self, name, value, help=None, **labels):
+        with self.lock:
+            self.help.setdefault(name, ('gauge', help))
+            key = self._key(name, labels)
+            self.gauges[key] = max(value, self.gauges.get(key, value))
+
+    def observe(self, name, value, buckets=SECONDS_BUCKETS, help=None, **labels):
+        with self.lock:
+            self.help.setdefault(name, ('histogram', help))
+            key = self._key(name, labels)
+            if key not in self.histograms: self.histograms[key] = {'buckets': tuple(buckets), 'counts': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0}
+            histogram = self.histograms[key]
+            histogram['counts'][bisect.bisect_left(histogram['buckets'], value)] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def record(self, record):
+        """Updates the metrics for one emit() record; events other than 'phase' are only counted."""
+        if record.get('event') != 'phase':
+            self.inc('timetable_events_total', help="Structured events by type.", event=record.get('event'))
+            return
+        size = record.get('size') or (size_class(record['class_groups']) if record.get('class_groups') else 'unknown')
+        labels = {'phase': record['phase'], 'engine': record.get('engine') or 'none', 'size': size}
+        self.observe('timetable_phase_seconds', record['seconds'], help="Duration of a solve phase.", **labels)
+        if record.get('error'): self.inc('timetable_phase_errors_total', help="Phases that raised.", **labels)
+        if record.get('peak_rss_mb') is not None:
+            self.set_max('timetable_peak_rss_megabytes', record['peak_rss_mb'], help="Largest process peak RSS seen at the end of a phase.", **labels)
+        if record.get('variables') is not None and record['phase'] == 'build':
+            self.observe('timetable_model_variables', record['variables'], MODEL_SIZE_BUCKETS, help="CP-SAT model variables.", **labels)
+            self.observe('timetable_model_constraints', record['constraints'], MODEL_SIZE_BUCKETS, help="CP-SAT model constraints.", **labels)
+        if record.get('status') is not None:
+            self.inc('timetable_solver_status_total', help="Solves by final status.", status=record['status'], **labels)
+        if record.get('conflicts') is not None:
+            self.inc('timetable_solver_conflicts_total', record['conflicts'], help="CP-SAT search conflicts.", **labels)
+            self.inc('timetable_solver_branches_total', record['branches'], help="CP-SAT search branches.", **labels)
+        if record.get('gap') is not None:
+            self.observe('timetable_solver_gap', record['gap'], GAP_BUCKETS, help="Relative gap between objective and best bound at the end of a solve.", **labels)
+
+    def render(self):
+        """The registry in the Prometheus text exposition format (version 0.0.4)."""
+        def series(name, labels, extra=()):
+            pairs = list(labels) + list(extra)
+            return name + '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}' if pairs else name
+        lines = []
+        with self.lock:
+            by_name = collections.defaultdict(list)
+            for store in (self.counters, self.gauges, self.histograms):
+                for (name, labels), value in store.items(): by_name[name].append((labels, value))
+            for name in sorted(by_name):
+                kind, help = self.help[name]
+                if help: lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(by_name[name], key=lambda item: item[0]):
+                    if kind != 'histogram':
+                        lines.append(f"{series(name, labels)} {value:g}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(list(value['buckets']) + ['+Inf'], value['counts']):
+                        cumulative += count
+                        lines.append(f"{series(name + '_bucket', labels, [('le', bound if bound == '+Inf' else f'{bound:g}')])} {cumulative}")
+                    lines.append(f"{series(name + '_sum', labels)} {value['sum']:g}")
+                    lines.append(f"{series(name + '_count', labels)} {value['count']}")
+        return '\n'.join(lines) + '\n'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+registry = MetricsRegistry()
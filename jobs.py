@@ -0,0 +1,186 @@
+import collections
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+# ==============================================================================
+# 0. CONFIGURATION
+# ==============================================================================
+# Admission control: a few solves run at a time, a bounded number wait. Each job's CP-SAT
+# search gets an equal share of the cores (see search_workers_per_job), not all of them.
+MAX_CONCURRENT_SOLVES = min(4, os.cpu_count() or 1)
+MAX_QUEUED_JOBS = 4 * MAX_CONCURRENT_SOLVES
+JOB_RETENTION_SECONDS = 3600      # finished jobs are forgotten after this long
+EVENT_POLL_TIMEOUT_SECONDS = 30   # longest a long-poll for new events waits
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when MAX_QUEUED_JOBS jobs are already waiting."""
+
+# ==============================================================================
+# 1. WORKER SIDE
+# ==============================================================================
+class ProgressReporter:
+    """
+    Passed to the job's target as `progress`. Calling it with a dict (e.g.
+    {'type': 'solution', 'objective': ...}) publishes an event to the job's
+    stream; the return value is True once the job has been cancelled, so the
+    target can stop early and return its best result so far. Picklable.
+    """
+    def __init__(self, job_id, events, cancelled):
+        self.job_id, self.events, self.cancelled = job_id, events, cancelled
+
+    def __call__(self, event=None):
+        if event is not None: self.events.put((self.job_id, dict(event)))
+        return self.is_cancelled()
+
+    def is_cancelled(self):
+        return self.job_id in self.cancelled
+
+def search_workers_per_job(max_workers):
+    """CP-SAT search workers for each of `max_workers` concurrent jobs, so together they use the cores once."""
+    return max(1, (os.cpu_count() or 1) // max_workers)
+
+def _run_job(target, job_id, data, events, cancelled, search_workers):
+    progress = ProgressReporter(job_id, events, cancelled)
+    if progress({'type': 'started'}): return None  # cancelled while already handed to this worker
+    return target(data, progress=progress, search_workers=search_workers)
+
+# ==============================================================================
+# 2. JOB QUEUE
+# ==============================================================================
+class JobQueue:
+    """
+    Runs `target(data, progress=..., search_workers=...)` for submitted payloads
+    in a pool of `max_workers` processes, each job limited to its share of the
+    cores (search_workers_per_job), and keeps per-job status, result and a
+    numbered event stream for status, result, cancellation and long-poll /
+    server-sent-events endpoints. `initializer` runs once in every worker process (e.g. to preload
+    models); `on_success(job)` runs in the parent for every job that succeeds and
+    `on_event(job, event)` for every event published, 'finished' included.
+    """
+    def __init__(self, target, max_workers=None, max_queued=None, initializer=None, on_success=None, on_event=None):
+        self.target, self.on_success, self.on_event = target, on_success, on_event
+        self.max_workers = max_workers or MAX_CONCURRENT_SOLVES
+        self.search_workers = search_workers_per_job(self.max_workers)
+        self.max_queued = MAX_QUEUED_JOBS if max_queued is None else max_queued
+        self.jobs, self.condition = {}, threading.Condition()
+        self.manager = multiprocessing.get_context('spawn').Manager()
+        self.events, self.cancelled = self.manager.Queue(), self.manager.dict()
+        self.pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'), initializer=initializer)
+        self.collector = threading.Thread(target=self._collect_events, name='job-events', daemon=True)
+        self.collector.start()
+
+    def submit(self, data, key=None):
+        """
+        Queues a job and returns its id at once. A job with the same `key` (e.g. a
+        cache key of the input) that is still queued or running is reused instead.
+        Raises QueueFull when too many jobs are waiting.
+        """
+        with self.condition:
+            self._forget_old_jobs()
+            if key is not None:
+                active = next((j for j, job in self.jobs.items() if job['key'] == key and job['status'] not in FINISHED_STATES), None)
+                if active is not None: return active
+            if sum(job['status'] == QUEUED for job in self.jobs.values()) >= self.max_queued:
+                raise QueueFull(f"{self.max_queued} jobs are already waiting; try again later.")
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {'id': job_id, 'key': key, 'data': data, 'status': QUEUED, 'submitted': time.time(), 'started': None, 'finished': None,
+                                 'events': [], 'result': None, 'error': None, 'future': None}
+        future = self.pool.submit(_run_job, self.target, job_id, data, self.events, self.cancelled, self.search_workers)
+        with self.condition: self.jobs[job_id]['future'] = future
+        # Completion goes through the event queue too, so it is recorded after the job's last progress event.
+        future.add_done_callback(lambda f: self.events.put((job_id, None)))
+        return job_id
+
+    def status(self, job_id):
+        """Public view of a job: id, status, timestamps, event count and error. KeyError if unknown."""
+        with self.condition:
+            job = self.jobs[job_id]
+            return {key: job[key] for key in ('id', 'status', 'submitted', 'started', 'finished', 'error')} | {'events': len(job['events'])}
+
+    def result(self, job_id):
+        """(status, result); the result is the target's return value, None until the job succeeds or stops after a cancel."""
+        with self.condition:
+            job = self.jobs[job_id]
+            return job['status'], job['result']
+
+    def counts(self):
+        """Number of known jobs per status."""
+        with self.condition:
+            return dict(collections.Counter(job['status'] for job in self.jobs.values()))
+
+    def cancel(self, job_id):
+        """
+        Cancels a job: a queued one never starts, a running one is asked to stop
+        through its ProgressReporter. Returns the job's status afterwards; a
+        running job reports 'cancelled' with its 'finished' event once it stops.
+        """
+        with self.condition:
+            job = self.jobs[job_id]
+            if job['status'] in FINISHED_STATES: return job['status']
+            self.cancelled[job_id] = True
+            future = job['future']
+        if future is not None and future.cancel(): return CANCELLED
+        return self.status(job_id)['status']
+
+    def wait_events(self, job_id, after=0, timeout=EVENT_POLL_TIMEOUT_SECONDS):
+        """
+        Long-poll: the job's events numbered above `after` (each event carries its
+        'seq'), waiting up to `timeout` seconds for one if there are none yet and
+        the job is still going. Returns (events, finished).
+        """
+        with self.condition:
+            job = self.jobs[job_id]
+            self.condition.wait_for(lambda: len(job['events']) > after or job['status'] in FINISHED_STATES, timeout=timeout)
+            return job['events'][after:], job['status'] in FINISHED_STATES
+
+    def stream_events(self, job_id, after=0):
+        """Yields the job's events as they arrive until its 'finished' event (for server-sent events)."""
+        while True:
+            events, finished = self.wait_events(job_id, after)
+            yield from events
+            after += len(events)
+            if finished: return
+
+    def shutdown(self, wait=True):
+        self.pool.shutdown(wait=wait, cancel_futures=True)
+        self.events.put(None)
+        self.collector.join()
+        self.manager.shutdown()
+
+    def _publish(self, job, event):
+        # Callers hold self.condition.
+        job['events'].append({'seq': len(job['events']) + 1, 'time': time.time()} | event)
+        self.condition.notify_all()
+
+    def _collect_events(self):
+        for job_id, event in iter(self.events.get, None):
+            with self.condition:
+                job = self.jobs.get(job_id)
+                if job is None or job['status'] in FINISHED_STATES: continue
+                if event is None: self._finish(job)
+                else:
+                    if event.get('type') == 'started': job['status'], job['started'] = RUNNING, time.time()
+                    self._publish(job, event)
+            if self.on_event is not None: self.on_event(job, job['events'][-1])
+            if event is None and job['status'] == SUCCEEDED and self.on_success is not None: self.on_success(job)
+
+    def _finish(self, job):
+        # Callers hold self.condition.
+        future = job['future']
+        if future.cancelled(): job['status'] = CANCELLED
+        elif future.exception() is not None: job['status'], job['error'] = FAILED, str(future.exception())
+        else: job['status'], job['result'] = CANCELLED if job['id'] in self.cancelled else SUCCEEDED, future.result()
+        job['finished'] = time.time()
+        self.cancelled.pop(job['id'], None)
+        self._publish(job, {'type': 'finished', 'status': job['status'], 'error': job['error']})
+
+    def _forget_old_jobs(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [j for j, job in self.jobs.items() if job['status'] in FINISHED_STATES and job['finished'] < cutoff]: del self.jobs[job_id]
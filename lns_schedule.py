@@ -0,0 +1,190 @@
+import argparse
+import collections
+import random
+import time
+
+from optimize_schedule import (DAYS, TIMESLOTS, LUNCH_SLOT_INDEX, MODEL_BUILDERS, load_data_from_csv, session_duration, get_lab_rooms,
+                               is_blocked, occupied_cells, freeze_sessions, add_solution_hints, solve_master_model, score_sessions,
+                               print_master_timetable, save_sessions, load_sessions)
+
+# ==============================================================================
+# 0. SCRIPT CONFIGURATION
+# ==============================================================================
+DATA_FILE = 'master_timetable_dataset.csv'
+SEMESTER_TO_SCHEDULE = 'all'
+
+LNS_TIME_LIMIT_SECONDS = 300
+LNS_SUBPROBLEM_TIME_LIMIT_SECONDS = 10
+LNS_MAX_FREE_STREAMS = 8
+LNS_LAB_BLOCK_SIZE = 10
+LNS_NEIGHBOURHOODS = ['department', 'day', 'faculty', 'lab_block']
+LNS_RANDOM_SEED = 42
+LNS_ENGINE = 'grid'
+
+# ==============================================================================
+# 1. GREEDY STARTING SOLUTION
+# ==============================================================================
+def greedy_initial_sessions(stream_map, courses, rooms):
+    """
+    Places sessions one by one in the first free (day, slot, room), busiest class
+    groups and lab courses first, rotating the starting day so repeats of a course
+    spread over the week. Sessions that do not fit are left out; the LNS places
+    them when their class group is re-optimized.
+    """
+    lab_rooms = get_lab_rooms(rooms)
+    taken, sessions = set(), []
+    weekly_hours = lambda ss: sum(courses.get(c, {}).get('hours_per_week', 0) for c, _ in stream_map[ss]['courses'])
+    for stream_sem in sorted(stream_map, key=weekly_hours, reverse=True):
+        home_room = stream_map[stream_sem].get('room')
+        for course_code, faculty_name in sorted(stream_map[stream_sem]['courses'], key=lambda cf: not courses.get(cf[0], {}).get('is_lab')):
+            course_info = courses.get(course_code, {})
+            duration = session_duration(course_info)
+            if course_info.get('is_lab'): candidate_rooms = lab_rooms
+            elif isinstance(home_room, str) and home_room != 'NA': candidate_rooms = [home_room]
+            else: candidate_rooms = [f"Activity_{course_code}"]
+
+            for n in range(course_info.get('hours_per_week', 0) // duration):
+                placement = None
+                for k in range(len(DAYS)):
+                    day_idx = (len(sessions) + n + k) % len(DAYS)
+                    for ts_idx in range(len(TIMESLOTS) - duration + 1):
+                        if ts_idx <= LUNCH_SLOT_INDEX < ts_idx + duration: continue
+                        room_name = next((r for r in candidate_rooms if not is_blocked(taken, [('stream', stream_sem), ('faculty', faculty_name), ('room', r)], day_idx, ts_idx, duration)), None)
+                        if room_name is not None:
+                            placement = (stream_sem, day_idx, ts_idx, course_code, faculty_name, room_name)
+                            break
+                    if placement: break
+                if placement:
+                    sessions.append(placement)
+                    taken |= occupied_cells([placement], courses, rooms)
+    return sessions
+
+# ==============================================================================
+# 2. NEIGHBOURHOODS
+# ==============================================================================
+# Each returns (free class groups, free day indexes or None for the whole week).
+def _department_neighbourhood(rng, index, sessions, max_free):
+    streams = index['streams_by_dept'][rng.choice(sorted(index['streams_by_dept']))]
+    return set(rng.sample(streams, min(max_free, len(streams)))), None
+
+def _day_neighbourhood(rng, index, sessions, max_free):
+    streams = index['all_streams']
+    return set(rng.sample(streams, min(max_free, len(streams)))), set(rng.sample(range(len(DAYS)), 2))
+
+def _faculty_neighbourhood(rng, index, sessions, max_free):
+    # Grow a cluster of class groups linked through the faculty who teach them.
+    pending, seen_faculty, free = collections.deque([rng.choice(sorted(index['streams_by_faculty']))]), set(), set()
+    while pending and len(free) < max_free:
+        fac = pending.popleft()
+        if fac in seen_faculty: continue
+        seen_faculty.add(fac)
+        for ss in index['streams_by_faculty'][fac]:
+            if len(free) >= max_free: break
+            free.add(ss)
+            pending.extend(index['faculty_by_stream'][ss])
+    return free, None
+
+def _lab_block_neighbourhood(rng, index, sessions, max_free):
+    lab_rooms = index['lab_rooms']
+    first = rng.randrange(max(1, len(lab_rooms) - LNS_LAB_BLOCK_SIZE + 1))
+    block = set(lab_rooms[first:first + LNS_LAB_BLOCK_SIZE])
+    streams = sorted({s[0] for s in sessions if s[5] in block})
+    if not streams: return _department_neighbourhood(rng, index, sessions, max_free)
+    return set(rng.sample(streams, min(max_free, len(streams)))), None
+
+NEIGHBOURHOOD_BUILDERS = {'department': _department_neighbourhood, 'day': _day_neighbourhood, 'faculty': _faculty_neighbourhood, 'lab_block': _lab_block_neighbourhood}
+
+def _build_index(stream_map, rooms):
+    index = {'all_streams': sorted(stream_map), 'streams_by_dept': collections.defaultdict(list), 'streams_by_faculty': collections.defaultdict(list),
+             'faculty_by_stream': {}, 'lab_rooms': sorted(get_lab_rooms(rooms))}
+    for stream_sem, details in sorted(stream_map.items()):
+        index['streams_by_dept'][stream_sem.split('-')[0]].append(stream_sem)
+        index['faculty_by_stream'][stream_sem] = sorted({f for _, f in details['courses']})
+        for fac in index['faculty_by_stream'][stream_sem]: index['streams_by_faculty'][fac].append(stream_sem)
+    return index
+
+# ==============================================================================
+# 3. LNS DRIVER
+# ==============================================================================
+def missing_hours(sessions, stream_map, courses):
+    """Weekly course hours of the class groups in `stream_map` that `sessions` leave unplaced."""
+    placed = collections.Counter()
+    for ss, d, t, c, f, r in sessions: placed[(ss, c)] += session_duration(courses.get(c, {}))
+    required = {(ss, c): courses.get(c, {}).get('hours_per_week', 0) for ss, details in stream_map.items() for c, _ in details['courses']}
+    return sum(max(0, hours - placed[key]) for key, hours in required.items())
+
+def run_lns(stream_map, courses, faculty, rooms, initial_sessions=None, time_limit=LNS_TIME_LIMIT_SECONDS, sub_time_limit=LNS_SUBPROBLEM_TIME_LIMIT_SECONDS,
+            max_free_streams=LNS_MAX_FREE_STREAMS, neighbourhoods=LNS_NEIGHBOURHOODS, engine=LNS_ENGINE, seed=LNS_RANDOM_SEED):
+    """
+    Large-neighbourhood search around the optimize_schedule model. Starting from
+    `initial_sessions` (or the greedy solution), each iteration frees the class
+    groups of one neighbourhood, builds a CP-SAT sub-model over just those groups
+    with every cell used by the fixed sessions blocked (sessions that cannot fit are
+    left unplaced rather than making it infeasible), hints it with the current
+    placement and accepts the result if the full timetable is no worse by
+    (unplaced hours, score): a candidate that places fewer hours is never taken.
+    The status is 'PARTIAL' while any weekly hours are still unplaced (see
+    'missing_hours'). The sub-model size depends on the neighbourhood, not on
+    the dataset, so the cost per iteration stays flat as class groups are added.
+    """
+    rng = random.Random(seed)
+    index = _build_index(stream_map, rooms)
+    start_time = time.time()
+    current = list(initial_sessions) if initial_sessions is not None else greedy_initial_sessions(stream_map, courses, rooms)
+    current_score = score_sessions(current, stream_map, courses)
+    current_missing = missing_hours(current, stream_map, courses)
+    history = [(time.time() - start_time, current_score)]
+    print(f"\n🔎 LNS start: {len(current)} sessions placed ({current_missing} hours unplaced), score {current_score} after {history[0][0]:.2f} seconds.")
+
+    iteration, accepted = 0, 0
+    while time.time() - start_time < time_limit:
+        kind = neighbourhoods[iteration % len(neighbourhoods)]
+        iteration += 1
+        free_streams, free_days = NEIGHBOURHOOD_BUILDERS[kind](rng, index, current, max_free_streams)
+        if not free_streams: continue
+
+        fixed = [s for s in current if s[0] not in free_streams]
+        current_free = [s for s in current if s[0] in free_streams]
+        built = MODEL_BUILDERS[engine]({ss: stream_map[ss] for ss in free_streams}, courses, faculty, rooms,
+                                       blocked=occupied_cells(fixed, courses, rooms), allow_partial=True, verbose=False)
+        if free_days is not None: freeze_sessions(built, [s for s in current_free if s[1] not in free_days])
+        add_solution_hints(built, current_free)
+        budget = min(sub_time_limit, max(0.1, time_limit - (time.time() - start_time)))
+        result = solve_master_model(built, budget)
+        if result['status'] not in ('OPTIMAL', 'FEASIBLE'): continue
+
+        candidate = fixed + result['sessions']
+        candidate_score = score_sessions(candidate, stream_map, courses)
+        candidate_missing = missing_hours(candidate, stream_map, courses)
+        if (-candidate_missing, candidate_score) >= (-current_missing, current_score):
+            accepted += 1
+            if (-candidate_missing, candidate_score) > (-current_missing, current_score):
+                history.append((time.time() - start_time, candidate_score))
+                print(f"   -> [{kind}] iteration {iteration}: score {current_score} -> {candidate_score}, unplaced hours {current_missing} -> {candidate_missing} after {history[-1][0]:.2f} seconds.")
+            current, current_score, current_missing = candidate, candidate_score, candidate_missing
+
+    wall_time = time.time() - start_time
+    print(f"\n✅ LNS complete in {wall_time:.2f} seconds: {iteration} iterations, {accepted} accepted, best score {current_score}, {current_missing} hours unplaced.")
+    return {'status': 'PARTIAL' if current_missing else 'FEASIBLE', 'objective': current_score, 'missing_hours': current_missing, 'sessions': current,
+            'history': history, 'iterations': iteration, 'wall_time': wall_time}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Improve a master timetable by large-neighbourhood search.")
+    parser.add_argument('--data', default=DATA_FILE)
+    parser.add_argument('--semester', default=SEMESTER_TO_SCHEDULE, help="Semester to schedule, or 'all' for every semester in the file.")
+    parser.add_argument('--time-limit', type=float, default=LNS_TIME_LIMIT_SECONDS)
+    parser.add_argument('--sub-time-limit', type=float, default=LNS_SUBPROBLEM_TIME_LIMIT_SECONDS)
+    parser.add_argument('--max-free-streams', type=int, default=LNS_MAX_FREE_STREAMS)
+    parser.add_argument('--neighbourhood', action='append', choices=sorted(NEIGHBOURHOOD_BUILDERS), help="Neighbourhood kinds to cycle through (repeatable).")
+    parser.add_argument('--engine', choices=sorted(MODEL_BUILDERS), default=LNS_ENGINE)
+    parser.add_argument('--seed', type=int, default=LNS_RANDOM_SEED)
+    parser.add_argument('--start-from', help="Previous solution (JSON from --save-solution) to start from instead of the greedy one.")
+    parser.add_argument('--save-solution', help="Write the best sessions to this JSON file.")
+    parser.add_argument('--show', action='store_true', help="Print every class group's timetable at the end.")
+    args = parser.parse_args()
+
+    stream_map, courses, faculty, rooms = load_data_from_csv(args.data, None if args.semester == 'all' else args.semester)
+    result = run_lns(stream_map, courses, faculty, rooms, load_sessions(args.start_from) if args.start_from else None, args.time_limit, args.sub_time_limit,
+                     args.max_free_streams, args.neighbourhood or LNS_NEIGHBOURHOODS, args.engine, args.seed)
+    if args.save_solution: save_sessions(args.save_solution, result['sessions'])
+    if args.show: print_master_timetable(result, stream_map, courses)
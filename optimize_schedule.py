@@ -1,186 +1,1381 @@
-import pandas as pd
-import collections
-from ortools.sat.python import cp_model
-import time
-import sys
-
-# ==============================================================================
-# 0. SCRIPT CONFIGURATION
-# ==============================================================================
-DATA_FILE = 'timetable_data.csv'
-SEMESTER_TO_SCHEDULE = 'III'
-
-# --- Soft Constraint (Preference) Scoring ---
-FILLED_SLOT_REWARD = 100
-GAP_PENALTY = 30
-DAY_UNDERLOAD_PENALTY = 50
-MIN_HOURS_PER_DAY = 3
-FACULTY_CONSECUTIVE_PENALTY = 80 
-MAX_CONSECUTIVE_FACULTY_HOURS = 2
-# NEW: Penalty for scheduling the same subject multiple times on the same day
-SUBJECT_REPETITION_PENALTY = 75
-
-# --- Solver Controls ---
-SOLVER_TIME_LIMIT_SECONDS = 180
-
-# ==============================================================================
-# 1. DATA LOADING FUNCTION
-# ==============================================================================
-def load_data_from_csv(filename, semester_filter):
-    print(f"🔄 Loading data from '{filename}'...")
-    try:
-        df = pd.read_csv(filename)
-    except FileNotFoundError:
-        print(f"❌ ERROR: Data file '{filename}' not found. Please run the data generation script first.")
-        sys.exit(1)
-
-    print(f"   -> Filtering for Semester: '{semester_filter}'")
-    df = df[df['semester'] == semester_filter].copy()
-    if df.empty:
-        print(f"❌ ERROR: No data found for semester '{semester_filter}'.")
-        sys.exit(1)
-
-    courses, faculty, rooms, stream_map = {}, {}, {}, collections.defaultdict(lambda: {'room': '', 'courses': []})
-    for _, row in df.iterrows():
-        courses[row['course_code']] = {'name': row['course_name'], 'hours_per_week': int(row['course_hours_per_week']), 'dept': row['course_department'], 'is_lab': bool(row['is_lab'])}
-        faculty[row['faculty_name']] = {'dept': row['faculty_department']}
-        if pd.notna(row['dedicated_room']) and row['dedicated_room'] != 'NA':
-            rooms[row['dedicated_room']] = {'type': row['room_type'], 'capacity': int(row['room_capacity'])}
-        stream_map[row['stream_semester_group']]['room'] = row['dedicated_room']
-        stream_map[row['stream_semester_group']]['courses'].append((row['course_code'], row['faculty_name']))
-        
-    print(f"   -> Successfully loaded {len(stream_map)} class groups for this semester.")
-    return dict(stream_map), courses, faculty, rooms
-
-# ==============================================================================
-# 2. MAIN TIMETABLE OPTIMIZER FUNCTION
-# ==============================================================================
-def generate_master_timetable(stream_map, courses, faculty, rooms):
-    model = cp_model.CpModel()
-    
-    DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-    TIMESLOTS = ['10:00-11:00', '11:00-12:00', '12:00-01:00', '01:00-02:00', '02:00-03:00', '03:00-04:00', '04:00-05:00']
-    LUNCH_SLOT_INDEX = 3
-    lab_rooms = [r for r, d in rooms.items() if d['type'] == 'lab']
-    if not lab_rooms: 
-        lab_rooms = ['LAB-001']
-        rooms['LAB-001'] = {'type': 'lab', 'capacity': 30}
-    
-    assignments = {}
-    for stream_sem, details in stream_map.items():
-        home_room = details.get('room')
-        for course_code, faculty_name in details['courses']:
-            course_info = courses.get(course_code, {})
-            is_lab = course_info.get('is_lab', False)
-            duration = 2 if is_lab else 1
-            possible_rooms = lab_rooms if is_lab else [home_room]
-            
-            for room_name in possible_rooms:
-                if pd.isna(room_name) or room_name == 'NA': room_name = f"Activity_{course_code}"
-                for day_idx in range(len(DAYS)):
-                    for ts_idx in range(len(TIMESLOTS) - duration + 1):
-                        if ts_idx == LUNCH_SLOT_INDEX or (duration == 2 and ts_idx + 1 == LUNCH_SLOT_INDEX): continue
-                        key = (stream_sem, day_idx, ts_idx, course_code, faculty_name, room_name)
-                        assignments[key] = model.NewBoolVar(str(key))
-
-    # --- Hard Constraints ---
-    for stream_sem, details in stream_map.items():
-        for course_code, _ in details['courses']:
-            course_info = courses.get(course_code, {})
-            duration = 2 if course_info.get('is_lab', False) else 1
-            possible_slots = [var for (ss, d, t, c, f, r), var in assignments.items() if ss == stream_sem and c == course_code]
-            if course_info.get('hours_per_week'): model.Add(sum(possible_slots) * duration == course_info['hours_per_week'])
-
-    all_stream_sems, all_faculty, all_rooms = stream_map.keys(), faculty.keys(), rooms.keys()
-    for entity_list, get_entity_func in [(all_stream_sems, lambda k: k[0]), (all_faculty, lambda k: k[4]), (all_rooms, lambda k: k[5])]:
-        for entity_name in entity_list:
-            for day_idx in range(len(DAYS)):
-                for ts_idx in range(len(TIMESLOTS)):
-                    model.Add(sum(var for key, var in assignments.items() if get_entity_func(key) == entity_name and key[1] == day_idx and key[2] <= ts_idx < key[2] + (2 if courses.get(key[3], {}).get('is_lab') else 1)) <= 1)
-
-    # --- Soft Constraints ---
-    total_score = []
-    for stream_sem in all_stream_sems:
-        all_courses_for_stream = list(set(c[0] for c in stream_map[stream_sem]['courses']))
-        for day_idx in range(len(DAYS)):
-            daily_slots_busy = []
-            for ts_idx in range(len(TIMESLOTS)):
-                if ts_idx == LUNCH_SLOT_INDEX: continue
-                is_busy = model.NewBoolVar(f'ss_busy_{stream_sem}_{day_idx}_{ts_idx}')
-                active_in_slot = [var for (ss, d, t, c, f, r), var in assignments.items() if ss == stream_sem and d == day_idx and t <= ts_idx < t + (2 if courses.get(c, {}).get('is_lab') else 1)]
-                model.Add(sum(active_in_slot) >= 1).OnlyEnforceIf(is_busy)
-                model.Add(sum(active_in_slot) == 0).OnlyEnforceIf(is_busy.Not())
-                daily_slots_busy.append(is_busy)
-                total_score.append(is_busy * FILLED_SLOT_REWARD)
-            
-            daily_hours_sum = sum(daily_slots_busy)
-            for i in range(len(daily_slots_busy) - 2):
-                is_gap = model.NewBoolVar(f'gap_{stream_sem}_{day_idx}_{i}')
-                model.AddBoolAnd([daily_slots_busy[i], daily_slots_busy[i+1].Not(), daily_slots_busy[i+2]]).OnlyEnforceIf(is_gap)
-                total_score.append(-is_gap * GAP_PENALTY)
-            
-            is_underloaded = model.NewBoolVar(f'underload_{stream_sem}_{day_idx}')
-            model.Add(daily_hours_sum > 0).OnlyEnforceIf(is_underloaded)
-            model.Add(daily_hours_sum < MIN_HOURS_PER_DAY).OnlyEnforceIf(is_underloaded)
-            total_score.append(-is_underloaded * DAY_UNDERLOAD_PENALTY)
-            
-            # --- NEW: Penalty for scheduling the same subject multiple times on the same day ---
-            for course in all_courses_for_stream:
-                if courses[course].get('is_lab'): continue 
-                
-                times_scheduled_today = model.NewIntVar(0, 5, f'count_{stream_sem}_{day_idx}_{course}')
-                model.Add(times_scheduled_today == sum(var for (ss, d, t, c, f, r), var in assignments.items() if ss == stream_sem and d == day_idx and c == course))
-                
-                # Penalize if it's scheduled more than once (the excess count)
-                # This penalizes the 2nd, 3rd, etc. occurrence of the subject on the same day.
-                repetition_count = model.NewIntVar(0, 4, f'rep_{stream_sem}_{day_idx}_{course}')
-                model.Add(repetition_count >= times_scheduled_today - 1)
-                model.Add(repetition_count >= 0)
-                total_score.append(-repetition_count * SUBJECT_REPETITION_PENALTY)
-
-    for fac in all_faculty:
-        for day_idx in range(len(DAYS)):
-            faculty_schedule = []
-            for ts_idx in range(len(TIMESLOTS)):
-                if ts_idx == LUNCH_SLOT_INDEX: faculty_schedule.append(model.NewConstant(0)); continue
-                is_fac_busy = model.NewBoolVar(f'fac_busy_{fac}_{day_idx}_{ts_idx}')
-                active_in_slot = [var for (ss, d, t, c, f, r), var in assignments.items() if f == fac and d == day_idx and t <= ts_idx < t + (2 if courses.get(c, {}).get('is_lab') else 1)]
-                model.Add(sum(active_in_slot) >= 1).OnlyEnforceIf(is_fac_busy)
-                model.Add(sum(active_in_slot) == 0).OnlyEnforceIf(is_fac_busy.Not())
-                faculty_schedule.append(is_fac_busy)
-            
-            window_size = MAX_CONSECUTIVE_FACULTY_HOURS + 1
-            for i in range(len(faculty_schedule) - window_size + 1):
-                if i <= LUNCH_SLOT_INDEX < i + window_size: continue
-                is_overloaded = model.NewBoolVar(f'consecutive_{fac.replace(" ", "")}_{day_idx}_{i}')
-                model.AddBoolAnd(faculty_schedule[i : i + window_size]).OnlyEnforceIf(is_overloaded)
-                total_score.append(-is_overloaded * FACULTY_CONSECUTIVE_PENALTY)
-
-    model.Maximize(sum(total_score))
-
-    # --- Solve and Display ---
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = SOLVER_TIME_LIMIT_SECONDS
-    print(f"\n🧠 Starting timetable optimization for Semester '{SEMESTER_TO_SCHEDULE}'...")
-    start_time = time.time()
-    status = solver.Solve(model)
-    end_time = time.time()
-    
-    print(f"\n✅ Search complete in {end_time - start_time:.2f} seconds. Solver status: {solver.StatusName(status)}")
-    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        print("\n" + "="*80 + f"\n🗓️  DISPLAYING OPTIMIZED SOLUTION (Highest Score: {solver.ObjectiveValue()})\n" + "="*80)
-        for stream_sem in sorted(list(stream_map.keys())):
-            df = pd.DataFrame(index=DAYS, columns=TIMESLOTS).fillna("--")
-            df.iloc[:, LUNCH_SLOT_INDEX] = "LUNCH"
-            for (ss, d, t, c, f, r), var in assignments.items():
-                if ss == stream_sem and solver.Value(var):
-                    entry = f"{c}\n{f.split(' ')[-1]}\n{r}"
-                    for j in range(2 if courses.get(c, {}).get('is_lab', False) else 1):
-                        if t + j < len(TIMESLOTS): df.iloc[d, t + j] = entry
-            print(f"\n--- Timetable for: {stream_sem} ---\n{df.to_string()}")
-    else:
-        print("\nCould not find a feasible solution.")
-
-if __name__ == '__main__':
-    stream_map, courses, faculty, rooms = load_data_from_csv(DATA_FILE, SEMESTER_TO_SCHEDULE)
-    generate_master_timetable(stream_map, courses, faculty, rooms)
\ No newline at end of file
+import pandas as pd
+import numpy as np
+import collections
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import heapq
+import os
+from ortools.sat.python import cp_model
+import time
+import sys
+import argparse
+import queue
+import threading
+import json
+from data_loader import load_timetable_data
+import instrumentation
+from solution_store import DAYS, TIMESLOTS, LUNCH_SLOT_INDEX, SolutionStore
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# ==============================================================================
+# 0. SCRIPT CONFIGURATION
+# ==============================================================================
+DATA_FILE = 'timetable_data.csv'
+SEMESTER_TO_SCHEDULE = 'III'
+
+# --- Soft Constraint (Preference) Scoring ---
+FILLED_SLOT_REWARD = 100
+GAP_PENALTY = 30
+DAY_UNDERLOAD_PENALTY = 50
+MIN_HOURS_PER_DAY = 3
+FACULTY_CONSECUTIVE_PENALTY = 80 
+MAX_CONSECUTIVE_FACULTY_HOURS = 2
+# NEW: Penalty for scheduling the same subject multiple times on the same day
+SUBJECT_REPETITION_PENALTY = 75
+
+# Each weight scales one named term of the objective; sweep_objective_weights re-weights a built model.
+OBJECTIVE_TERMS = {'FILLED_SLOT_REWARD': 'filled_slots', 'GAP_PENALTY': 'gaps', 'DAY_UNDERLOAD_PENALTY': 'underloaded_days',
+                   'FACULTY_CONSECUTIVE_PENALTY': 'faculty_overloads', 'SUBJECT_REPETITION_PENALTY': 'subject_repetitions'}
+
+# Reward per previously published session kept in place during an incremental re-solve
+SESSION_STABILITY_REWARD = 40
+
+# --- Solver Controls ---
+SOLVER_TIME_LIMIT_SECONDS = 180
+SOLVER_NUM_SEARCH_WORKERS = 0     # 0 lets CP-SAT use every core
+SOLVER_RANDOM_SEED = None
+SOLVER_LOG_SEARCH_PROGRESS = False
+# Early stopping: relative gap to the best bound, and seconds without an improving solution
+SOLVER_RELATIVE_GAP_LIMIT = None
+SOLVER_NO_IMPROVEMENT_SECONDS = None
+# Capacity pre-check before model building; the conflict search adds a short assumption-based CP-SAT run
+PRECHECK_CAPACITY = True
+PRECHECK_FIND_CONFLICTS = False
+PRECHECK_CORE_TIME_LIMIT_SECONDS = 10
+INCREMENTAL_TIME_LIMIT_SECONDS = 30
+# Solve independent class-group components in separate processes (see generate_master_timetable_parallel)
+PARALLEL_COMPONENTS = False
+MAX_PARALLEL_WORKERS = os.cpu_count() or 1
+# Model encoding: 'grid' (one Boolean per room x day x start slot), 'compact' (the grid on integer ids and NumPy
+# arrays, see build_compact_model) or 'interval' (NoOverlap over start variables, a smaller model
+# that only weighs filled slots and subject repetitions, see PARTIAL_OBJECTIVE_ENGINES)
+MODEL_ENGINE = 'grid'
+# Give CP-SAT variables readable names (handy when dumping a model, costly at full scale)
+MODEL_VARIABLE_NAMES = True
+
+# ==============================================================================
+# 1. DATA LOADING FUNCTION
+# ==============================================================================
+def load_data_from_csv(filename, semester_filter, stream_filter=None):
+    print(f"🔄 Loading data from '{filename}'...")
+    if semester_filter is not None: print(f"   -> Filtering for Semester: '{semester_filter}'")
+    if stream_filter is not None: print(f"   -> Filtering for Stream: '{stream_filter}'")
+    try:
+        with instrumentation.phase('load', source=filename) as info:
+            stream_map, courses, faculty, rooms = load_timetable_data(filename, semester_filter, stream_filter)
+            info['class_groups'] = len(stream_map)
+    except FileNotFoundError:
+        print(f"❌ ERROR: Data file '{filename}' not found. Please run the data generation script first.")
+        sys.exit(1)
+    if not stream_map:
+        print(f"❌ ERROR: No data found for semester '{semester_filter}'.")
+        sys.exit(1)
+
+    print(f"   -> Successfully loaded {len(stream_map)} class groups{' for this semester' if semester_filter is not None else ''}.")
+    return stream_map, courses, faculty, rooms
+
+# ==============================================================================
+# 2. MODEL BUILDER
+# ==============================================================================
+# The weekly grid (DAYS, TIMESLOTS, LUNCH_SLOT_INDEX) is defined once in solution_store, see the imports.
+
+# Placeholder room for lab sessions when lab rooms are pooled and assigned after the time-slot solve
+LAB_POOL_ROOM = 'LAB-POOL'
+
+def session_duration(course_info):
+    return 2 if course_info.get('is_lab', False) else 1
+
+def get_lab_rooms(rooms):
+    # A placeholder lab room only for callers that pass no rooms at all; with real rooms and no lab among them, labs have nowhere to go.
+    lab_rooms = [r for r, d in rooms.items() if d['type'] == 'lab']
+    if not lab_rooms and not rooms:
+        lab_rooms = ['LAB-001']
+        rooms['LAB-001'] = {'type': 'lab', 'capacity': 30}
+    return lab_rooms
+
+def is_blocked(blocked, entities, day_idx, ts_idx, duration):
+    return bool(blocked) and any((kind, name, day_idx, t) in blocked for kind, name in entities for t in range(ts_idx, ts_idx + duration))
+
+def occupied_cells(sessions, courses, rooms):
+    """The ('stream' | 'faculty' | 'room', name, day, slot) cells taken by `sessions`, usable as `blocked`."""
+    cells = set()
+    for ss, d, t, c, f, r in sessions:
+        for covered in range(t, t + session_duration(courses.get(c, {}))):
+            cells.add(('stream', ss, d, covered))
+            cells.add(('faculty', f, d, covered))
+            if r in rooms: cells.add(('room', r, d, covered))
+    return cells
+
+def build_master_model(stream_map, courses, faculty, rooms, pool_lab_rooms=False, blocked=None, allow_partial=False, verbose=True, named_variables=None):
+    """
+    Creates every decision variable exactly once and files it into lookup indexes
+    keyed by (stream, course), (entity, day, covered slot), (faculty, day) and
+    (stream, day, course), so that each constraint below is built from a direct
+    index lookup instead of a scan over all assignments.
+
+    With pool_lab_rooms, lab sessions are placed in LAB_POOL_ROOM and only limited
+    to "at most len(lab_rooms) labs running per slot"; assign_lab_rooms picks the
+    concrete rooms afterwards.
+
+    `blocked` is an optional set of ('stream' | 'faculty' | 'room', name, day, slot)
+    entries that are already taken, e.g. by sessions fixed outside a sub-problem.
+    With allow_partial, a course may get fewer than its weekly hours (the filled-slot
+    reward still pushes towards all of them) instead of making the model infeasible.
+    Without `named_variables` (default MODEL_VARIABLE_NAMES) variables get empty names.
+    """
+    build_start = time.time()
+    model = cp_model.CpModel()
+    named_variables = MODEL_VARIABLE_NAMES if named_variables is None else named_variables
+    name = _namer(named_variables)
+
+    lab_rooms = get_lab_rooms(rooms)
+
+    assignments = {}
+    by_stream_course = collections.defaultdict(list)
+    by_entity_slot = collections.defaultdict(list)
+    by_faculty_day = collections.defaultdict(list)
+    by_stream_day_course = collections.defaultdict(list)
+    lab_pool_slot = collections.defaultdict(list)
+    for stream_sem, details in stream_map.items():
+        home_room = details.get('room')
+        for course_code, faculty_name in details['courses']:
+            course_info = courses.get(course_code, {})
+            is_lab = course_info.get('is_lab', False)
+            duration = session_duration(course_info)
+            possible_rooms = ([LAB_POOL_ROOM] if pool_lab_rooms else lab_rooms) if is_lab else [home_room]
+
+            for room_name in possible_rooms:
+                if pd.isna(room_name) or room_name == 'NA': room_name = f"Activity_{course_code}"
+                for day_idx in range(len(DAYS)):
+                    for ts_idx in range(len(TIMESLOTS) - duration + 1):
+                        if ts_idx == LUNCH_SLOT_INDEX or (duration == 2 and ts_idx + 1 == LUNCH_SLOT_INDEX): continue
+                        if is_blocked(blocked, [('stream', stream_sem), ('faculty', faculty_name), ('room', room_name)], day_idx, ts_idx, duration): continue
+                        key = (stream_sem, day_idx, ts_idx, course_code, faculty_name, room_name)
+                        var = model.NewBoolVar(str(key) if named_variables else '')
+                        assignments[key] = var
+                        by_stream_course[(stream_sem, course_code)].append(var)
+                        by_faculty_day[(faculty_name, day_idx)].append(var)
+                        by_stream_day_course[(stream_sem, day_idx, course_code)].append(var)
+                        for covered in range(ts_idx, ts_idx + duration):
+                            by_entity_slot[('stream', stream_sem, day_idx, covered)].append(var)
+                            by_entity_slot[('faculty', faculty_name, day_idx, covered)].append(var)
+                            if room_name in rooms: by_entity_slot[('room', room_name, day_idx, covered)].append(var)
+                            if room_name == LAB_POOL_ROOM: lab_pool_slot[(day_idx, covered)].append(var)
+
+    # --- Hard Constraints ---
+    for stream_sem, details in stream_map.items():
+        for course_code, _ in details['courses']:
+            course_info = courses.get(course_code, {})
+            if course_info.get('hours_per_week'):
+                scheduled_hours = sum(by_stream_course[(stream_sem, course_code)]) * session_duration(course_info)
+                model.Add(scheduled_hours <= course_info['hours_per_week'] if allow_partial else scheduled_hours == course_info['hours_per_week'])
+
+    for active_in_slot in by_entity_slot.values():
+        if len(active_in_slot) > 1: model.Add(sum(active_in_slot) <= 1)
+    for active_in_slot in lab_pool_slot.values():
+        if len(active_in_slot) > len(lab_rooms): model.Add(sum(active_in_slot) <= len(lab_rooms))
+
+    objective, terms = _add_soft_objective(model, stream_map, courses, by_entity_slot, by_faculty_day, by_stream_day_course, allow_partial, name)
+    return finish_build(model, assignments, objective, terms, build_start, 'grid', verbose=verbose)
+
+def _namer(named_variables):
+    # Variable names only matter for debugging a model dump; building them is a large share of the build cost.
+    if not named_variables: return lambda *parts: ''
+    return lambda *parts: '_'.join(str(part).replace(' ', '') for part in parts)
+
+def _busy_literal(model, active_in_slot, name):
+    # The hard constraints already allow at most one covering session per slot, so
+    # the busy flag is exactly the sum of the covering literals.
+    if not active_in_slot: return model.NewConstant(0)
+    if len(active_in_slot) == 1: return active_in_slot[0]
+    is_busy = model.NewBoolVar(name)
+    model.Add(is_busy == sum(active_in_slot))
+    return is_busy
+
+def _reified_and(model, literals, name):
+    # Two-way reification: the result is true if and only if every literal is true.
+    result = model.NewBoolVar(name)
+    model.AddBoolAnd(literals).OnlyEnforceIf(result)
+    model.AddBoolOr([lit.Not() for lit in literals] + [result])
+    return result
+
+def _add_soft_objective(model, stream_map, courses, by_entity_slot, by_faculty_day, by_stream_day_course, allow_partial=False, name=None):
+    """
+    Adds the preference terms shared by every model engine. The indexes hold, per
+    (entity, day, slot) and per (stream, day, course), the literals that mean
+    "a session occupies this slot" / "a session of this course starts this day".
+
+    Every penalty indicator is reified in both directions, so the solver cannot
+    dodge a penalty by leaving its flag at 0, and the indicators are summed into
+    one counter per (stream, day) or (faculty, day) before entering the objective.
+
+    Each preference term is kept as its own named expression (see OBJECTIVE_TERMS),
+    so the objective can later be re-weighted without rebuilding the model.
+    Returns (objective, terms).
+    """
+    name = name or _namer(MODEL_VARIABLE_NAMES)
+    terms = {term: [] for term in OBJECTIVE_TERMS.values()}
+    for stream_sem in stream_map.keys():
+        all_courses_for_stream = list(set(c[0] for c in stream_map[stream_sem]['courses']))
+        weekly_busy = []
+        for day_idx in range(len(DAYS)):
+            daily_slots_busy = [_busy_literal(model, by_entity_slot.get(('stream', stream_sem, day_idx, ts_idx), []), name('ss_busy', stream_sem, day_idx, ts_idx))
+                                for ts_idx in range(len(TIMESLOTS)) if ts_idx != LUNCH_SLOT_INDEX]
+            daily_hours_sum = sum(daily_slots_busy)
+            weekly_busy.extend(daily_slots_busy)
+            terms['filled_slots'].append(daily_hours_sum)
+
+            gaps = [_reified_and(model, [daily_slots_busy[i], daily_slots_busy[i+1].Not(), daily_slots_busy[i+2]], name('gap', stream_sem, day_idx, i))
+                    for i in range(len(daily_slots_busy) - 2)]
+            gaps_today = model.NewIntVar(0, len(gaps), name('gaps', stream_sem, day_idx))
+            model.Add(gaps_today == sum(gaps))
+            terms['gaps'].append(gaps_today)
+
+            # Underloaded means "has classes today, but fewer than MIN_HOURS_PER_DAY".
+            has_classes = model.NewBoolVar(name('has_classes', stream_sem, day_idx))
+            model.AddMaxEquality(has_classes, daily_slots_busy)
+            meets_minimum = model.NewBoolVar(name('meets_minimum', stream_sem, day_idx))
+            model.Add(daily_hours_sum >= MIN_HOURS_PER_DAY).OnlyEnforceIf(meets_minimum)
+            model.Add(daily_hours_sum < MIN_HOURS_PER_DAY).OnlyEnforceIf(meets_minimum.Not())
+            is_underloaded = _reified_and(model, [has_classes, meets_minimum.Not()], name('underload', stream_sem, day_idx))
+            terms['underloaded_days'].append(is_underloaded)
+
+            # --- Penalty for scheduling the same subject multiple times on the same day ---
+            # This penalizes the 2nd, 3rd, etc. occurrence of the subject on the same day.
+            repetitions = []
+            for course in all_courses_for_stream:
+                if courses[course].get('is_lab'): continue
+                scheduled_today = by_stream_day_course[(stream_sem, day_idx, course)]
+                if len(scheduled_today) < 2: continue
+                repetition_count = model.NewIntVar(0, len(scheduled_today) - 1, name('rep', stream_sem, day_idx, course))
+                model.AddMaxEquality(repetition_count, [sum(scheduled_today) - 1, 0])
+                repetitions.append(repetition_count)
+            terms['subject_repetitions'].extend(repetitions)
+
+        # Redundant but bound-tightening: the weekly hours fix how many slots can be busy.
+        course_hours = [courses.get(c, {}).get('hours_per_week') for c, _ in stream_map[stream_sem]['courses']]
+        if all(course_hours): model.Add(sum(weekly_busy) <= sum(course_hours) if allow_partial else sum(weekly_busy) == sum(course_hours))
+
+    # Only faculty who actually teach this semester get busy flags; the rest would be constant zeros.
+    window_size = MAX_CONSECUTIVE_FACULTY_HOURS + 1
+    for fac, day_idx in by_faculty_day.keys():
+        faculty_schedule = [_busy_literal(model, by_entity_slot.get(('faculty', fac, day_idx, ts_idx), []), name('fac_busy', fac, day_idx, ts_idx))
+                            for ts_idx in range(len(TIMESLOTS))]
+
+        overloads = []
+        for i in range(len(faculty_schedule) - window_size + 1):
+            if i <= LUNCH_SLOT_INDEX < i + window_size: continue
+            overloads.append(_reified_and(model, faculty_schedule[i : i + window_size], name('consecutive', fac, day_idx, i)))
+        if overloads:
+            overloads_today = model.NewIntVar(0, len(overloads), name('consecutive', fac, day_idx))
+            model.Add(overloads_today == sum(overloads))
+            terms['faculty_overloads'].append(overloads_today)
+
+    terms = {term: sum(exprs) for term, exprs in terms.items()}
+    objective = weighted_objective(terms, objective_weights())
+    model.Maximize(objective)
+    return objective, terms
+
+def objective_weights(overrides=None):
+    """The current preference weights keyed by their config name, with `overrides` applied."""
+    weights = {name: globals()[name] for name in OBJECTIVE_TERMS}
+    unknown = set(overrides or {}) - set(weights)
+    if unknown: raise ValueError(f"Unknown objective weight(s): {', '.join(sorted(unknown))}")
+    weights.update(overrides or {})
+    return weights
+
+def weighted_objective(terms, weights):
+    return sum(weights[name] * terms[term] * (1 if name == 'FILLED_SLOT_REWARD' else -1) for name, term in OBJECTIVE_TERMS.items())
+
+def finish_build(model, assignments, objective, terms, build_start, engine, sessions=None, verbose=True):
+    """The built-model dict every engine returns (see solve_master_model), with the model's size and build time in 'stats'."""
+    proto = model.Proto()
+    stats = {'engine': engine, 'build_seconds': time.time() - build_start, 'num_variables': len(proto.variables), 'num_constraints': len(proto.constraints), 'num_assignments': len(assignments)}
+    instrumentation.emit('phase', phase='build', engine=engine, seconds=stats['build_seconds'], peak_rss_mb=instrumentation.peak_rss_mb(),
+                         variables=stats['num_variables'], constraints=stats['num_constraints'])
+    if verbose: print(f"   -> {engine.capitalize()} model built in {stats['build_seconds']:.2f} seconds: {stats['num_variables']} variables, {stats['num_constraints']} constraints.")
+    return {'model': model, 'assignments': assignments, 'objective': objective, 'terms': terms, 'sessions': sessions, 'stats': stats}
+
+def build_interval_model(stream_map, courses, faculty, rooms, pool_lab_rooms=False, blocked=None, allow_partial=False, verbose=True, named_variables=None):
+    """
+    Alternative engine: each session is one integer start variable over a linear
+    week axis (day * len(TIMESLOTS) + slot) with a fixed-size interval, and a lab
+    session picks its room through one optional interval per lab room. Streams,
+    faculty and rooms are kept apart with AddNoOverlap, and lunch is blocked by a
+    fixed interval per day. There are no per-slot literals, so a session costs a
+    start variable plus one literal per candidate lab room (against one Boolean
+    per room x day x slot in the grid model), and only the preference terms that
+    need no slot literals are modelled (see _add_interval_objective): this engine
+    finds complete timetables, but its objective values do not compare with the
+    other engines' (score its timetables with score_sessions).
+
+    With pool_lab_rooms, lab intervals go into one AddCumulative with capacity
+    len(lab_rooms) instead of choosing a room (see assign_lab_rooms). `blocked`
+    entries (see build_master_model) remove start values for the session's own
+    stream, faculty and home room, and become fixed intervals in lab-room NoOverlaps.
+    With allow_partial every session gets a 'placed' literal and optional intervals.
+    """
+    build_start = time.time()
+    model = cp_model.CpModel()
+    name = _namer(MODEL_VARIABLE_NAMES if named_variables is None else named_variables)
+    slots_per_day = len(TIMESLOTS)
+
+    lab_rooms = get_lab_rooms(rooms)
+    lab_pool_intervals = []
+
+    lunch_intervals = [model.NewFixedSizeIntervalVar(day_idx * slots_per_day + LUNCH_SLOT_INDEX, 1, name('lunch', day_idx)) for day_idx in range(len(DAYS))]
+    intervals_by_entity = collections.defaultdict(list)
+    assignments, sessions = {}, []
+    for stream_sem, details in stream_map.items():
+        home_room = details.get('room')
+        if pd.isna(home_room) or home_room == 'NA': home_room = None
+        for course_code, faculty_name in details['courses']:
+            course_info = courses.get(course_code, {})
+            is_lab = course_info.get('is_lab', False)
+            duration = session_duration(course_info)
+            own_entities = [('stream', stream_sem), ('faculty', faculty_name), ('room', None if is_lab else home_room)]
+            starts = [d * slots_per_day + t for d in range(len(DAYS)) for t in range(slots_per_day - duration + 1)
+                      if not t <= LUNCH_SLOT_INDEX < t + duration and not is_blocked(blocked, own_entities, d, t, duration)]
+
+            previous_start, previous_placed = None, None
+            for n in range(course_info.get('hours_per_week', 0) // duration):
+                key = (stream_sem, course_code, n)
+                placed = model.NewBoolVar(name('placed', *key)) if allow_partial else None
+                # The domain is the allowed starts; an unplaced session parks at the first one.
+                start = model.NewIntVarFromDomain(cp_model.Domain.FromValues(starts or [0]), name('start', *key))
+                if allow_partial: interval = model.NewOptionalFixedSizeIntervalVar(start, duration, placed, name('interval', *key))
+                else: interval = model.NewFixedSizeIntervalVar(start, duration, name('interval', *key))
+                if allow_partial: model.Add(start == (starts or [0])[0]).OnlyEnforceIf(placed.Not())
+                if not starts: model.AddBoolAnd([placed.Not()] if allow_partial else [model.NewConstant(0)])
+                # Sessions of the same course are interchangeable, so order them (placed ones first).
+                if previous_start is not None: model.Add(start > previous_start).OnlyEnforceIf([placed] if allow_partial else [])
+                if previous_placed is not None: model.AddImplication(placed, previous_placed)
+                previous_start, previous_placed = start, placed
+
+                intervals_by_entity[('stream', stream_sem)].append(interval)
+                intervals_by_entity[('faculty', faculty_name)].append(interval)
+                room_literals = {}
+                if is_lab and pool_lab_rooms:
+                    lab_pool_intervals.append(interval)
+                elif is_lab:
+                    for room_name in lab_rooms:
+                        present = model.NewBoolVar(name('in', *key, room_name))
+                        room_literals[room_name] = present
+                        intervals_by_entity[('room', room_name)].append(model.NewOptionalFixedSizeIntervalVar(start, duration, present, name('interval', *key, room_name)))
+                    if allow_partial: model.Add(sum(room_literals.values()) == placed)
+                    else: model.AddExactlyOne(room_literals.values())
+                elif home_room in rooms:
+                    intervals_by_entity[('room', home_room)].append(interval)
+                sessions.append({'stream': stream_sem, 'course': course_code, 'faculty': faculty_name, 'room': LAB_POOL_ROOM if is_lab and pool_lab_rooms else home_room or f"Activity_{course_code}",
+                                 'start': start, 'starts': starts, 'duration': duration, 'placed': placed, 'start_literals': {}, 'room_literals': room_literals})
+                assignments[key] = start
+
+    for kind, room_name, day_idx, ts_idx in blocked or ():
+        if kind == 'room' and room_name in lab_rooms and ('room', room_name) in intervals_by_entity:
+            intervals_by_entity[('room', room_name)].append(model.NewFixedSizeIntervalVar(day_idx * slots_per_day + ts_idx, 1, name('blocked', room_name, day_idx, ts_idx)))
+    for (kind, _), intervals in intervals_by_entity.items():
+        if kind == 'stream': intervals = intervals + lunch_intervals
+        if len(intervals) > 1: model.AddNoOverlap(intervals)
+    if len(lab_pool_intervals) > len(lab_rooms): model.AddCumulative(lab_pool_intervals, [1] * len(lab_pool_intervals), len(lab_rooms))
+
+    objective, terms = _add_interval_objective(model, sessions, courses, name)
+    built = finish_build(model, assignments, objective, terms, build_start, 'interval', sessions, verbose)
+    if verbose: print("   -> Its objective leaves out gaps, underloaded days and faculty overloads; compare timetables with score_sessions.")
+    return built
+
+def _add_interval_objective(model, sessions, courses, name):
+    """
+    The preference terms of _add_soft_objective that need no per-slot literals:
+    filled slots (the placed hours) and same-day repetitions of a theory course,
+    through one literal per (session, day). Gaps, underloaded days and faculty
+    overloads are left out of the interval model (they stay 0 in its terms);
+    score_sessions still reports them for its timetables. Returns (objective, terms).
+    """
+    slots_per_day = len(TIMESLOTS)
+    terms = {term: 0 for term in OBJECTIVE_TERMS.values()}
+    terms['filled_slots'] = sum(session['duration'] * (1 if session['placed'] is None else session['placed']) for session in sessions)
+
+    by_stream_day_course = collections.defaultdict(list)
+    for session in sessions:
+        if courses.get(session['course'], {}).get('is_lab'): continue
+        on_day = []
+        for day_idx in sorted({t // slots_per_day for t in session['starts']}):
+            lit = model.NewBoolVar(name('on', session['stream'], session['course'], day_idx))
+            model.AddLinearConstraint(session['start'], day_idx * slots_per_day, (day_idx + 1) * slots_per_day - 1).OnlyEnforceIf(lit)
+            by_stream_day_course[(session['stream'], day_idx, session['course'])].append(lit)
+            on_day.append(lit)
+        model.Add(sum(on_day) == (1 if session['placed'] is None else session['placed']))
+    repetitions = []
+    for (stream_sem, day_idx, course_code), scheduled_today in by_stream_day_course.items():
+        if len(scheduled_today) < 2: continue
+        repetition_count = model.NewIntVar(0, len(scheduled_today) - 1, name('rep', stream_sem, day_idx, course_code))
+        model.AddMaxEquality(repetition_count, [sum(scheduled_today) - 1, 0])
+        repetitions.append(repetition_count)
+    terms['subject_repetitions'] = sum(repetitions)
+
+    objective = weighted_objective(terms, objective_weights())
+    model.Maximize(objective)
+    return objective, terms
+
+def _start_literal(model, session, t):
+    # Interval sessions have no per-slot literals; one meaning "placed and starts at t" is made on demand (freezing, incremental re-solves).
+    lit = session['start_literals'].get(t)
+    if lit is None:
+        lit = session['start_literals'][t] = model.NewBoolVar('')
+        model.Add(session['start'] == t).OnlyEnforceIf(lit)
+        if session['placed'] is None:
+            model.Add(session['start'] != t).OnlyEnforceIf(lit.Not())
+        else:
+            model.AddImplication(lit, session['placed'])
+            model.Add(session['start'] != t).OnlyEnforceIf([lit.Not(), session['placed']])
+    return lit
+
+# ------------------------------------------------------------------------------
+# Compact (integer-encoded) problem and grid model
+# ------------------------------------------------------------------------------
+NO_ROOM, POOL_ROOM = -1, -2   # room ids for a class group without its own room and for LAB_POOL_ROOM
+
+def _intern(names):
+    names = list(names)
+    return names, {name: i for i, name in enumerate(names)}
+
+def compact_problem(stream_map, courses, faculty, rooms):
+    """
+    Re-encodes the loaded dictionaries with interned integer ids for class groups,
+    courses, faculty, rooms and departments. Per-entity attributes become NumPy
+    arrays (course hours, lab flags, room capacities, departments, home rooms) and
+    the curriculum becomes three parallel 'offering' arrays (stream, course,
+    faculty), one entry per (class group, course, faculty) row of the input.
+    """
+    get_lab_rooms(rooms)
+    offerings = [(ss, c, f) for ss, details in stream_map.items() for c, f in details['courses']]
+    streams, stream_id = _intern(stream_map)
+    course_names, course_id = _intern(dict.fromkeys([*courses, *(c for _, c, _ in offerings)]))
+    faculty_names, faculty_id = _intern(dict.fromkeys([*faculty, *(f for _, _, f in offerings)]))
+    room_names, room_id = _intern(rooms)
+    dept_names, dept_id = _intern(dict.fromkeys([*(courses.get(c, {}).get('dept') for c in course_names), *(faculty.get(f, {}).get('dept') for f in faculty_names),
+                                                 *(ss.split('-')[0] for ss in streams)]))
+    home_room = lambda details: room_id.get(details.get('room'), NO_ROOM) if isinstance(details.get('room'), str) else NO_ROOM
+    return {
+        'streams': streams, 'courses': course_names, 'faculty': faculty_names, 'rooms': room_names, 'depts': dept_names,
+        'stream_id': stream_id, 'course_id': course_id, 'faculty_id': faculty_id, 'room_id': room_id,
+        'stream_room': np.array([home_room(stream_map[ss]) for ss in streams], dtype=np.int32),
+        'stream_size': np.array([stream_map[ss].get('size', -1) for ss in streams], dtype=np.int32),
+        'stream_dept': np.array([dept_id[ss.split('-')[0]] for ss in streams], dtype=np.int32),
+        'course_hours': np.array([courses.get(c, {}).get('hours_per_week', 0) for c in course_names], dtype=np.int16),
+        'course_is_lab': np.array([bool(courses.get(c, {}).get('is_lab', False)) for c in course_names], dtype=bool),
+        'course_dept': np.array([dept_id[courses.get(c, {}).get('dept')] for c in course_names], dtype=np.int32),
+        'faculty_dept': np.array([dept_id[faculty.get(f, {}).get('dept')] for f in faculty_names], dtype=np.int32),
+        'room_capacity': np.array([rooms[r].get('capacity', 0) for r in room_names], dtype=np.int32),
+        'room_is_lab': np.array([rooms[r].get('type') == 'lab' for r in room_names], dtype=bool),
+        'offering_stream': np.array([stream_id[ss] for ss, _, _ in offerings], dtype=np.int32),
+        'offering_course': np.array([course_id[c] for _, c, _ in offerings], dtype=np.int32),
+        'offering_faculty': np.array([faculty_id[f] for _, _, f in offerings], dtype=np.int32),
+    }
+
+def load_compact_problem(filename, semester_filter):
+    """load_data_from_csv followed by compact_problem; returns (problem, stream_map, courses, faculty, rooms)."""
+    stream_map, courses, faculty, rooms = load_data_from_csv(filename, semester_filter)
+    return compact_problem(stream_map, courses, faculty, rooms), stream_map, courses, faculty, rooms
+
+def _start_cells(duration):
+    return np.array([(d, t) for d in range(len(DAYS)) for t in range(len(TIMESLOTS) - duration + 1) if not t <= LUNCH_SLOT_INDEX < t + duration], dtype=np.int32).reshape(-1, 2)
+
+def _group_indices(keys):
+    """Splits candidate indexes by key: returns (unique keys, list of index arrays)."""
+    order = np.argsort(keys, kind='stable')
+    unique_keys, first = np.unique(keys[order], return_index=True)
+    return unique_keys, np.split(order, first[1:])
+
+def compact_session_keys(problem, candidates, index=None):
+    """Decodes candidate rows (all, or those in `index`) into (stream, day, slot, course, faculty, room) tuples."""
+    index = slice(None) if index is None else index
+    offering = candidates['offering'][index]
+    course = problem['offering_course'][offering]
+    room_names = np.array(problem['rooms'] + [LAB_POOL_ROOM], dtype=object)
+    course_names = np.array(problem['courses'], dtype=object)
+    room = candidates['room'][index]
+    rooms_out = np.where(room == NO_ROOM, np.array([f"Activity_{c}" for c in course_names], dtype=object)[course], room_names[room])
+    return list(zip(np.array(problem['streams'], dtype=object)[problem['offering_stream'][offering]], candidates['day'][index].tolist(),
+                    candidates['slot'][index].tolist(), course_names[course], np.array(problem['faculty'], dtype=object)[problem['offering_faculty'][offering]], rooms_out))
+
+def build_compact_model(stream_map, courses, faculty, rooms, pool_lab_rooms=False, blocked=None, allow_partial=False, verbose=True, named_variables=None, problem=None):
+    """
+    The grid encoding of build_master_model on the compact problem: every candidate
+    (offering, day, start slot, room) is a row of NumPy arrays instead of a
+    string-tuple key, candidates are expanded and filtered with array operations,
+    and the per-cell index is built by sorting integer cell ids. Only the
+    variables themselves are Python objects, and with `named_variables` off they
+    carry no names. `problem` skips the conversion when the compact form is already
+    loaded. Same options and same objective as build_master_model.
+    """
+    build_start = time.time()
+    model = cp_model.CpModel()
+    name = _namer(MODEL_VARIABLE_NAMES if named_variables is None else named_variables)
+    problem = compact_problem(stream_map, courses, faculty, rooms) if problem is None else problem
+    n_days, n_slots = len(DAYS), len(TIMESLOTS)
+    n_streams, n_faculty = len(problem['streams']), len(problem['faculty'])
+
+    # --- Candidate rows: theory sessions in the home room, labs in every lab room (or the pool) ---
+    offering_is_lab = problem['course_is_lab'][problem['offering_course']]
+    theory, labs = np.flatnonzero(~offering_is_lab), np.flatnonzero(offering_is_lab)
+    lab_room_ids = np.flatnonzero(problem['room_is_lab']).astype(np.int32)
+    lab_choices = np.array([POOL_ROOM], dtype=np.int32) if pool_lab_rooms else lab_room_ids
+    cells_1, cells_2 = _start_cells(1), _start_cells(2)
+    offering = np.concatenate([np.repeat(theory, len(cells_1)), np.repeat(labs, len(lab_choices) * len(cells_2))]).astype(np.int32)
+    room = np.concatenate([np.repeat(problem['stream_room'][problem['offering_stream'][theory]], len(cells_1)),
+                           np.tile(np.repeat(lab_choices, len(cells_2)), len(labs))]).astype(np.int32)
+    start = np.concatenate([np.tile(cells_1, (len(theory), 1)), np.tile(cells_2, (len(labs) * len(lab_choices), 1))]).astype(np.int32).reshape(-1, 2)
+    day, slot = start[:, 0], start[:, 1]
+    duration = np.where(offering_is_lab[offering], 2, 1)
+
+    # Cell ids: entity * (days * slots) + day * slots + slot, with streams, then faculty, then rooms as entities.
+    cell = lambda entity, offset, rows=slice(None): entity[rows] * (n_days * n_slots) + day[rows] * n_slots + slot[rows] + offset
+    stream_entity = problem['offering_stream'][offering]
+    faculty_entity = n_streams + problem['offering_faculty'][offering]
+    room_entity = np.where(room >= 0, n_streams + n_faculty + room, -1)
+    if blocked:
+        ids = {'stream': problem['stream_id'], 'faculty': {f: n_streams + i for f, i in problem['faculty_id'].items()},
+               'room': {r: n_streams + n_faculty + i for r, i in problem['room_id'].items()}}
+        blocked_cells = np.array([ids[kind][entity] * (n_days * n_slots) + d * n_slots + t for kind, entity, d, t in blocked if entity in ids.get(kind, ())], dtype=np.int64)
+        keep = np.ones(len(offering), dtype=bool)
+        for offset in range(2):
+            covers = duration > offset
+            for entity in (stream_entity, faculty_entity, room_entity):
+                keep &= ~(covers & (entity >= 0) & np.isin(cell(entity, offset), blocked_cells))
+        offering, room, day, slot, duration = offering[keep], room[keep], day[keep], slot[keep], duration[keep]
+        stream_entity, faculty_entity, room_entity = stream_entity[keep], faculty_entity[keep], room_entity[keep]
+
+    candidates = {'offering': offering, 'room': room, 'day': day, 'slot': slot}
+    if named_variables if named_variables is not None else MODEL_VARIABLE_NAMES:
+        variables = [model.NewBoolVar(str(key)) for key in compact_session_keys(problem, candidates)]
+    else:
+        variables = [model.NewBoolVar('') for _ in range(len(offering))]
+    var_array = np.empty(len(variables), dtype=object)
+    var_array[:] = variables
+
+    # --- Hard Constraints ---
+    course = problem['offering_course'][offering]
+    course_key = stream_entity.astype(np.int64) * len(problem['courses']) + course
+    for key, rows in zip(*_group_indices(course_key)):
+        hours, session_hours = int(problem['course_hours'][key % len(problem['courses'])]), int(duration[rows[0]])
+        if hours:
+            scheduled_hours = sum(var_array[rows].tolist()) * session_hours
+            model.Add(scheduled_hours <= hours if allow_partial else scheduled_hours == hours)
+
+    # One kind of entity at a time keeps the (row, covered cell) arrays small.
+    rows = np.arange(len(offering), dtype=np.int32)
+    by_entity_slot = {}
+    for kind, entity, first_id in (('stream', stream_entity, 0), ('faculty', faculty_entity, n_streams), ('room', room_entity, None)):
+        valid = entity >= 0
+        covering_rows = np.concatenate([rows[valid & (duration > offset)] for offset in range(2)])
+        cells, groups = _group_indices(np.concatenate([cell(entity, offset, valid & (duration > offset)) for offset in range(2)]))
+        for cell_id, group in zip(cells.tolist(), groups):
+            literals = var_array[covering_rows[group]].tolist()
+            if len(literals) > 1: model.AddAtMostOne(literals)
+            if first_id is not None:
+                entity_id, rest = divmod(cell_id, n_days * n_slots)
+                by_entity_slot[(kind, entity_id - first_id, *divmod(rest, n_slots))] = literals
+    if pool_lab_rooms:
+        pooled = room == POOL_ROOM
+        pool_rows = np.concatenate([rows[pooled], rows[pooled]])
+        pool_cells = np.concatenate([day[pooled] * n_slots + slot[pooled], day[pooled] * n_slots + slot[pooled] + 1])
+        for _, group in zip(*_group_indices(pool_cells)):
+            if len(group) > len(lab_room_ids): model.Add(sum(var_array[pool_rows[group]].tolist()) <= len(lab_room_ids))
+
+    # --- Soft constraints, shared with the other engines through integer-keyed indexes ---
+    by_faculty_day = {}
+    for key, group in zip(*_group_indices(problem['offering_faculty'][offering].astype(np.int64) * n_days + day)):
+        by_faculty_day[tuple(map(int, divmod(key, n_days)))] = var_array[group].tolist()
+    by_stream_day_course = collections.defaultdict(list)
+    for key, group in zip(*_group_indices((stream_entity.astype(np.int64) * n_days + day) * len(problem['courses']) + course)):
+        stream_day, course_id = divmod(int(key), len(problem['courses']))
+        by_stream_day_course[(*divmod(stream_day, n_days), course_id)] = var_array[group].tolist()
+    stream_view = {s: {'courses': []} for s in range(n_streams)}
+    for s, c, f in zip(problem['offering_stream'].tolist(), problem['offering_course'].tolist(), problem['offering_faculty'].tolist()): stream_view[s]['courses'].append((c, f))
+    course_view = {c: {'hours_per_week': int(h), 'is_lab': bool(lab)} for c, (h, lab) in enumerate(zip(problem['course_hours'], problem['course_is_lab']))}
+
+    objective, terms = _add_soft_objective(model, stream_view, course_view, by_entity_slot, by_faculty_day, by_stream_day_course, allow_partial, name)
+    built = finish_build(model, variables, objective, terms, build_start, 'compact', verbose=verbose)
+    built.update({'problem': problem, 'candidates': candidates})
+    return built
+
+MODEL_BUILDERS = {'grid': build_master_model, 'interval': build_interval_model, 'compact': build_compact_model}
+# Engines whose objective leaves out preference terms: their objective values are not comparable with the
+# other engines' and they cannot be re-weighted (score their timetables with score_sessions instead)
+PARTIAL_OBJECTIVE_ENGINES = {'interval'}
+
+def _measure_build(args):
+    engine, filename, semester_filter, named_variables = args
+    stream_map, courses, faculty, rooms = load_data_from_csv(filename, semester_filter)
+    peak_rss = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else float('nan')
+    baseline = peak_rss()
+    built = MODEL_BUILDERS[engine](stream_map, courses, faculty, rooms, verbose=False, named_variables=named_variables)
+    return {'engine': engine, 'named': named_variables, 'build_seconds': round(built['stats']['build_seconds'], 2), 'peak_mb': round(peak_rss() - baseline, 1),
+            'variables': built['stats']['num_variables'], 'constraints': built['stats']['num_constraints']}
+
+def measure_model_build(filename, semester_filter, configurations=(('grid', True), ('grid', False), ('compact', True), ('compact', False))):
+    """
+    Builds the model once per (engine, named_variables) configuration, each in a
+    fresh process so peak memory (growth of the max RSS over the loaded data, in MB;
+    Unix only) is not shared between runs, and prints build time and memory side by side.
+    """
+    rows = []
+    for engine, named_variables in configurations:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            rows.append(pool.submit(_measure_build, (engine, filename, semester_filter, named_variables)).result())
+    print("\n--- Model build cost ---\n" + pd.DataFrame(rows).to_string(index=False))
+    return rows
+
+# ==============================================================================
+# 3. SOLVING AND DISPLAY
+# ==============================================================================
+class TimetableSolutionCallback(cp_model.CpSolverSolutionCallback):
+    """
+    Decodes every improving solution into a structured timetable and passes it to
+    `on_solution` as {'objective', 'bound', 'elapsed', 'sessions', 'timetable'}.
+    With `no_improvement_seconds`, the search is stopped once that long has passed
+    without a better solution.
+    """
+    def __init__(self, built, courses, on_solution=None, solver=None, no_improvement_seconds=None):
+        super().__init__()
+        self.built, self.courses, self.on_solution = built, courses, on_solution
+        self.solver, self.no_improvement_seconds = solver, no_improvement_seconds
+        self.solutions_found, self._stall_timer = 0, None
+
+    def OnSolutionCallback(self):
+        self.solutions_found += 1
+        if self.no_improvement_seconds and self.solver is not None:
+            self.cancel_timer()
+            self._stall_timer = threading.Timer(self.no_improvement_seconds, self.solver.StopSearch)
+            self._stall_timer.daemon = True
+            self._stall_timer.start()
+        if self.on_solution is not None:
+            sessions = decode_sessions(self.built, self.Value)
+            self.on_solution({'objective': self.ObjectiveValue(), 'bound': self.BestObjectiveBound(), 'elapsed': self.WallTime(),
+                              'sessions': sessions, 'timetable': sessions_to_timetable(sessions, self.courses)})
+
+    def cancel_timer(self):
+        if self._stall_timer is not None: self._stall_timer.cancel()
+
+def solve_master_model(built, time_limit=None, num_search_workers=None, random_seed=None, log_search_progress=None,
+                       relative_gap_limit=None, no_improvement_seconds=None, on_solution=None, courses=None, model=None):
+    """
+    Solves a built model; solver settings left as None fall back to the SOLVER_*
+    configuration. `on_solution` (anytime mode) receives each improving solution
+    as it is found; `courses` is only needed for its structured timetable. The
+    search stops early once the relative gap to the best bound drops to
+    `relative_gap_limit` or after `no_improvement_seconds` without a better solution.
+    `model` solves a clone of built['model'] (same variables, e.g. another objective)
+    in its place.
+    """
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = SOLVER_TIME_LIMIT_SECONDS if time_limit is None else time_limit
+    num_search_workers = SOLVER_NUM_SEARCH_WORKERS if num_search_workers is None else num_search_workers
+    if num_search_workers: solver.parameters.num_workers = num_search_workers
+    random_seed = SOLVER_RANDOM_SEED if random_seed is None else random_seed
+    if random_seed is not None: solver.parameters.random_seed = random_seed
+    solver.parameters.log_search_progress = SOLVER_LOG_SEARCH_PROGRESS if log_search_progress is None else log_search_progress
+    relative_gap_limit = SOLVER_RELATIVE_GAP_LIMIT if relative_gap_limit is None else relative_gap_limit
+    if relative_gap_limit is not None: solver.parameters.relative_gap_limit = relative_gap_limit
+    no_improvement_seconds = SOLVER_NO_IMPROVEMENT_SECONDS if no_improvement_seconds is None else no_improvement_seconds
+
+    callback = None
+    if on_solution is not None or no_improvement_seconds:
+        callback = TimetableSolutionCallback(built, courses or {}, on_solution, solver, no_improvement_seconds)
+    start_time = time.time()
+    status = solver.Solve(built['model'] if model is None else model, callback)
+    if callback is not None: callback.cancel_timer()
+    result = {'status': solver.StatusName(status), 'objective': None, 'best_bound': None, 'sessions': [], 'wall_time': time.time() - start_time, 'stats': built['stats']}
+    instrumentation.emit('phase', phase='solve', engine=built['stats']['engine'], seconds=result['wall_time'], peak_rss_mb=instrumentation.peak_rss_mb(),
+                         status=result['status'], variables=built['stats']['num_variables'], constraints=built['stats']['num_constraints'],
+                         **instrumentation.solver_stats(solver, status))
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result['objective'] = solver.ObjectiveValue()
+        result['best_bound'] = solver.BestObjectiveBound()
+        result['sessions'] = decode_sessions(built, solver.Value)
+        result['terms'] = {term: solver.Value(expr) for term, expr in built['terms'].items()}
+    return result
+
+def iter_master_solutions(built, courses=None, **solve_kwargs):
+    """
+    Generator form of the anytime mode: yields each improving solution while the
+    solver keeps running in a background thread; the generator's return value is
+    the final solve_master_model result (use `result = yield from ...`).
+    """
+    solutions, finished = queue.Queue(), object()
+    outcome = {}
+    def run():
+        try: outcome['result'] = solve_master_model(built, courses=courses, on_solution=solutions.put, **solve_kwargs)
+        finally: solutions.put(finished)
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    while (solution := solutions.get()) is not finished:
+        yield solution
+    worker.join()
+    return outcome.get('result')
+
+def decode_sessions(built, value):
+    """Returns the scheduled (stream, day, slot, course, faculty, room) tuples; `value` reads a variable."""
+    if built.get('candidates') is not None:
+        chosen = np.flatnonzero(np.fromiter((value(var) for var in built['assignments']), dtype=bool, count=len(built['assignments'])))
+        return compact_session_keys(built['problem'], built['candidates'], chosen)
+    if built['sessions'] is None:
+        return [key for key, var in built['assignments'].items() if value(var)]
+    decoded = []
+    for session in built['sessions']:
+        if session['placed'] is not None and not value(session['placed']): continue
+        day_idx, ts_idx = divmod(value(session['start']), len(TIMESLOTS))
+        room_name = next((r for r, lit in session['room_literals'].items() if value(lit)), session['room'])
+        decoded.append((session['stream'], day_idx, ts_idx, session['course'], session['faculty'], room_name))
+    return decoded
+
+def sessions_to_timetable(sessions, courses):
+    """Nests sessions as {stream: {day: {timeslot: "course | faculty | room"}}}, lunch included."""
+    timetable = {}
+    for ss, d, t, c, f, r in sessions:
+        days = timetable.setdefault(ss, {day: {TIMESLOTS[LUNCH_SLOT_INDEX]: 'LUNCH'} for day in DAYS})
+        for j in range(session_duration(courses.get(c, {}))):
+            if t + j < len(TIMESLOTS): days[DAYS[d]][TIMESLOTS[t + j]] = f"{c} | {f} | {r}"
+    return timetable
+
+def score_sessions(sessions, stream_map, courses):
+    """Evaluates a complete session list with the same preference terms as _add_soft_objective."""
+    stream_busy, faculty_busy, per_course_day = set(), set(), collections.Counter()
+    for ss, d, t, c, f, r in sessions:
+        per_course_day[(ss, d, c)] += 1
+        for covered in range(t, t + session_duration(courses.get(c, {}))):
+            stream_busy.add((ss, d, covered))
+            faculty_busy.add((f, d, covered))
+
+    score = 0
+    for stream_sem, details in stream_map.items():
+        theory_courses = {c for c, _ in details['courses'] if not courses.get(c, {}).get('is_lab')}
+        for day_idx in range(len(DAYS)):
+            daily = [(stream_sem, day_idx, ts_idx) in stream_busy for ts_idx in range(len(TIMESLOTS)) if ts_idx != LUNCH_SLOT_INDEX]
+            score += sum(daily) * FILLED_SLOT_REWARD
+            score -= GAP_PENALTY * sum(daily[i] and not daily[i+1] and daily[i+2] for i in range(len(daily) - 2))
+            if 0 < sum(daily) < MIN_HOURS_PER_DAY: score -= DAY_UNDERLOAD_PENALTY
+            score -= SUBJECT_REPETITION_PENALTY * sum(max(0, per_course_day[(stream_sem, day_idx, c)] - 1) for c in theory_courses)
+
+    window_size = MAX_CONSECUTIVE_FACULTY_HOURS + 1
+    for fac, day_idx in {(f, d) for f, d, _ in faculty_busy}:
+        for i in range(len(TIMESLOTS) - window_size + 1):
+            if i <= LUNCH_SLOT_INDEX < i + window_size: continue
+            if all((fac, day_idx, t) in faculty_busy for t in range(i, i + window_size)): score -= FACULTY_CONSECUTIVE_PENALTY
+    return score
+
+def print_master_timetable(result, stream_map, courses):
+    print("\n" + "="*80 + f"\n🗓️  DISPLAYING OPTIMIZED SOLUTION (Highest Score: {result['objective']})\n" + "="*80)
+    with instrumentation.phase('render', sessions=len(result['sessions'])):
+        store = SolutionStore.from_sessions(result['sessions'], courses)
+        for stream_sem in sorted(list(stream_map.keys())):
+            if not len(store.rows('section', stream_sem)): continue
+            print(f"\n--- Timetable for: {stream_sem} ---\n{store.render_text(stream_sem)}")
+
+# ==============================================================================
+# 4. MAIN TIMETABLE OPTIMIZER FUNCTION
+# ==============================================================================
+def generate_master_timetable(stream_map, courses, faculty, rooms, engine=MODEL_ENGINE, on_solution=None):
+    if PRECHECK_CAPACITY and (issues := precheck_dataset(stream_map, courses, faculty, rooms)): return _failed_precheck_result(issues)
+    with instrumentation.labels(engine=engine, size=instrumentation.size_class(len(stream_map))):
+        built = MODEL_BUILDERS[engine](stream_map, courses, faculty, rooms)
+
+        print(f"\n🧠 Starting timetable optimization for Semester '{SEMESTER_TO_SCHEDULE}'...")
+        result = solve_master_model(built, on_solution=on_solution, courses=courses)
+
+        print(f"\n✅ Search complete in {result['wall_time']:.2f} seconds. Solver status: {result['status']}")
+        if result['status'] in ('OPTIMAL', 'FEASIBLE'):
+            print_master_timetable(result, stream_map, courses)
+        else:
+            print("\nCould not find a feasible solution.")
+    return result
+
+# ==============================================================================
+# 5. PARALLEL SOLVING OF INDEPENDENT COMPONENTS
+# ==============================================================================
+def split_independent_components(stream_map, courses, faculty, rooms):
+    """
+    Groups class groups into connected components over shared faculty and shared
+    home rooms. The lab-room pool is divided between components: every component
+    with lab hours first gets one room (largest demand first), then the rest go
+    in proportion to lab hours. If there are fewer lab rooms than components
+    needing one, all lab-using groups are merged into a single component so they
+    share the pool.
+    Returns a list of (stream_map, courses, faculty, rooms) sub-problems.
+    """
+    parent = {ss: ss for ss in stream_map}
+    def find(ss):
+        while parent[ss] != ss:
+            parent[ss] = parent[parent[ss]]
+            ss = parent[ss]
+        return ss
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b: parent[root_b] = root_a
+
+    resource_owner = {}
+    lab_hours = collections.Counter()
+    for stream_sem, details in stream_map.items():
+        resources = [('room', details.get('room'))] if details.get('room') in rooms else []
+        for course_code, faculty_name in details['courses']:
+            resources.append(('faculty', faculty_name))
+            if courses.get(course_code, {}).get('is_lab'): lab_hours[stream_sem] += courses[course_code].get('hours_per_week', 0)
+        for resource in resources:
+            if resource in resource_owner: union(resource_owner[resource], stream_sem)
+            else: resource_owner[resource] = stream_sem
+
+    lab_rooms = sorted(r for r, d in rooms.items() if d['type'] == 'lab')
+    lab_roots = {find(ss) for ss in lab_hours}
+    if len(lab_roots) > len(lab_rooms):
+        lab_streams = list(lab_hours)
+        for ss in lab_streams[1:]: union(lab_streams[0], ss)
+
+    members = collections.defaultdict(list)
+    for ss in stream_map: members[find(ss)].append(ss)
+
+    # One lab room per lab-using component, then the rest one at a time to the component with the highest demand per room held.
+    lab_demand = collections.Counter()
+    for ss, hours in lab_hours.items(): lab_demand[find(ss)] += hours
+    allocated = collections.defaultdict(list)
+    by_demand = sorted(lab_demand, key=lambda root: (-lab_demand[root], root))
+    for root, room_name in zip(by_demand, lab_rooms): allocated[root].append(room_name)
+    heap = [(-lab_demand[root] / (len(allocated[root]) + 1), root) for root in by_demand]
+    heapq.heapify(heap)
+    for room_name in lab_rooms[len(by_demand):]:
+        if not heap: break
+        _, root = heapq.heappop(heap)
+        allocated[root].append(room_name)
+        heapq.heappush(heap, (-lab_demand[root] / (len(allocated[root]) + 1), root))
+
+    components = []
+    for root, group in members.items():
+        sub_stream_map = {ss: stream_map[ss] for ss in group}
+        used_courses = {c for ss in group for c, _ in stream_map[ss]['courses']}
+        used_faculty = {f for ss in group for _, f in stream_map[ss]['courses']}
+        used_rooms = {stream_map[ss].get('room') for ss in group} | set(allocated[root])
+        components.append((sub_stream_map, {c: courses[c] for c in used_courses if c in courses}, {f: faculty[f] for f in used_faculty if f in faculty}, {r: rooms[r] for r in used_rooms if r in rooms}))
+    return components
+
+def _solve_component(args):
+    stream_map, courses, faculty, rooms, time_limit, num_search_workers, engine = args
+    return solve_master_model(MODEL_BUILDERS[engine](stream_map, courses, faculty, rooms), time_limit, num_search_workers)
+
+def merge_component_results(results):
+    status_rank = ['OPTIMAL', 'FEASIBLE', 'UNKNOWN', 'MODEL_INVALID', 'INFEASIBLE']
+    merged = {'status': max((r['status'] for r in results), key=status_rank.index), 'objective': None, 'sessions': [], 'wall_time': max(r['wall_time'] for r in results), 'components': len(results)}
+    for result in results:
+        merged['sessions'].extend(result['sessions'])
+        if result['objective'] is not None: merged['objective'] = (merged['objective'] or 0) + result['objective']
+        if 'terms' in result: merged['terms'] = dict(collections.Counter(merged.get('terms', {})) + collections.Counter(result['terms']))
+    return merged
+
+def generate_master_timetable_parallel(stream_map, courses, faculty, rooms, time_limit=SOLVER_TIME_LIMIT_SECONDS, max_workers=MAX_PARALLEL_WORKERS, engine=MODEL_ENGINE):
+    if PRECHECK_CAPACITY and (issues := precheck_dataset(stream_map, courses, faculty, rooms)): return _failed_precheck_result(issues)
+    components = split_independent_components(stream_map, courses, faculty, rooms)
+    components.sort(key=lambda comp: -sum(len(d['courses']) for d in comp[0].values()))
+    workers = max(1, min(max_workers, len(components)))
+    print(f"\n🧩 Split {len(stream_map)} class groups into {len(components)} independent components; solving on {workers} processes...")
+
+    # Each component gets a slice of the global budget proportional to its size, scaled by the
+    # number of processes running side by side, and CP-SAT threads are split between processes.
+    total_sessions = sum(len(d['courses']) for d in stream_map.values()) or 1
+    threads_per_process = max(1, (os.cpu_count() or 1) // workers)
+    jobs = []
+    for sub_stream_map, sub_courses, sub_faculty, sub_rooms in components:
+        size = sum(len(d['courses']) for d in sub_stream_map.values())
+        budget = time_limit * min(1.0, workers * size / total_sessions)
+        jobs.append((sub_stream_map, sub_courses, sub_faculty, sub_rooms, max(1.0, budget), threads_per_process, engine))
+
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_solve_component, jobs))
+    merged = merge_component_results(results)
+    merged['wall_time'] = time.time() - start_time
+
+    print(f"\n✅ Search complete in {merged['wall_time']:.2f} seconds across {len(components)} components. Solver status: {merged['status']}")
+    if merged['sessions']:
+        print_master_timetable(merged, stream_map, courses)
+    else:
+        print("\nCould not find a feasible solution.")
+    return merged
+
+# ==============================================================================
+# 6. TWO-PHASE SOLVE: TIME SLOTS FIRST, LAB ROOMS BY MATCHING
+# ==============================================================================
+def _match_sessions_to_rooms(candidates):
+    """Maximum bipartite matching (augmenting paths); candidates[i] lists the rooms session i may use, in preference order."""
+    owner = {}
+    def try_assign(i, seen):
+        for room_name in candidates[i]:
+            if room_name in seen: continue
+            seen.add(room_name)
+            if room_name not in owner or try_assign(owner[room_name], seen):
+                owner[room_name] = i
+                return True
+        return False
+    for i in range(len(candidates)): try_assign(i, set())
+    return {i: room_name for room_name, i in owner.items()}
+
+def assign_lab_rooms(sessions, stream_map, courses, rooms, unavailable_rooms=()):
+    """
+    Phase two: gives every lab session a concrete lab room without touching its
+    (day, slot). Sessions are processed per (day, start slot); the lab rooms still
+    free at that start are matched to the sessions with room_capacity >= the class
+    group's 'size' (the class_size column, 0 when the data has none), smallest
+    sufficient room first and a session's current room preferred, so this can be
+    re-run on a previous result when rooms become unavailable (see
+    reassign_lab_rooms). Returns (sessions, unplaced); unplaced lab sessions keep
+    LAB_POOL_ROOM.
+    """
+    lab_rooms = sorted((r for r, d in rooms.items() if d['type'] == 'lab' and r not in unavailable_rooms), key=lambda r: rooms[r].get('capacity', 0))
+    assigned, by_start = [], collections.defaultdict(list)
+    for session in sessions:
+        if courses.get(session[3], {}).get('is_lab'): by_start[(session[1], session[2])].append(session)
+        else: assigned.append(session)
+
+    busy_until, unplaced = {}, []
+    for day_idx, ts_idx in sorted(by_start):
+        group = by_start[(day_idx, ts_idx)]
+        free_rooms = [r for r in lab_rooms if busy_until.get((day_idx, r), 0) <= ts_idx]
+        candidates = []
+        for ss, _, _, course_code, _, current_room in group:
+            size = stream_map.get(ss, {}).get('size', 0)
+            preferred = [current_room] if current_room in free_rooms else []
+            candidates.append([r for r in preferred + [r for r in free_rooms if r != current_room] if rooms[r].get('capacity', 0) >= size])
+        matching = _match_sessions_to_rooms(candidates)
+        for i, (ss, d, t, course_code, faculty_name, _) in enumerate(group):
+            room_name = matching.get(i, LAB_POOL_ROOM)
+            assigned.append((ss, d, t, course_code, faculty_name, room_name))
+            if room_name == LAB_POOL_ROOM: unplaced.append(assigned[-1])
+            else: busy_until[(day_idx, room_name)] = t + session_duration(courses[course_code])
+    return assigned, unplaced
+
+def generate_master_timetable_two_phase(stream_map, courses, faculty, rooms, engine=MODEL_ENGINE):
+    if PRECHECK_CAPACITY and (issues := precheck_dataset(stream_map, courses, faculty, rooms)): return _failed_precheck_result(issues)
+    built = MODEL_BUILDERS[engine](stream_map, courses, faculty, rooms, pool_lab_rooms=True)
+
+    print(f"\n🧠 Phase 1: optimizing time slots for Semester '{SEMESTER_TO_SCHEDULE}' with pooled lab rooms...")
+    result = solve_master_model(built)
+    print(f"\n✅ Search complete in {result['wall_time']:.2f} seconds. Solver status: {result['status']}")
+    if result['status'] not in ('OPTIMAL', 'FEASIBLE'):
+        print("\nCould not find a feasible solution.")
+        return result
+
+    start_time = time.time()
+    result['sessions'], result['unplaced'] = assign_lab_rooms(result['sessions'], stream_map, courses, rooms)
+    print(f"🏷️  Phase 2: lab rooms matched in {time.time() - start_time:.3f} seconds; {len(result['unplaced'])} lab sessions left without a room.")
+    print_master_timetable(result, stream_map, courses)
+    return result
+
+def reassign_lab_rooms(stream_map, courses, rooms, sessions, unavailable_rooms=()):
+    """
+    Phase two on its own: re-matches the lab rooms of a saved solution (phase one
+    with LAB_POOL_ROOM, or a full timetable) with assign_lab_rooms, keeping every
+    (day, slot), e.g. after lab rooms become unavailable or class sizes change.
+    The status is 'PARTIAL' when lab sessions are left without a room.
+    """
+    start_time = time.time()
+    placed, unplaced = assign_lab_rooms(sessions, stream_map, courses, rooms, unavailable_rooms)
+    result = {'status': 'PARTIAL' if unplaced else 'FEASIBLE', 'objective': score_sessions(placed, stream_map, courses), 'sessions': placed,
+              'unplaced': unplaced, 'wall_time': time.time() - start_time}
+    print(f"🏷️  Phase 2: lab rooms matched for {len(sessions)} sessions in {result['wall_time']:.3f} seconds; {len(unplaced)} lab sessions left without a room.")
+    return result
+
+# ==============================================================================
+# 7. INCREMENTAL RE-SOLVE
+# ==============================================================================
+def save_sessions(filename, sessions):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump([list(session) for session in sessions], f, indent=1)
+
+def load_sessions(filename):
+    with open(filename, encoding='utf-8') as f:
+        return [tuple(session) for session in json.load(f)]
+
+def _assignment_items(built):
+    """(session key, literal) pairs of a grid-encoded model, compact or not."""
+    if built.get('candidates') is None: return built['assignments'].items()
+    return zip(compact_session_keys(built['problem'], built['candidates']), built['assignments'])
+
+def _candidate_literals(built, wanted=None):
+    """
+    Maps (stream, day, slot, course, faculty, room) to the literals that place a
+    session there. Interval-engine lab sessions choose their room separately, so
+    they are keyed with room None; their start literals are made on demand, only
+    for the `wanted` sessions when given.
+    """
+    candidates = collections.defaultdict(list)
+    if built['sessions'] is None:
+        for key, var in _assignment_items(built): candidates[key].append(var)
+        return candidates
+    wanted = None if wanted is None else {(ss, c, f, d * len(TIMESLOTS) + t) for ss, d, t, c, f, r in wanted}
+    for session in built['sessions']:
+        room_name = None if session['room_literals'] else session['room']
+        for t in session['starts']:
+            if wanted is not None and (session['stream'], session['course'], session['faculty'], t) not in wanted: continue
+            day_idx, ts_idx = divmod(t, len(TIMESLOTS))
+            candidates[(session['stream'], day_idx, ts_idx, session['course'], session['faculty'], room_name)].append(_start_literal(built['model'], session, t))
+    return candidates
+
+def add_solution_hints(built, previous_sessions, model=None):
+    model = built['model'] if model is None else model
+    if built['sessions'] is None:
+        previous = set(previous_sessions)
+        for key, var in _assignment_items(built): model.AddHint(var, key in previous)
+        return
+    # Interval sessions of one course are ordered by start, so hint them in time order.
+    previous_by_course = collections.defaultdict(list)
+    for ss, d, t, c, f, r in sorted(previous_sessions, key=lambda s: (s[1], s[2])): previous_by_course[(ss, c)].append((d * len(TIMESLOTS) + t, r))
+    for session in built['sessions']:
+        queue_for_course = previous_by_course.get((session['stream'], session['course']))
+        if not queue_for_course: continue
+        start, room_name = queue_for_course.pop(0)
+        if start in session['starts']: model.AddHint(session['start'], start)
+        for r, lit in session['room_literals'].items(): model.AddHint(lit, r == room_name)
+
+def freeze_sessions(built, sessions):
+    """Forces each of `sessions` that exists in the model to be scheduled as given; returns how many were frozen."""
+    candidates, frozen = _candidate_literals(built, sessions), 0
+    for ss, d, t, c, f, r in sessions:
+        literals = candidates.get((ss, d, t, c, f, r)) or candidates.get((ss, d, t, c, f, None))
+        if literals:
+            built['model'].AddBoolOr(literals)
+            frozen += 1
+    return frozen
+
+def count_moved_sessions(previous_sessions, sessions):
+    """Number of previous sessions that no longer appear, unchanged, in `sessions`."""
+    remaining = collections.Counter(sessions)
+    moved = 0
+    for session in previous_sessions:
+        if remaining[session] > 0: remaining[session] -= 1
+        else: moved += 1
+    return moved
+
+def resolve_incrementally(stream_map, courses, faculty, rooms, previous_sessions, faculty_names=(), streams=(), days=(), room_names=(),
+                          faculty_unavailable=None, engine=MODEL_ENGINE, time_limit=None):
+    """
+    Re-optimizes only a neighbourhood of a previous timetable. Previous sessions
+    whose stream, faculty, day index or room is in the neighbourhood are free to
+    move; every other previous session that still exists in the (possibly edited)
+    data is frozen in place. The previous solution is loaded as a hint and kept
+    sessions earn SESSION_STABILITY_REWARD, so the neighbourhood changes as little
+    as possible. `faculty_unavailable` maps a faculty name to day indexes on which
+    they cannot teach; those faculty join the neighbourhood automatically.
+    """
+    faculty_unavailable = faculty_unavailable or {}
+    faculty_names, streams, days, room_names = set(faculty_names) | set(faculty_unavailable), set(streams), set(days), set(room_names)
+    built = MODEL_BUILDERS[engine](stream_map, courses, faculty, rooms)
+    in_neighbourhood = lambda s: s[0] in streams or s[4] in faculty_names or s[1] in days or s[5] in room_names
+    moving, fixed = [s for s in previous_sessions if in_neighbourhood(s)], [s for s in previous_sessions if not in_neighbourhood(s)]
+    # Interval sessions get start literals only for the moving sessions and the unavailable faculty's days.
+    unavailable = [(session['stream'], *divmod(t, len(TIMESLOTS)), session['course'], session['faculty'], None) for session in built['sessions'] or ()
+                   if session['faculty'] in faculty_unavailable for t in session['starts'] if t // len(TIMESLOTS) in faculty_unavailable[session['faculty']]]
+    model, candidates = built['model'], _candidate_literals(built, moving + unavailable)
+
+    for key, literals in candidates.items():
+        if key[1] in faculty_unavailable.get(key[4], ()):
+            for lit in literals: model.Add(lit == 0)
+
+    kept = [lit for ss, d, t, c, f, r in moving for lit in candidates.get((ss, d, t, c, f, r)) or candidates.get((ss, d, t, c, f, None)) or []]
+    frozen = freeze_sessions(built, fixed)
+    if kept: model.Maximize(built['objective'] + SESSION_STABILITY_REWARD * sum(kept))
+    add_solution_hints(built, previous_sessions)
+
+    print(f"\n🔁 Incremental re-solve: {frozen} of {len(previous_sessions)} previous sessions frozen, the rest may move.")
+    result = solve_master_model(built, INCREMENTAL_TIME_LIMIT_SECONDS if time_limit is None else time_limit)
+    if result['status'] in ('OPTIMAL', 'FEASIBLE'):
+        result['moved'] = count_moved_sessions(previous_sessions, result['sessions'])
+        print(f"✅ Re-solved in {result['wall_time']:.2f} seconds ({result['status']}); {result['moved']} sessions moved.")
+    else:
+        print(f"\nCould not repair the timetable within the neighbourhood (status {result['status']}); widen it and retry.")
+    return result
+
+# ==============================================================================
+# 8. PRE-SOLVE FEASIBILITY CHECKS
+# ==============================================================================
+def _capacity_issue(check, entity, demand, capacity, message):
+    return {'check': check, 'entity': entity, 'demand': demand, 'capacity': capacity, 'message': message}
+
+def check_capacity(stream_map, courses, faculty, rooms):
+    """
+    Millisecond arithmetic that rules out datasets no solver can satisfy: weekly
+    hours per class group, faculty member and home room against the non-lunch
+    slots, two-hour lab blocks per class group and faculty member against the
+    blocks that fit around lunch, and total lab demand against the lab rooms
+    (with no lab room at all, that issue's entity is the list of lab course
+    offerings). Returns a list of issues (empty when nothing is provably over
+    capacity).
+    """
+    weekly_slots = len(DAYS) * (len(TIMESLOTS) - 1)
+    lab_blocks_per_week = len(DAYS) * (LUNCH_SLOT_INDEX // 2 + (len(TIMESLOTS) - LUNCH_SLOT_INDEX - 1) // 2)
+    lab_room_count = len([r for r, d in rooms.items() if d['type'] == 'lab'])
+
+    issues = []
+    stream_hours, faculty_hours, room_hours = collections.Counter(), collections.Counter(), collections.Counter()
+    stream_labs, faculty_labs, room_users = collections.Counter(), collections.Counter(), collections.defaultdict(set)
+    total_labs, lab_offerings = 0, []
+    for stream_sem, details in stream_map.items():
+        for course_code, faculty_name in details['courses']:
+            course_info = courses.get(course_code, {})
+            hours = course_info.get('hours_per_week', 0)
+            stream_hours[stream_sem] += hours
+            faculty_hours[faculty_name] += hours
+            if course_info.get('is_lab'):
+                if hours % 2: issues.append(_capacity_issue('lab_hours', (stream_sem, course_code), hours, hours - 1, f"{course_code} for {stream_sem} has {hours} lab hours, which cannot be split into 2-hour sessions."))
+                stream_labs[stream_sem] += hours // 2
+                faculty_labs[faculty_name] += hours // 2
+                total_labs += hours // 2
+                if hours: lab_offerings.append(('course', (stream_sem, course_code)))
+            elif details.get('room') in rooms:
+                room_hours[details['room']] += hours
+                room_users[details['room']].add(stream_sem)
+
+    for stream_sem, hours in stream_hours.items():
+        if hours > weekly_slots: issues.append(_capacity_issue('class_group_hours', stream_sem, hours, weekly_slots, f"Class group {stream_sem} needs {hours} hours but a week has only {weekly_slots} non-lunch slots."))
+        if stream_labs[stream_sem] > lab_blocks_per_week: issues.append(_capacity_issue('class_group_labs', stream_sem, stream_labs[stream_sem], lab_blocks_per_week, f"Class group {stream_sem} needs {stream_labs[stream_sem]} lab sessions but only {lab_blocks_per_week} 2-hour blocks fit around lunch."))
+    for faculty_name, hours in faculty_hours.items():
+        if hours > weekly_slots: issues.append(_capacity_issue('faculty_hours', faculty_name, hours, weekly_slots, f"{faculty_name} is assigned {hours} teaching hours but can teach at most {weekly_slots} per week."))
+        if faculty_labs[faculty_name] > lab_blocks_per_week: issues.append(_capacity_issue('faculty_labs', faculty_name, faculty_labs[faculty_name], lab_blocks_per_week, f"{faculty_name} runs {faculty_labs[faculty_name]} lab sessions but only {lab_blocks_per_week} 2-hour blocks fit around lunch."))
+    for room_name, hours in room_hours.items():
+        if hours > weekly_slots: issues.append(_capacity_issue('room_hours', room_name, hours, weekly_slots, f"Room {room_name} is the home room of {len(room_users[room_name])} class groups needing {hours} theory hours, more than its {weekly_slots} weekly slots."))
+    if lab_offerings and not lab_room_count:
+        names = ', '.join(f"{course_code} for {stream_sem}" for _, (stream_sem, course_code) in lab_offerings)
+        issues.append(_capacity_issue('lab_rooms', lab_offerings, total_labs, 0, f"{total_labs} lab sessions are needed ({names}) but the dataset has no lab room."))
+    elif total_labs > lab_room_count * lab_blocks_per_week:
+        issues.append(_capacity_issue('lab_rooms', 'lab rooms', total_labs, lab_room_count * lab_blocks_per_week, f"{total_labs} lab sessions are needed but {lab_room_count} lab rooms offer only {lab_room_count * lab_blocks_per_week} 2-hour blocks."))
+    return issues
+
+def find_conflicting_set(stream_map, courses, faculty, rooms, time_limit=None):
+    """
+    Assumption-based CP-SAT run for datasets that pass check_capacity. Each
+    course requirement and each class group, faculty member, room and the lab-room
+    pool get an assumption literal guarding their constraints; an infeasible core
+    is then shrunk by deletion until every member is necessary. Returns the
+    conflicting items as ('course', (stream, course)) / ('class_group', name) /
+    ('faculty', name) / ('room', name) / ('lab_pool', count) tuples, [] when the
+    hard constraints are satisfiable, or None if the solver ran out of time.
+    """
+    model = cp_model.CpModel()
+    lab_room_count = len([r for r, d in rooms.items() if d['type'] == 'lab'])
+    guards, by_stream_course, by_entity_slot, lab_pool_slot = {}, collections.defaultdict(list), collections.defaultdict(list), collections.defaultdict(list)
+    def guard(item):
+        if item not in guards: guards[item] = model.NewBoolVar(str(item))
+        return guards[item]
+
+    for stream_sem, details in stream_map.items():
+        home_room = details.get('room')
+        for course_code, faculty_name in details['courses']:
+            duration = session_duration(courses.get(course_code, {}))
+            for day_idx in range(len(DAYS)):
+                for ts_idx in range(len(TIMESLOTS) - duration + 1):
+                    if ts_idx <= LUNCH_SLOT_INDEX < ts_idx + duration: continue
+                    var = model.NewBoolVar('')
+                    by_stream_course[(stream_sem, course_code)].append(var)
+                    for covered in range(ts_idx, ts_idx + duration):
+                        by_entity_slot[('class_group', stream_sem, day_idx, covered)].append(var)
+                        by_entity_slot[('faculty', faculty_name, day_idx, covered)].append(var)
+                        if duration == 2: lab_pool_slot[(day_idx, covered)].append(var)
+                        elif home_room in rooms: by_entity_slot[('room', home_room, day_idx, covered)].append(var)
+
+    for (stream_sem, course_code), session_vars in by_stream_course.items():
+        course_info = courses.get(course_code, {})
+        if course_info.get('hours_per_week'):
+            model.Add(sum(session_vars) * session_duration(course_info) == course_info['hours_per_week']).OnlyEnforceIf(guard(('course', (stream_sem, course_code))))
+    for (kind, name, _, _), active_in_slot in by_entity_slot.items():
+        if len(active_in_slot) > 1: model.Add(sum(active_in_slot) <= 1).OnlyEnforceIf(guard((kind, name)))
+    for active_in_slot in lab_pool_slot.values():
+        if len(active_in_slot) > lab_room_count: model.Add(sum(active_in_slot) <= lab_room_count).OnlyEnforceIf(guard(('lab_pool', lab_room_count)))
+
+    def solve_with(items):
+        model.ClearAssumptions()
+        model.AddAssumptions([guards[item] for item in items])
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = PRECHECK_CORE_TIME_LIMIT_SECONDS if time_limit is None else time_limit
+        solver.parameters.num_workers = 1
+        # Capacity conflicts are pigeonhole arguments; the full LP relaxation refutes them almost instantly.
+        solver.parameters.linearization_level = 2
+        status = solver.Solve(model)
+        return status, solver
+
+    status, solver = solve_with(list(guards))
+    if status != cp_model.INFEASIBLE: return [] if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None
+    index_to_item = {lit.Index(): item for item, lit in guards.items()}
+    core = [index_to_item[i] for i in solver.SufficientAssumptionsForInfeasibility()]
+    for item in list(core):
+        trial = [other for other in core if other != item]
+        if solve_with(trial)[0] == cp_model.INFEASIBLE: core = trial
+    return core
+
+def precheck_dataset(stream_map, courses, faculty, rooms, find_core=None):
+    """Runs the capacity checks (and optionally the conflict search); prints and returns the issues found."""
+    start_time = time.time()
+    issues = check_capacity(stream_map, courses, faculty, rooms)
+    if not issues and (PRECHECK_FIND_CONFLICTS if find_core is None else find_core):
+        core = find_conflicting_set(stream_map, courses, faculty, rooms)
+        if core:
+            names = ', '.join(f"{kind} {name}" for kind, name in core)
+            issues.append(_capacity_issue('conflict', core, None, None, f"These requirements and resources cannot all be satisfied together: {names}."))
+    if issues:
+        print(f"\n❌ Pre-check found {len(issues)} problem(s) in {time.time() - start_time:.3f} seconds:")
+        for issue in issues: print(f"   -> {issue['message']}")
+    else:
+        print(f"   -> Pre-check passed in {time.time() - start_time:.3f} seconds.")
+    return issues
+
+def _failed_precheck_result(issues):
+    return {'status': 'INFEASIBLE_INPUT', 'objective': None, 'best_bound': None, 'sessions': [], 'wall_time': 0.0, 'issues': issues}
+
+# ==============================================================================
+# 9. OBJECTIVE-WEIGHT SWEEPS
+# ==============================================================================
+def _solve_with_weights(built, overrides, hint_sessions, time_limit, num_search_workers, model=None):
+    weights = objective_weights(overrides)
+    model = built['model'] if model is None else model
+    model.Maximize(weighted_objective(built['terms'], weights))
+    model.ClearHints()
+    if hint_sessions: add_solution_hints(built, hint_sessions, model)
+    result = solve_master_model(built, time_limit, num_search_workers, model=model)
+    result['weights'] = weights
+    return result
+
+def mark_pareto_front(results):
+    """
+    Flags each result whose term values are not dominated by another result's: at
+    least as many filled slots and no more of any penalty, better in one of them.
+    """
+    directions = {term: (1 if name == 'FILLED_SLOT_REWARD' else -1) for name, term in OBJECTIVE_TERMS.items()}
+    scored = [r for r in results if 'terms' in r]
+    for result in results:
+        result['pareto'] = result in scored and not any(
+            all(d * other['terms'][t] >= d * result['terms'][t] for t, d in directions.items()) and other['terms'] != result['terms']
+            for other in scored)
+    return results
+
+def sweep_objective_weights(built, weight_vectors, time_limit=None, parallel=False, warm_start=True, initial_sessions=None, max_workers=MAX_PARALLEL_WORKERS):
+    """
+    Solves one built model under each weight vector (dicts of OBJECTIVE_TERMS config
+    names to values; missing names keep their configured value) by swapping only the
+    objective. Sequential sweeps warm-start each solve from the previous weights'
+    solution; parallel sweeps solve model clones on a thread pool (CP-SAT releases
+    the GIL), hinted with `initial_sessions` if given. Returns the results with
+    their weights, term values and Pareto flag. Raises ValueError for a model of
+    one of the PARTIAL_OBJECTIVE_ENGINES.
+    """
+    if built['stats']['engine'] in PARTIAL_OBJECTIVE_ENGINES: raise ValueError(f"The {built['stats']['engine']} engine does not model every weighted term; sweep a grid or compact model.")
+    time_limit = SOLVER_TIME_LIMIT_SECONDS if time_limit is None else time_limit
+    start_time = time.time()
+    if parallel:
+        workers = max(1, min(max_workers, len(weight_vectors)))
+        threads_per_solve = max(1, (os.cpu_count() or 1) // workers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda overrides: _solve_with_weights(built, overrides, initial_sessions if warm_start else None, time_limit,
+                                                                          threads_per_solve, built['model'].Clone()), weight_vectors))
+    else:
+        results, previous = [], initial_sessions
+        for overrides in weight_vectors:
+            results.append(_solve_with_weights(built, overrides, previous if warm_start else None, time_limit, None))
+            if results[-1]['sessions']: previous = results[-1]['sessions']
+        built['model'].Maximize(built['objective'])
+        built['model'].ClearHints()
+    print(f"\n⚖️  Swept {len(weight_vectors)} weight vectors over one compiled model in {time.time() - start_time:.2f} seconds.")
+    return mark_pareto_front(results)
+
+def print_weight_sweep(results):
+    rows = []
+    for i, result in enumerate(results):
+        row = {'#': i, **{name: result['weights'][name] for name in OBJECTIVE_TERMS}, 'status': result['status'], 'score': result['objective']}
+        row.update(result.get('terms', {term: None for term in OBJECTIVE_TERMS.values()}))
+        row.update({'seconds': round(result['wall_time'], 2), 'pareto': '*' if result['pareto'] else ''})
+        rows.append(row)
+    print("\n--- Objective-weight comparison (term values are counts; * = Pareto-optimal) ---")
+    print(pd.DataFrame(rows).set_index('#').to_string())
+
+def load_weight_vectors(filename):
+    """Reads a JSON list of weight vectors, e.g. [{"GAP_PENALTY": 30}, {"GAP_PENALTY": 90}]."""
+    with open(filename, encoding='utf-8') as f:
+        weight_vectors = json.load(f)
+    for overrides in weight_vectors: objective_weights(overrides)
+    return weight_vectors
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate the master timetable with CP-SAT.")
+    parser.add_argument('--data', default=DATA_FILE)
+    parser.add_argument('--semester', default=SEMESTER_TO_SCHEDULE, help="Semester to schedule, or 'all' for every semester in the file.")
+    parser.add_argument('--stream', help="Only schedule class groups of this stream (e.g. CSE).")
+    parser.add_argument('--parallel', action='store_true', default=PARALLEL_COMPONENTS, help="Solve independent class-group components in a process pool.")
+    parser.add_argument('--workers', type=int, default=MAX_PARALLEL_WORKERS)
+    parser.add_argument('--time-limit', type=float, default=SOLVER_TIME_LIMIT_SECONDS)
+    parser.add_argument('--two-phase', action='store_true', help="Solve time slots with pooled lab rooms, then match lab rooms per slot.")
+    parser.add_argument('--assign-rooms-from', help="Saved solution (JSON) whose lab rooms to re-match (phase two only), keeping its time slots.")
+    parser.add_argument('--unavailable-room', action='append', default=[], help="Lab room to leave out when matching lab rooms (repeatable).")
+    parser.add_argument('--engine', choices=sorted(MODEL_BUILDERS), default=MODEL_ENGINE, help="Model encoding to benchmark.")
+    parser.add_argument('--search-workers', type=int, default=SOLVER_NUM_SEARCH_WORKERS, help="CP-SAT search workers (0 = all cores).")
+    parser.add_argument('--seed', type=int, default=SOLVER_RANDOM_SEED)
+    parser.add_argument('--log', action='store_true', default=SOLVER_LOG_SEARCH_PROGRESS, help="Print the CP-SAT search log.")
+    parser.add_argument('--gap', type=float, default=SOLVER_RELATIVE_GAP_LIMIT, help="Stop once the relative gap to the best bound is at most this.")
+    parser.add_argument('--stall-seconds', type=float, default=SOLVER_NO_IMPROVEMENT_SECONDS, help="Stop after this many seconds without an improving solution.")
+    parser.add_argument('--anytime', action='store_true', help="Report every improving solution as it is found.")
+    parser.add_argument('--skip-precheck', action='store_true', help="Do not run the capacity pre-check before building the model.")
+    parser.add_argument('--diagnose', action='store_true', default=PRECHECK_FIND_CONFLICTS, help="Also search for a minimal conflicting set with CP-SAT before solving.")
+    parser.add_argument('--save-solution', help="Write the solved sessions to this JSON file.")
+    parser.add_argument('--resolve-from', help="Previous solution (JSON) to repair incrementally instead of solving from scratch.")
+    parser.add_argument('--free-faculty', action='append', default=[], help="Faculty whose sessions may move (repeatable).")
+    parser.add_argument('--free-stream', action='append', default=[], help="Class group whose sessions may move (repeatable).")
+    parser.add_argument('--free-day', action='append', default=[], choices=DAYS, help="Day whose sessions may move (repeatable).")
+    parser.add_argument('--free-room', action='append', default=[], help="Room whose sessions may move (repeatable).")
+    parser.add_argument('--measure-build', action='store_true', help="Compare build time and peak memory of the grid and compact models, then exit.")
+    parser.add_argument('--no-variable-names', action='store_true', help="Create CP-SAT variables without names.")
+    parser.add_argument('--sweep', help="JSON list of objective weight vectors to compare on one compiled model.")
+    parser.add_argument('--sweep-parallel', action='store_true', help="Solve the weight vectors side by side instead of warm-starting them in turn.")
+    args = parser.parse_args()
+    if args.sweep and args.engine in PARTIAL_OBJECTIVE_ENGINES: parser.error(f"--sweep needs an engine that models every weighted term, not '{args.engine}'.")
+
+    SEMESTER_TO_SCHEDULE = args.semester
+    SOLVER_TIME_LIMIT_SECONDS = args.time_limit
+    SOLVER_NUM_SEARCH_WORKERS, SOLVER_RANDOM_SEED, SOLVER_LOG_SEARCH_PROGRESS = args.search_workers, args.seed, args.log
+    SOLVER_RELATIVE_GAP_LIMIT, SOLVER_NO_IMPROVEMENT_SECONDS = args.gap, args.stall_seconds
+    PRECHECK_CAPACITY, PRECHECK_FIND_CONFLICTS = not args.skip_precheck, args.diagnose
+    MODEL_VARIABLE_NAMES = not args.no_variable_names
+    if args.measure_build:
+        measure_model_build(args.data, None if args.semester == 'all' else args.semester)
+        sys.exit(0)
+    stream_map, courses, faculty, rooms = load_data_from_csv(args.data, None if args.semester == 'all' else args.semester, args.stream)
+    if args.resolve_from:
+        result = resolve_incrementally(stream_map, courses, faculty, rooms, load_sessions(args.resolve_from), args.free_faculty, args.free_stream,
+                                       [DAYS.index(d) for d in args.free_day], args.free_room, engine=args.engine)
+        if result['sessions']: print_master_timetable(result, stream_map, courses)
+    elif args.assign_rooms_from:
+        result = reassign_lab_rooms(stream_map, courses, rooms, load_sessions(args.assign_rooms_from), args.unavailable_room)
+        print_master_timetable(result, stream_map, courses)
+    elif args.sweep:
+        weight_vectors = load_weight_vectors(args.sweep)
+        if PRECHECK_CAPACITY and (issues := precheck_dataset(stream_map, courses, faculty, rooms)):
+            result = _failed_precheck_result(issues)
+        else:
+            built = MODEL_BUILDERS[args.engine](stream_map, courses, faculty, rooms)
+            sweep = sweep_objective_weights(built, weight_vectors, parallel=args.sweep_parallel, max_workers=args.workers)
+            print_weight_sweep(sweep)
+            result = max(sweep, key=lambda r: (r['pareto'], r['objective'] is not None))
+    elif args.two_phase:
+        result = generate_master_timetable_two_phase(stream_map, courses, faculty, rooms, args.engine)
+    elif args.parallel:
+        result = generate_master_timetable_parallel(stream_map, courses, faculty, rooms, args.time_limit, args.workers, args.engine)
+    else:
+        report = (lambda sol: print(f"   -> Improving solution: score {sol['objective']:.0f} (bound {sol['bound']:.0f}) after {sol['elapsed']:.2f} seconds.")) if args.anytime else None
+        result = generate_master_timetable(stream_map, courses, faculty, rooms, args.engine, on_solution=report)
+    if args.save_solution and result['sessions']: save_sessions(args.save_solution, result['sessions'])
+    if result['status'] == 'INFEASIBLE_INPUT': sys.exit(1)
@@ -0,0 +1,173 @@
+import collections
+import hashlib
+import json
+import os
+import threading
+
+# ==============================================================================
+# 0. CONFIGURATION
+# ==============================================================================
+RESULT_CACHE_DIR = os.path.join('.timetable_cache', 'results')
+RESULT_CACHE_MEMORY_ENTRIES = 64
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024      # on-disk store; least recently used entries go first
+# Lists under these keys are sets: their order in the payload does not change the timetable
+UNORDERED_KEYS = {'streams', 'courses', 'faculty', 'rooms', 'sections', 'rows'}
+# Request fields that tune the solve rather than describe the input (left out of input_fingerprint)
+NON_INPUT_KEYS = {'options', 'warm_start'}
+# A cached input sharing at least this share of its parts (by content) is near-identical
+NEAR_MATCH_THRESHOLD = 0.8
+
+# ==============================================================================
+# 1. CANONICAL KEYS
+# ==============================================================================
+def _canonical(value, unordered=False):
+    if isinstance(value, dict): return {str(k): _canonical(v, k in UNORDERED_KEYS) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        items = [_canonical(v) for v in value]
+        return sorted(items, key=lambda v: json.dumps(v, sort_keys=True)) if unordered else items
+    return value
+
+def canonical_payload(data, params=None):
+    """The request with sorted keys and sorted UNORDERED_KEYS lists, plus the solver `params`, as compact JSON."""
+    return json.dumps({'data': _canonical(data), 'params': _canonical(params or {})}, sort_keys=True, separators=(',', ':'), default=str)
+
+def cache_key(data, params=None):
+    """SHA-256 of canonical_payload: equal for inputs that differ only in ordering."""
+    return hashlib.sha256(canonical_payload(data, params).encode('utf-8')).hexdigest()
+
+def input_fingerprint(data):
+    """
+    Hashes of the payload's parts, for near-identical matching: each item of the
+    UNORDERED_KEYS lists (class group, course, faculty member, row, ...) and each
+    other top-level field (e.g. a dataset name) apart from NON_INPUT_KEYS.
+    """
+    canonical = _canonical(data)
+    if not isinstance(canonical, dict): return set()
+    parts = [(key, item) for key in sorted(UNORDERED_KEYS) for item in (canonical.get(key) or [])]
+    parts += [(key, value) for key, value in canonical.items() if key not in UNORDERED_KEYS and key not in NON_INPUT_KEYS]
+    return {hashlib.sha256(json.dumps(part, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16] for part in parts}
+
+# ==============================================================================
+# 2. TWO-LEVEL CACHE
+# ==============================================================================
+class ResultCache:
+    """
+    Generated results by cache_key: an in-memory LRU of `memory_entries` in front
+    of a JSON store in `directory` bounded to `max_bytes`. Each entry also keeps
+    the input_fingerprint of its payload, so nearest() can find a cached result
+    for a slightly different input to warm-start from. Thread-safe; counts hits,
+    misses, near hits and evictions for stats().
+    """
+    def __init__(self, directory=RESULT_CACHE_DIR, memory_entries=RESULT_CACHE_MEMORY_ENTRIES, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.directory, self.memory_entries, self.max_bytes = directory, memory_entries, max_bytes
+        self.memory, self.lock = collections.OrderedDict(), threading.Lock()
+        self.counters = collections.Counter()
+        self.fingerprints = self._load_fingerprints()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_fingerprints(self):
+        fingerprints = {}
+        if not os.path.isdir(self.directory): return fingerprints
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'): continue
+            try:
+                with open(os.path.join(self.directory, name), encoding='utf-8') as f: fingerprints[name[:-5]] = set(json.load(f)['fingerprint'])
+            except (OSError, ValueError, KeyError):
+                pass  # a damaged entry is just not offered
+        return fingerprints
+
+    def _remember(self, key, entry):
+        # Callers hold self.lock.
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries: self.memory.popitem(last=False)
+
+    def _lookup(self, key):
+        # Callers hold self.lock. Returns (entry or None, 'memory_hits' | 'disk_hits' | 'misses').
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key], 'memory_hits'
+        try:
+            with open(self._path(key), encoding='utf-8') as f: entry = json.load(f)
+            os.utime(self._path(key))  # mtime is the disk store's LRU order
+        except (OSError, ValueError):
+            return None, 'misses'
+        self._remember(key, entry)
+        return entry, 'disk_hits'
+
+    def get(self, key):
+        """The cached result for `key`, or None."""
+        with self.lock:
+            entry, outcome = self._lookup(key)
+            self.counters[outcome] += 1
+            return entry['result'] if entry is not None else None
+
+    def put(self, key, data, result):
+        """Stores `result` for `key` (the cache_key of `data`) in memory and on disk."""
+        entry = {'key': key, 'fingerprint': sorted(input_fingerprint(data)), 'result': result}
+        with self.lock:
+            self._remember(key, entry)
+            self.fingerprints[key] = set(entry['fingerprint'])
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                temporary = f"{self._path(key)}.{os.getpid()}.tmp"
+                with open(temporary, 'w', encoding='utf-8') as f: json.dump(entry, f, default=str)
+                os.replace(temporary, self._path(key))
+                self._evict_disk()
+            except OSError:
+                pass  # a read-only store just means memory-only caching
+
+    def nearest(self, data, threshold=NEAR_MATCH_THRESHOLD):
+        """
+        (key, result) of the cached entry whose input shares the most parts with
+        `data` (Jaccard similarity of input_fingerprint, at least `threshold`), or
+        None. Meant as a warm start for an input that missed the cache.
+        """
+        fingerprint = input_fingerprint(data)
+        if not fingerprint: return None
+        with self.lock:
+            scored = [(len(fingerprint & other) / len(fingerprint | other), key) for key, other in self.fingerprints.items() if other]
+            similarity, key = max(scored, default=(0, None))
+            if similarity < threshold: return None
+            entry = self._lookup(key)[0]
+            self.counters['near_hits' if entry is not None else 'near_misses'] += 1
+            return (key, entry['result']) if entry is not None else None
+
+    def invalidate(self, key=None):
+        """Drops one entry, or every entry when `key` is None. Returns how many were removed."""
+        with self.lock:
+            keys = list(self.fingerprints) if key is None else [key]
+            removed = 0
+            for k in keys:
+                self.memory.pop(k, None)
+                self.fingerprints.pop(k, None)
+                try:
+                    os.remove(self._path(k))
+                    removed += 1
+                except OSError:
+                    pass
+            if key is None: self.memory.clear()
+            self.counters['invalidations'] += removed
+            return removed
+
+    def _evict_disk(self):
+        # Callers hold self.lock.
+        entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path, entry.name[:-5]) for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, path, key in sorted(entries):
+            if total <= self.max_bytes: break
+            os.remove(path)
+            self.fingerprints.pop(key, None)
+            self.memory.pop(key, None)
+            total -= size
+            self.counters['evictions'] += 1
+
+    def stats(self):
+        """Hit/miss counters plus the current number of entries in memory and on disk and the disk store's size."""
+        with self.lock:
+            disk = [entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith('.json')] if os.path.isdir(self.directory) else []
+            lookups = self.counters['memory_hits'] + self.counters['disk_hits'] + self.counters['misses']
+            return dict(self.counters) | {'hit_ratio': (lookups - self.counters['misses']) / lookups if lookups else None,
+                                          'memory_entries': len(self.memory), 'disk_entries': len(disk), 'disk_bytes': sum(disk)}
@@ -0,0 +1,198 @@
+import csv
+import datetime
+import hashlib
+import io
+import json
+import time
+
+import numpy as np
+
+# ==============================================================================
+# 0. CONFIGURATION
+# ==============================================================================
+# The weekly grid, for optimize_schedule and every engine (kept here so the API and hybrid can use it without importing OR-Tools)
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+TIMESLOTS = ['10:00-11:00', '11:00-12:00', '12:00-01:00', '01:00-02:00', '02:00-03:00', '03:00-04:00', '04:00-05:00']
+LUNCH_SLOT_INDEX = 3
+SLOT_START_HOURS = [10, 11, 12, 13, 14, 15, 16]   # 24-hour clock start of each TIMESLOTS entry, for calendars
+SLOT_HOURS = 1
+
+# Calendar exports: weekly events from the Monday of ICAL_TERM_START for ICAL_TERM_WEEKS weeks
+ICAL_TERM_START = '2025-01-06'
+ICAL_TERM_WEEKS = 16
+ICAL_PRODUCT_ID = '-//Timetable Generator//Solution Store//EN'
+
+KINDS = ('section', 'faculty', 'room')
+CSV_COLUMNS = ['class_group', 'day', 'timeslot', 'day_index', 'slot_index', 'duration', 'course', 'faculty', 'room']
+
+# ==============================================================================
+# 1. STORE
+# ==============================================================================
+class SolutionStore:
+    """
+    One timetable as parallel integer arrays (one row per session: section, day,
+    slot, duration, course, faculty, room ids) with name tables, plus for each
+    of KINDS the rows of every entity sorted by (day, slot). Built in one pass
+    over the sessions; every query reads only the rows it returns, and the
+    exports stream row by row.
+    """
+    def __init__(self, columns, names):
+        self.columns, self.names = columns, names
+        self.ids = {field: {name: i for i, name in enumerate(table)} for field, table in names.items()}
+        self.index = {kind: self._group(kind) for kind in KINDS}
+
+    @classmethod
+    def from_sessions(cls, sessions, courses=None):
+        """From optimize_schedule sessions (class group, day, slot, course, faculty, room); `courses` gives lab sessions their 2 hours."""
+        courses = courses or {}
+        return cls._build([(ss, d, t, 2 if courses.get(c, {}).get('is_lab') else 1, c, f, r) for ss, d, t, c, f, r in sessions])
+
+    @classmethod
+    def from_records(cls, records):
+        """From session records as the API returns them (see record())."""
+        return cls._build([(s['class_group'], s['day_index'], s['slot_index'], s.get('duration', 1), s['course'], s['faculty'], s['room']) for s in records])
+
+    @classmethod
+    def _build(cls, rows):
+        fields = ('section', 'day', 'slot', 'duration', 'course', 'faculty', 'room')
+        values = list(zip(*rows)) if rows else [()] * len(fields)
+        columns, names = {}, {}
+        for field, column in zip(fields, values):
+            if field in ('day', 'slot', 'duration'):
+                columns[field] = np.array(column, dtype=np.int32)
+                continue
+            names[field] = sorted(set(column))   # ids in name order, so id order is name order
+            lookup = {name: i for i, name in enumerate(names[field])}
+            columns[field] = np.fromiter((lookup[v] for v in column), dtype=np.int32, count=len(column))
+        return cls(columns, names)
+
+    def _group(self, kind):
+        # (rows sorted by entity, day, slot; offsets) so the rows of entity e are order[offsets[e]:offsets[e + 1]].
+        entity = self.columns[kind]
+        order = np.lexsort((self.columns['slot'], self.columns['day'], entity))
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(entity, minlength=len(self.names[kind])))])
+        return order, offsets
+
+    def __len__(self):
+        return len(self.columns['day'])
+
+    # --- Queries ---
+    def rows(self, kind, name, day=None):
+        """Row ids of `name`'s sessions (a class group, faculty member or room by `kind`), by day and slot; optionally one `day` (name or index)."""
+        if kind not in KINDS: raise ValueError(f"Unknown kind '{kind}'; expected one of {list(KINDS)}.")
+        entity = self.ids[kind].get(name)
+        if entity is None: return np.empty(0, dtype=np.int64)
+        order, offsets = self.index[kind]
+        rows = order[offsets[entity]:offsets[entity + 1]]
+        if day is None: return rows
+        day = DAYS.index(day) if isinstance(day, str) else int(day)
+        days = self.columns['day'][rows]
+        return rows[np.searchsorted(days, day, 'left'):np.searchsorted(days, day, 'right')]
+
+    def record(self, row):
+        """A session as a JSON-ready dict (the API's session record)."""
+        c, names = self.columns, self.names
+        d, t = int(c['day'][row]), int(c['slot'][row])
+        return {'class_group': names['section'][c['section'][row]], 'day': DAYS[d], 'timeslot': TIMESLOTS[t], 'day_index': d, 'slot_index': t,
+                'duration': int(c['duration'][row]), 'course': names['course'][c['course'][row]], 'faculty': names['faculty'][c['faculty'][row]],
+                'room': names['room'][c['room'][row]]}
+
+    def records(self, kind='section', name=None, day=None):
+        """Session records of one entity, or of every entity of `kind` in name order."""
+        rows = self.rows(kind, name, day) if name is not None else self.index[kind][0]
+        return (self.record(row) for row in rows)
+
+    def sessions(self, kind, name, day=None):
+        return list(self.records(kind, name, day))
+
+    def grid(self, kind, name):
+        """`name`'s week as len(DAYS) lists of len(TIMESLOTS) cells: a session record (on every hour it covers), 'LUNCH' or None."""
+        cells = [[None] * len(TIMESLOTS) for _ in DAYS]
+        for day in cells: day[LUNCH_SLOT_INDEX] = 'LUNCH'
+        for record in self.records(kind, name):
+            for t in range(record['slot_index'], min(record['slot_index'] + record['duration'], len(TIMESLOTS))):
+                cells[record['day_index']][t] = record
+        return cells
+
+    def hours(self, kind):
+        """Scheduled hours per entity of `kind`, e.g. faculty load or room use."""
+        totals = np.bincount(self.columns[kind], weights=self.columns['duration'], minlength=len(self.names[kind]))
+        return {name: int(total) for name, total in zip(self.names[kind], totals)}
+
+    def summary(self):
+        """Sessions, and per kind the entity names with their scheduled hours."""
+        return {'sessions': len(self), 'days': DAYS, 'timeslots': TIMESLOTS, **{kind: self.hours(kind) for kind in KINDS}}
+
+    # --- Rendering and exports ---
+    def render_text(self, name, kind='section'):
+        """`name`'s week as a fixed-width text table; each cell shows course, faculty surname and room on three lines."""
+        lines = {(d, t): ('LUNCH', '', '') if t == LUNCH_SLOT_INDEX else ('--', '', '') for d in range(len(DAYS)) for t in range(len(TIMESLOTS))}
+        for d, day in enumerate(self.grid(kind, name)):
+            for t, cell in enumerate(day):
+                if isinstance(cell, dict): lines[(d, t)] = (cell['course'], cell['faculty'].split(' ')[-1], cell['room'])
+        day_width = max(len(day) for day in DAYS)
+        widths = [max(len(slot), *(len(part) for d in range(len(DAYS)) for part in lines[(d, t)])) for t, slot in enumerate(TIMESLOTS)]
+        out = [' ' * day_width + '  ' + '  '.join(slot.rjust(w) for slot, w in zip(TIMESLOTS, widths))]
+        for d, day in enumerate(DAYS):
+            for part in range(3):
+                label = day if part == 0 else ''
+                out.append(label.ljust(day_width) + '  ' + '  '.join(lines[(d, t)][part].rjust(w) for t, w in enumerate(widths)))
+        return '\n'.join(out)
+
+    def iter_json(self, kind='section', name=None):
+        """The session records as a JSON array, streamed one record per chunk."""
+        yield '['
+        for i, record in enumerate(self.records(kind, name)): yield (',' if i else '') + json.dumps(record)
+        yield ']'
+
+    def iter_csv(self, kind='section', name=None):
+        """The session records as CSV (CSV_COLUMNS), streamed one line per chunk."""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for record in self.records(kind, name):
+            writer.writerow(record)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.getvalue(): yield buffer.getvalue()
+
+    def iter_ical(self, kind='section', name=None, term_start=ICAL_TERM_START, weeks=ICAL_TERM_WEEKS):
+        """
+        The sessions (of one entity, or all) as an iCalendar file: one weekly
+        event per session from the week of `term_start` for `weeks` weeks,
+        in floating local time. Streamed one line per chunk.
+        """
+        monday = datetime.date.fromisoformat(str(term_start))
+        monday -= datetime.timedelta(days=monday.weekday())
+        stamp = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+        title = f"{kind} {name}" if name is not None else 'timetable'
+        for line in ('BEGIN:VCALENDAR', 'VERSION:2.0', f"PRODID:{ICAL_PRODUCT_ID}", 'CALSCALE:GREGORIAN', f"X-WR-CALNAME:{_ical_text(title)}"):
+            yield line + '\r\n'
+        for record in self.records(kind, name):
+            date = monday + datetime.timedelta(days=record['day_index'])
+            start = datetime.datetime.combine(date, datetime.time(SLOT_START_HOURS[record['slot_index']]))
+            end = start + datetime.timedelta(hours=SLOT_HOURS * record['duration'])
+            uid = hashlib.sha1(json.dumps(record, sort_keys=True).encode('utf-8')).hexdigest()[:20]
+            for line in ('BEGIN:VEVENT', f"UID:{uid}@timetable", f"DTSTAMP:{stamp}", f"DTSTART:{start:%Y%m%dT%H%M%S}", f"DTEND:{end:%Y%m%dT%H%M%S}",
+                         f"RRULE:FREQ=WEEKLY;COUNT={int(weeks)}", f"SUMMARY:{_ical_text(record['course'] + ' (' + record['class_group'] + ')')}",
+                         f"LOCATION:{_ical_text(record['room'])}", f"DESCRIPTION:{_ical_text('Faculty: ' + record['faculty'])}", 'END:VEVENT'):
+                yield _ical_fold(line) + '\r\n'
+        yield 'END:VCALENDAR\r\n'
+
+def _ical_text(value):
+    return str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def _ical_fold(line, limit=75):
+    # RFC 5545: lines longer than 75 octets continue on lines starting with a space.
+    if len(line.encode('utf-8')) <= limit: return line
+    parts, current = [], ''
+    for char in line:
+        if len((current + char).encode('utf-8')) > limit:
+            parts.append(current)
+            current = ' '
+        current += char
+    return '\r\n'.join(parts + [current])
+
+EXPORTS = {'json': (SolutionStore.iter_json, 'application/json'), 'csv': (SolutionStore.iter_csv, 'text/csv'),
+           'ics': (SolutionStore.iter_ical, 'text/calendar')}
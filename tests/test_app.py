@@ -0,0 +1,21 @@
+import app
+from result_cache import ResultCache
+from solution_store import SolutionStore
+
+
+def test_cached_timetable_is_served_without_starting_the_job_queue(tmp_path, monkeypatch):
+    courses = {'CS-301': {'hours_per_week': 1, 'is_lab': False}}
+    sessions = [('CSE-A_III', 0, 0, 'CS-301', 'Dr. Patel', 'CR-101')]
+    cache = ResultCache(directory=str(tmp_path))
+    cache.put('k1', {'dataset': 'sample'}, [{'rank': 1, 'score': 100, 'clash_cells': 0, 'hours_deviation': 0,
+                                             'sessions': list(SolutionStore.from_sessions(sessions, courses).records())}])
+    monkeypatch.setattr(app, 'result_cache', cache)
+    monkeypatch.setattr(app, 'job_queue', None)
+    monkeypatch.setattr(app, 'solution_stores', app.collections.OrderedDict())
+
+    client = app.app.test_client()
+    assert client.get('/api/timetables/k1').status_code == 200
+    assert client.get('/api/timetables/k1').status_code == 200
+    assert client.get('/api/timetables/unknown').status_code == 404
+    assert app.job_queue is None
+    assert list(app.solution_stores) == [('k1', 1)]
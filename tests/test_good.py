@@ -0,0 +1,31 @@
+import good
+import optimize_schedule
+
+
+def _split_course(hours):
+    # One course taught by two teachers, so its sessions on different days are different variables.
+    stream_map = {'CSE-A_III': {'room': 'CR-1', 'courses': [('CS-301', 'Dr. Patel'), ('CS-301', 'Dr. Rao')]}}
+    courses = {'CS-301': {'hours_per_week': hours, 'is_lab': False}}
+    rooms = {'CR-1': {'type': 'theory', 'capacity': 60}, 'LAB-1': {'type': 'lab', 'capacity': 30}}
+    return stream_map, courses, {}, rooms
+
+
+def test_course_never_starts_at_the_same_slot_on_consecutive_days():
+    # One session per teacher a day: 12 hours need both teachers on every day of the week.
+    result = good.solve_good(*_split_course(12), time_limit=10, verbose=False, require_weekly_hours=True)
+
+    assert result['status'] in ('OPTIMAL', 'FEASIBLE')
+    starts = {(d, t) for _, d, t, _, _, _ in result['sessions']}
+    assert len(result['sessions']) == 12
+    assert not any((d + 1, t) in starts for d, t in starts)
+
+
+def test_saturday_and_monday_are_not_consecutive():
+    stream_map, courses, faculty, rooms = _split_course(2)
+    built = good.build_good_model(stream_map, courses, faculty, rooms, greedy_hint=False, verbose=False)
+    saturday, monday = len(optimize_schedule.DAYS) - 1, 0
+    for (ss, d, t, c, f, r), var in built['assignments'].items():
+        wanted = (d, t, f) in ((saturday, 0, 'Dr. Patel'), (monday, 0, 'Dr. Rao'))
+        built['model'].Add(var == int(wanted))
+
+    assert optimize_schedule.solve_master_model(built, 10)['status'] in ('OPTIMAL', 'FEASIBLE')
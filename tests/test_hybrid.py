@@ -0,0 +1,80 @@
+import numpy as np
+
+import hybrid
+import optimize_schedule
+
+
+def test_grid_matches_optimize_schedule():
+    assert hybrid.DAYS == optimize_schedule.DAYS
+    assert hybrid.TIMESLOTS == optimize_schedule.TIMESLOTS
+    assert hybrid.LUNCH_SLOT_INDEX == optimize_schedule.LUNCH_SLOT_INDEX
+
+
+def test_decoded_slot_labels_match_optimize_schedule():
+    stream_map = {'CSE-A_III': {'room': 'CR-101', 'courses': [('CS-301', 'Dr. Patel'), ('CS-351L', 'Dr. Rao')]}}
+    courses = {'CS-301': {'hours_per_week': 1, 'is_lab': False}, 'CS-351L': {'hours_per_week': 2, 'is_lab': True}}
+    rooms = {'CR-101': {'type': 'theory', 'capacity': 60}, 'LAB-101': {'type': 'lab', 'capacity': 30}}
+    last = len(optimize_schedule.TIMESLOTS) - 1
+    sessions = [('CSE-A_III', 0, 0, 'CS-301', 'Dr. Patel', 'CR-101'), ('CSE-A_III', 1, last - 1, 'CS-351L', 'Dr. Rao', 'LAB-101')]
+
+    problem = hybrid.encode_problem(stream_map, courses, {}, rooms)
+    genome = hybrid.sessions_to_genome(problem, sessions, courses)
+    table = hybrid.decode_timetable(problem, genome)['CSE-A_III']
+
+    assert list(table.columns) == optimize_schedule.TIMESLOTS
+    assert list(table.index) == optimize_schedule.DAYS
+    assert (table[optimize_schedule.TIMESLOTS[optimize_schedule.LUNCH_SLOT_INDEX]] == 'LUNCH').all()
+    assert table.loc['Monday', optimize_schedule.TIMESLOTS[0]].startswith('CS-301 |')
+    assert table.loc['Tuesday', optimize_schedule.TIMESLOTS[last]].startswith('CS-351L |')
+    # The same sessions come back out of the genome, lab included in the last slots of the day.
+    assert sorted(s[:5] for s in hybrid.genome_to_sessions(problem, genome, stream_map, courses, rooms)) == sorted(s[:5] for s in sessions)
+    assert np.count_nonzero(genome == hybrid.LUNCH) == len(optimize_schedule.DAYS)
+
+
+def _shared_room_problem(lab_rooms=1):
+    stream_map = {'CSE-A_III': {'room': 'CR-1', 'courses': [('CS-351L', 'Dr. Rao')]},
+                  'ECE-A_III': {'room': 'CR-1', 'courses': [('EC-301', 'Dr. Joshi'), ('EC-351L', 'Dr. Iyer')]}}
+    courses = {'CS-351L': {'hours_per_week': 2, 'is_lab': True}, 'EC-301': {'hours_per_week': 1, 'is_lab': False},
+               'EC-351L': {'hours_per_week': 2, 'is_lab': True}}
+    rooms = {'CR-1': {'type': 'theory', 'capacity': 60}, **{f"LAB-{i}": {'type': 'lab', 'capacity': 30} for i in range(1, lab_rooms + 1)}}
+    return stream_map, courses, rooms
+
+
+def test_lab_sessions_do_not_occupy_the_home_room():
+    stream_map, courses, rooms = _shared_room_problem()
+    # CSE-A's lab runs in LAB-1 while ECE-A has theory in the home room both groups share.
+    sessions = [('CSE-A_III', 0, 0, 'CS-351L', 'Dr. Rao', 'LAB-1'), ('ECE-A_III', 0, 0, 'EC-301', 'Dr. Joshi', 'CR-1')]
+    problem = hybrid.encode_problem(stream_map, courses, {}, rooms)
+    genome = hybrid.sessions_to_genome(problem, sessions, courses)
+
+    ok, cells = hybrid.check_conflicts(problem, genome)
+    assert ok and len(cells) == 0
+    assert hybrid.batch_conflict_counts(problem, genome[None])[0] == 0
+
+
+def test_labs_beyond_the_lab_rooms_clash_and_are_repaired():
+    stream_map, courses, rooms = _shared_room_problem(lab_rooms=1)
+    sessions = [('CSE-A_III', 0, 0, 'CS-351L', 'Dr. Rao', 'LAB-1'), ('ECE-A_III', 0, 0, 'EC-351L', 'Dr. Iyer', 'LAB-1')]
+    problem = hybrid.encode_problem(stream_map, courses, {}, rooms)
+    genome = hybrid.sessions_to_genome(problem, sessions, courses)
+
+    ok, cells = hybrid.check_conflicts(problem, genome)
+    assert not ok and len(cells) == 4
+    assert hybrid.batch_conflict_counts(problem, genome[None])[0] == 2
+    assert hybrid.check_conflicts(problem, hybrid.repair_genome(problem, genome, cells))[0]
+
+    # With a second lab room both labs fit.
+    stream_map, courses, rooms = _shared_room_problem(lab_rooms=2)
+    problem = hybrid.encode_problem(stream_map, courses, {}, rooms)
+    assert hybrid.check_conflicts(problem, hybrid.sessions_to_genome(problem, sessions, courses))[0]
+
+
+def test_solve_hybrid_keeps_only_clash_free_options_within_its_time_limit():
+    stream_map, courses, rooms = _shared_room_problem(lab_rooms=1)
+    faculty = {f: {} for details in stream_map.values() for _, f in details['courses']}
+
+    result = hybrid.solve_hybrid(stream_map, courses, faculty, rooms, time_limit=2, population_size=50, keep=3, verbose=False)
+
+    assert result['status'] == 'FEASIBLE' and result['options']
+    assert all(option['conflicts'] == 0 for option in result['options'])
+    assert result['wall_time'] < 4
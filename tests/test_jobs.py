@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+import jobs
+
+
+def _echo(data, progress, search_workers):
+    progress({'type': 'solution', 'objective': data['n']})
+    return {'n': data['n'], 'search_workers': search_workers}
+
+
+def _run_until_cancelled(data, progress, search_workers):
+    while not progress():
+        time.sleep(0.02)
+    return {'stopped': data['n']}
+
+
+def _wait_for(queue, job_id, states, timeout=60):
+    deadline = time.time() + timeout
+    while queue.status(job_id)['status'] not in states:
+        assert time.time() < deadline, queue.status(job_id)
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def make_queue():
+    queues = []
+    def make(target, **options):
+        queues.append(jobs.JobQueue(target, max_workers=1, **options))
+        return queues[-1]
+    yield make
+    for queue in queues:
+        for job_id in list(queue.jobs): queue.cancel(job_id)
+        queue.shutdown()
+
+
+def test_job_succeeds_with_its_events_and_cores(make_queue):
+    succeeded = []
+    queue = make_queue(_echo, on_success=succeeded.append)
+    job_id = queue.submit({'n': 7})
+    _wait_for(queue, job_id, jobs.FINISHED_STATES)
+
+    assert queue.result(job_id) == (jobs.SUCCEEDED, {'n': 7, 'search_workers': jobs.search_workers_per_job(1)})
+    events, finished = queue.wait_events(job_id, timeout=0)
+    assert finished and [e['type'] for e in events] == ['started', 'solution', 'finished']
+    assert [e['seq'] for e in events] == [1, 2, 3]
+    deadline = time.time() + 5
+    while not succeeded and time.time() < deadline: time.sleep(0.01)
+    assert [job['id'] for job in succeeded] == [job_id]
+
+
+def test_admission_reuses_active_keys_and_rejects_a_full_queue(make_queue):
+    queue = make_queue(_run_until_cancelled, max_queued=1)
+    running = queue.submit({'n': 1}, key='a')
+    _wait_for(queue, running, (jobs.RUNNING,))
+    waiting = queue.submit({'n': 2}, key='b')
+
+    assert queue.status(waiting)['status'] == jobs.QUEUED
+    assert queue.submit({'n': 1}, key='a') == running
+    assert queue.submit({'n': 2}, key='b') == waiting
+    with pytest.raises(jobs.QueueFull):
+        queue.submit({'n': 3}, key='c')
+
+    # The waiting job may already be handed to the pool; either way it ends cancelled without running.
+    queue.cancel(waiting)
+    queue.cancel(running)
+    _wait_for(queue, waiting, jobs.FINISHED_STATES)
+    assert queue.result(waiting) == (jobs.CANCELLED, None)
+    _wait_for(queue, running, jobs.FINISHED_STATES)
+    assert queue.submit({'n': 3}, key='c') not in (running, waiting)
+
+
+def test_cancel_stops_a_running_job_with_its_result(make_queue):
+    queue = make_queue(_run_until_cancelled)
+    job_id = queue.submit({'n': 5})
+    _wait_for(queue, job_id, (jobs.RUNNING,))
+
+    queue.cancel(job_id)
+    _wait_for(queue, job_id, jobs.FINISHED_STATES)
+    assert queue.result(job_id) == (jobs.CANCELLED, {'stopped': 5})
+    assert queue.wait_events(job_id, timeout=0)[0][-1]['status'] == jobs.CANCELLED
+    # A finished job's key can be submitted again as a new job.
+    assert queue.submit({'n': 5}) != job_id
@@ -0,0 +1,70 @@
+import os
+
+import optimize_schedule
+
+SAMPLE = os.path.join(os.path.dirname(__file__), '..', 'timetable_data.csv')
+
+
+def _lab_problem(lab_rooms):
+    stream_map = {'CSE-A_III': {'room': 'CR-1', 'size': 35, 'courses': [('CS-301', 'Dr. Patel'), ('CS-351L', 'Dr. Patel')]},
+                  'ECE-A_III': {'room': 'CR-2', 'size': 15, 'courses': [('EC-351L', 'Dr. Joshi')]},
+                  'ME-A_III': {'room': 'CR-3', 'size': 10, 'courses': [('ME-351L', 'Dr. Verma')]}}
+    courses = {'CS-301': {'hours_per_week': 4, 'is_lab': False}, 'CS-351L': {'hours_per_week': 2, 'is_lab': True},
+               'EC-351L': {'hours_per_week': 2, 'is_lab': True}, 'ME-351L': {'hours_per_week': 2, 'is_lab': True}}
+    rooms = {f"CR-{i}": {'type': 'theory', 'capacity': 60} for i in (1, 2, 3)} | {name: {'type': 'lab', 'capacity': cap} for name, cap in lab_rooms.items()}
+    return stream_map, courses, {}, rooms
+
+
+def test_sample_data_passes_the_precheck():
+    assert optimize_schedule.precheck_dataset(*optimize_schedule.load_data_from_csv(SAMPLE, 'III'), find_core=True) == []
+
+
+def test_precheck_reports_lab_courses_without_a_lab_room():
+    stream_map, courses, faculty, rooms = _lab_problem({})
+    issues = optimize_schedule.check_capacity(stream_map, courses, faculty, rooms)
+
+    assert [issue['check'] for issue in issues] == ['lab_rooms']
+    assert sorted(issues[0]['entity']) == [('course', ('CSE-A_III', 'CS-351L')), ('course', ('ECE-A_III', 'EC-351L')), ('course', ('ME-A_III', 'ME-351L'))]
+    assert (issues[0]['demand'], issues[0]['capacity']) == (3, 0)
+    assert optimize_schedule.check_capacity(*_lab_problem({'LAB-1': 40})) == []
+    # The conflict search agrees: one lab course and the empty lab pool cannot both hold.
+    core = optimize_schedule.find_conflicting_set(stream_map, courses, faculty, rooms)
+    assert ('lab_pool', 0) in core and len(core) == 2
+
+
+def test_precheck_reports_an_overbooked_class_group():
+    stream_map, courses, faculty, rooms = _lab_problem({'LAB-1': 40})
+    courses['CS-301']['hours_per_week'] = 40
+    issues = optimize_schedule.check_capacity(stream_map, courses, faculty, rooms)
+    assert {(issue['check'], issue['entity']) for issue in issues} == {('class_group_hours', 'CSE-A_III'), ('faculty_hours', 'Dr. Patel'), ('room_hours', 'CR-1')}
+
+
+def test_get_lab_rooms_invents_a_room_only_without_any_rooms():
+    rooms = {'CR-1': {'type': 'theory', 'capacity': 60}}
+    assert optimize_schedule.get_lab_rooms(rooms) == [] and 'LAB-001' not in rooms
+    assert optimize_schedule.get_lab_rooms({}) == ['LAB-001']
+
+
+def test_lab_rooms_are_matched_by_size_without_double_booking():
+    stream_map, courses, faculty, rooms = _lab_problem({'LAB-S': 20, 'LAB-L': 40})
+    pool = optimize_schedule.LAB_POOL_ROOM
+    sessions = [('CSE-A_III', 0, 0, 'CS-351L', 'Dr. Patel', pool), ('ECE-A_III', 0, 0, 'EC-351L', 'Dr. Joshi', pool),
+                ('ME-A_III', 0, 1, 'ME-351L', 'Dr. Verma', pool), ('CSE-A_III', 0, 2, 'CS-301', 'Dr. Patel', 'CR-1')]
+
+    placed, unplaced = optimize_schedule.assign_lab_rooms(sessions, stream_map, courses, rooms)
+
+    rooms_of = {s[0]: s[5] for s in placed if s[3].endswith('L')}
+    assert rooms_of == {'CSE-A_III': 'LAB-L', 'ECE-A_III': 'LAB-S', 'ME-A_III': pool}   # both rooms are still busy at slot 1
+    assert unplaced == [('ME-A_III', 0, 1, 'ME-351L', 'Dr. Verma', pool)]
+    assert ('CSE-A_III', 0, 2, 'CS-301', 'Dr. Patel', 'CR-1') in placed
+
+
+def test_reassign_lab_rooms_moves_sessions_out_of_unavailable_rooms():
+    stream_map, courses, faculty, rooms = _lab_problem({'LAB-1': 40, 'LAB-2': 40})
+    sessions = [('CSE-A_III', 0, 0, 'CS-351L', 'Dr. Patel', 'LAB-2'), ('ECE-A_III', 1, 0, 'EC-351L', 'Dr. Joshi', 'LAB-2')]
+
+    result = optimize_schedule.reassign_lab_rooms(stream_map, courses, rooms, sessions, unavailable_rooms=['LAB-2'])
+    assert result['status'] == 'FEASIBLE'
+    assert sorted(result['sessions']) == sorted(s[:5] + ('LAB-1',) for s in sessions)
+    # The current room is kept when it is still available.
+    assert optimize_schedule.reassign_lab_rooms(stream_map, courses, rooms, sessions)['sessions'] == sessions
@@ -0,0 +1,42 @@
+from result_cache import ResultCache, cache_key
+
+
+def _payload(*rows):
+    return {'semester': 'III', 'rows': [{'stream_semester_group': ss, 'course_code': c} for ss, c in rows]}
+
+
+def test_cache_key_ignores_row_order_but_not_content_or_solver_parameters():
+    rows = [('CSE-A_III', 'CS-301'), ('CSE-A_III', 'CS-302'), ('ECE-A_III', 'EC-301')]
+    assert cache_key(_payload(*rows)) == cache_key(_payload(*reversed(rows)))
+    assert cache_key(_payload(*rows)) != cache_key(_payload(*rows[:2]))
+    assert cache_key(_payload(*rows), {'generator': 'a'}) != cache_key(_payload(*rows), {'generator': 'b'})
+
+
+def test_results_survive_a_restart_and_can_be_invalidated(tmp_path):
+    data = _payload(('CSE-A_III', 'CS-301'))
+    key = cache_key(data)
+    ResultCache(directory=str(tmp_path)).put(key, data, [{'rank': 1}])
+
+    cache = ResultCache(directory=str(tmp_path))
+    assert cache.get(key) == [{'rank': 1}]
+    assert cache.get('missing') is None
+    assert cache.stats()['disk_hits'] == 1 and cache.stats()['misses'] == 1
+    assert cache.invalidate(key) == 1
+    assert cache.get(key) is None
+
+
+def test_memory_entries_are_least_recently_used(tmp_path):
+    cache = ResultCache(directory=str(tmp_path), memory_entries=2)
+    for key in ('a', 'b', 'c'): cache.put(key, {'dataset': key}, key)
+    assert list(cache.memory) == ['b', 'c']
+    assert cache.get('a') == 'a'                 # still on disk
+    assert list(cache.memory) == ['c', 'a']
+
+
+def test_nearest_finds_a_near_identical_input_only(tmp_path):
+    rows = [('CSE-A_III', f"CS-30{i}") for i in range(10)]
+    cache = ResultCache(directory=str(tmp_path))
+    cache.put(cache_key(_payload(*rows)), _payload(*rows), 'previous')
+
+    assert cache.nearest(_payload(*rows[:9], ('CSE-A_III', 'CS-399'))) == (cache_key(_payload(*rows)), 'previous')
+    assert cache.nearest(_payload(*rows[:3])) is None